@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""Compute MiniOps log-based guardrail metrics from exported JSON log lines.
+
+Example usage::
+
+    python scripts/analyze-logs.py \
+        --api logs/api-2025-11-01.ndjson.gz \
+        --ocr logs/ocr-2025-11-01.ndjson \
+        --window 300 --workers 4 --append
+
+Each input is NDJSON emitted by `log_event` (plain or gzip). Plain files are
+memory-mapped and split into newline-aligned chunks that are parsed in
+parallel; gzip files are streamed. Latencies (`duration_ms`) are accumulated in
+mergeable DDSketch-style histograms per source, `opId`, `code`, and time
+window, so memory stays bounded regardless of file size.
+
+The script prints a JSON summary in the same shape as
+`scripts/measure-latency.py` plus the three MiniOps metrics (API p95, API error
+rate, OCR failure rate). Health probes, startup/shutdown, and background-loop
+events are excluded from those metrics (`--exclude-op` / `--include-op`). With ``--append`` a markdown table is added to
+``docs/deployment/cost-guardrails.md``.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import mmap
+import os
+import re
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on environment
+    _loads = json.loads
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+COST_DOC = ROOT_DIR / "docs" / "deployment" / "cost-guardrails.md"
+DEFAULT_ERROR_PATTERN = r"ERROR|FAIL|DENY|TIMEOUT|^5\d\d$"
+MIN_CHUNK_BYTES = 8 * 1024 * 1024
+# Sketch quantiles are within 1% of the true value; all sketches share it so they can merge.
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+# Probes, lifecycle, and background-loop events log `duration_ms=0` and say nothing about request
+# latency or failures, so they are left out of the guardrail rollups (still listed per opId).
+DEFAULT_EXCLUDED_OPS = (
+    "healthz",
+    "readyz",
+    "startup",
+    "shutdown",
+    "worker",
+    "heartbeat",
+    "sync_compact",
+    "debug_profile",
+)
+
+# (source, opId, code, window_start) -> sketch
+GroupKey = tuple[str, str, str, int]
+
+
+@dataclass(slots=True)
+class LatencySketch:
+    """Relative-error quantile sketch (DDSketch) with exact count, sum, min, and max."""
+
+    buckets: dict[int, int] = field(default_factory=dict)
+    zero_count: int = 0
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / LOG_GAMMA)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: LatencySketch) -> None:
+        self.count += other.count
+        self.total += other.total
+        self.zero_count += other.zero_count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        cumulative = self.zero_count
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            if cumulative > rank:
+                # Bucket midpoint in log space keeps the estimate within RELATIVE_ACCURACY.
+                estimate = 2 * GAMMA**index / (GAMMA + 1)
+                return min(max(estimate, self.minimum), self.maximum)
+        return self.maximum
+
+
+@dataclass(slots=True)
+class GroupStats:
+    """Latency and error counts for one (source, opId, code, window) group."""
+
+    sketch: LatencySketch = field(default_factory=LatencySketch)
+    events: int = 0
+    failures: int = 0
+
+    def merge(self, other: GroupStats) -> None:
+        self.sketch.merge(other.sketch)
+        self.events += other.events
+        self.failures += other.failures
+
+
+Aggregate = dict[GroupKey, GroupStats]
+
+
+class WindowClock:
+    """Map ISO-8601 timestamps to window starts, parsing each minute prefix only once."""
+
+    def __init__(self, window_seconds: int) -> None:
+        self.window_seconds = window_seconds
+        self._minutes: dict[str, int] = {}
+
+    def window_start(self, ts: Any) -> int:
+        if self.window_seconds <= 0 or not isinstance(ts, str) or len(ts) < 19:
+            return 0
+        prefix = ts[:16]
+        minute = self._minutes.get(prefix)
+        if minute is None:
+            try:
+                parsed = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            except ValueError:
+                return 0
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=UTC)
+            minute = int(parsed.timestamp()) - parsed.second
+            if len(self._minutes) > 100_000:
+                self._minutes.clear()
+            self._minutes[prefix] = minute
+        try:
+            second = int(ts[17:19])
+        except ValueError:
+            second = 0
+        epoch = minute + second
+        return epoch - epoch % self.window_seconds
+
+
+def accumulate(
+    lines: Iterable[bytes], source: str, window_seconds: int, error_pattern: str, aggregate: Aggregate
+) -> None:
+    clock = WindowClock(window_seconds)
+    is_error = re.compile(error_pattern).search
+    for line in lines:
+        if not line or line[:1] != b"{":
+            continue
+        try:
+            event = _loads(line)
+        except ValueError:
+            continue
+        op_id = str(event.get("opId", "unknown"))
+        code = str(event.get("code", "unknown"))
+        key = (source, op_id, code, clock.window_start(event.get("ts")))
+        stats = aggregate.get(key)
+        if stats is None:
+            stats = aggregate[key] = GroupStats()
+        stats.events += 1
+        if is_error(code):
+            stats.failures += 1
+        duration = event.get("duration_ms")
+        if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+            stats.sketch.add(float(duration))
+
+
+def iter_mmap_lines(buffer: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    position = start
+    while position < end:
+        newline = buffer.find(b"\n", position, end)
+        if newline == -1:
+            newline = end
+        yield buffer[position:newline].strip()
+        position = newline + 1
+
+
+def chunk_ranges(path: Path, workers: int) -> list[tuple[int, int]]:
+    """Split a file into newline-aligned byte ranges, several per worker for load balancing."""
+
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    target = max(MIN_CHUNK_BYTES, size // (max(workers, 1) * 4))
+    ranges: list[tuple[int, int]] = []
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        start = 0
+        while start < size:
+            end = min(start + target, size)
+            if end < size:
+                newline = buffer.find(b"\n", end)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def analyze_range(
+    path: str, start: int, end: int, source: str, window_seconds: int, error_pattern: str
+) -> Aggregate:
+    aggregate: Aggregate = {}
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        accumulate(iter_mmap_lines(buffer, start, end), source, window_seconds, error_pattern, aggregate)
+    return aggregate
+
+
+def analyze_gzip(path: str, source: str, window_seconds: int, error_pattern: str) -> Aggregate:
+    aggregate: Aggregate = {}
+    with gzip.open(path, "rb") as handle:
+        accumulate((line.strip() for line in handle), source, window_seconds, error_pattern, aggregate)
+    return aggregate
+
+
+def merge_into(target: Aggregate, partial: Aggregate) -> None:
+    for key, stats in partial.items():
+        existing = target.get(key)
+        if existing is None:
+            target[key] = stats
+        else:
+            existing.merge(stats)
+
+
+def is_gzip(path: Path) -> bool:
+    with path.open("rb") as handle:
+        return handle.read(2) == b"\x1f\x8b"
+
+
+def analyze_files(
+    inputs: Sequence[tuple[str, Path]], window_seconds: int, error_pattern: str, workers: int
+) -> Aggregate:
+    aggregate: Aggregate = {}
+    jobs: list[tuple[Any, ...]] = []
+    for source, path in inputs:
+        if is_gzip(path):
+            jobs.append((analyze_gzip, str(path), source, window_seconds, error_pattern))
+        else:
+            for start, end in chunk_ranges(path, workers):
+                jobs.append((analyze_range, str(path), start, end, source, window_seconds, error_pattern))
+
+    if workers <= 1 or len(jobs) <= 1:
+        for func, *args in jobs:
+            merge_into(aggregate, func(*args))
+        return aggregate
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, *args) for func, *args in jobs]
+        for future in futures:
+            merge_into(aggregate, future.result())
+    return aggregate
+
+
+def summarize(stats: GroupStats) -> dict[str, Any]:
+    sketch = stats.sketch
+    has_latency = sketch.count > 0
+
+    def rounded(value: float | None) -> float | None:
+        return round(value, 2) if value is not None else None
+
+    return {
+        "iterations": stats.events,
+        "successes": stats.events - stats.failures,
+        "failures": stats.failures,
+        "min_ms": rounded(sketch.minimum) if has_latency else None,
+        "avg_ms": rounded(sketch.total / sketch.count) if has_latency else None,
+        "p95_ms": rounded(sketch.quantile(0.95)),
+        "max_ms": rounded(sketch.maximum) if has_latency else None,
+    }
+
+
+def rollup(aggregate: Aggregate, source: str, excluded_ops: Iterable[str] = ()) -> GroupStats:
+    excluded = frozenset(excluded_ops)
+    total = GroupStats()
+    for (group_source, op_id, _, _), stats in aggregate.items():
+        if group_source == source and op_id not in excluded:
+            total.merge(stats)
+    return total
+
+
+def build_report(
+    aggregate: Aggregate, window_seconds: int, excluded_ops: Sequence[str] = DEFAULT_EXCLUDED_OPS
+) -> dict[str, Any]:
+    results = []
+    for (source, op_id, code, window_start), stats in sorted(aggregate.items()):
+        entry = {"source": source, "opId": op_id, "code": code}
+        if window_seconds > 0:
+            entry["window_start"] = datetime.utcfromtimestamp(window_start).isoformat() + "Z"
+        entry.update(summarize(stats))
+        results.append(entry)
+
+    api = rollup(aggregate, "api", excluded_ops)
+    ocr = rollup(aggregate, "ocr", excluded_ops)
+
+    def rate(stats: GroupStats) -> float | None:
+        return round(stats.failures / stats.events * 100, 3) if stats.events else None
+
+    guardrails = {
+        "api_p95_ms": summarize(api)["p95_ms"],
+        "api_error_rate_pct": rate(api),
+        "ocr_p95_ms": summarize(ocr)["p95_ms"],
+        "ocr_failure_rate_pct": rate(ocr),
+    }
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "window_seconds": window_seconds,
+        "excluded_ops": sorted(excluded_ops),
+        "guardrails": guardrails,
+        "results": results,
+    }
+
+
+def append_markdown(report: dict[str, Any]) -> None:
+    timestamp = report["generated_at"]
+    guardrails = report["guardrails"]
+
+    def cell(value: Any, suffix: str = "") -> str:
+        return f"{value}{suffix}" if value is not None else "n/a"
+
+    rows = [
+        "| Metric | Value | Threshold |",
+        "| --- | --- | --- |",
+        f"| API p95 (ms) | {cell(guardrails['api_p95_ms'])} | 1000 |",
+        f"| API error rate | {cell(guardrails['api_error_rate_pct'], '%')} | 1% |",
+        f"| OCR p95 (ms) | {cell(guardrails['ocr_p95_ms'])} | 2000 |",
+        f"| OCR failure rate | {cell(guardrails['ocr_failure_rate_pct'], '%')} | - |",
+    ]
+
+    COST_DOC.parent.mkdir(parents=True, exist_ok=True)
+    with COST_DOC.open("a", encoding="utf-8") as handle:
+        handle.write(f"\n## Log Metrics ({timestamp})\n\n")
+        handle.write("\n".join(rows))
+        handle.write("\n")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compute guardrail metrics from JSON log lines")
+    parser.add_argument("--api", action="append", type=Path, default=[], help="API log file (plain or gzip NDJSON)")
+    parser.add_argument("--ocr", action="append", type=Path, default=[], help="OCR worker log file (plain or gzip NDJSON)")
+    parser.add_argument("--window", type=int, default=300, help="Window size in seconds; 0 disables windowing (default: 300)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel parser processes")
+    parser.add_argument(
+        "--error-pattern",
+        default=DEFAULT_ERROR_PATTERN,
+        help=f"Regex matched against `code` to count failures (default: {DEFAULT_ERROR_PATTERN!r})",
+    )
+    parser.add_argument(
+        "--exclude-op",
+        action="append",
+        default=[],
+        help=f"opId to leave out of the guardrail rollups, in addition to {', '.join(DEFAULT_EXCLUDED_OPS)}",
+    )
+    parser.add_argument(
+        "--include-op",
+        action="append",
+        default=[],
+        help="Default-excluded opId to count in the guardrail rollups after all",
+    )
+    parser.add_argument("--append", action="store_true", help="Append markdown summary to cost-guardrails doc")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    inputs = [("api", path) for path in args.api] + [("ocr", path) for path in args.ocr]
+    if not inputs:
+        raise SystemExit("Provide at least one --api or --ocr log file")
+
+    aggregate = analyze_files(inputs, args.window, args.error_pattern, args.workers)
+    excluded = [op for op in (*DEFAULT_EXCLUDED_OPS, *args.exclude_op) if op not in args.include_op]
+    report = build_report(aggregate, args.window, excluded)
+    json.dump(report, fp=sys.stdout)
+    sys.stdout.write("\n")
+
+    if args.append:
+        append_markdown(report)
+
+
+if __name__ == "__main__":
+    main()
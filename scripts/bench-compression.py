@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark API payload serialization and response compression.
+
+Example usage::
+
+    python scripts/bench-compression.py --tasks 5000 --repeat 5
+
+A synthetic timeline payload is serialized with the stdlib encoder and orjson,
+then compressed with every codec the API can negotiate. For each codec the
+script reports CPU time against bytes saved and prints a JSON summary.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.apps.api.service.compression import _CODECS  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None  # type: ignore[assignment]
+
+STATUSES = ("queued", "under_review", "approved", "rejected")
+
+
+def build_timeline(tasks: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2025, 11, 1, 6, 0, 0)
+    timeline = []
+    for index in range(tasks):
+        timeline.append(
+            {
+                "task_id": f"task-{index:06d}",
+                "container_id": f"MSCU{rng.randint(0, 999999):06d}{rng.randint(0, 9)}",
+                "status": rng.choice(STATUSES),
+                "captured_at": (start + timedelta(seconds=index * 37)).isoformat() + "Z",
+                "location": {"lat": round(rng.uniform(13.0, 13.2), 3), "lon": round(rng.uniform(100.8, 101.0), 3)},
+                "confidence": round(rng.uniform(0.6, 1.0), 4),
+                "uploader": "***@operator.example.co.th",
+            }
+        )
+    return timeline
+
+
+def cpu_ms(repeat: int, func: Callable[[], Any]) -> tuple[float, Any]:
+    best = float("inf")
+    result: Any = None
+    for _ in range(repeat):
+        start_ns = time.process_time_ns()
+        result = func()
+        best = min(best, (time.process_time_ns() - start_ns) / 1_000_000)
+    return best, result
+
+
+def compress(encoding: str, payload: bytes, chunk_size: int) -> bytes:
+    factory, level = _CODECS[encoding]
+    compressor = factory(level)
+    parts = [compressor.compress(payload[index : index + chunk_size]) for index in range(0, len(payload), chunk_size)]
+    parts.append(compressor.flush())
+    return b"".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API serialization and compression")
+    parser.add_argument("--tasks", type=int, default=2000, help="Timeline entries in the payload (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions (default: 5)")
+    parser.add_argument("--chunk-size", type=int, default=16384, help="Streaming chunk size in bytes")
+    parser.add_argument("--seed", type=int, default=29, help="Random seed for synthetic data")
+    args = parser.parse_args()
+
+    timeline = build_timeline(args.tasks, args.seed)
+    serializers: dict[str, Callable[[], bytes]] = {
+        "json": lambda: json.dumps(timeline, ensure_ascii=False, separators=(",", ":")).encode(),
+    }
+    if orjson is not None:
+        serializers["orjson"] = lambda: orjson.dumps(timeline)
+
+    serialization = []
+    payload = b""
+    for name, func in serializers.items():
+        elapsed, payload = cpu_ms(args.repeat, func)
+        serialization.append({"name": name, "cpu_ms": round(elapsed, 3), "bytes": len(payload)})
+
+    compression = []
+    for encoding in _CODECS:
+        elapsed, compressed = cpu_ms(args.repeat, lambda encoding=encoding: compress(encoding, payload, args.chunk_size))
+        saved = len(payload) - len(compressed)
+        compression.append(
+            {
+                "encoding": encoding,
+                "cpu_ms": round(elapsed, 3),
+                "bytes_in": len(payload),
+                "bytes_out": len(compressed),
+                "ratio": round(len(payload) / len(compressed), 2),
+                "kb_saved_per_cpu_ms": round(saved / 1024 / elapsed, 2) if elapsed else None,
+            }
+        )
+
+    result = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "tasks": args.tasks,
+        "repeat": args.repeat,
+        "serialization": serialization,
+        "compression": compression,
+    }
+    json.dump(result, fp=sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
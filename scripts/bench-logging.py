@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark structured log encoding for the API and OCR worker.
+
+Example usage::
+
+    python scripts/bench-logging.py --events 200000
+
+For each service the script times the previous dict + `json.dumps` encoder and
+the current `log_event` implementation, reporting nanoseconds per event. Log
+records are routed to a handler that discards them so only encoding and the
+logging call itself are measured.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SERVICES = {
+    "api": ROOT_DIR / "src" / "apps" / "api" / "service" / "logging.py",
+    "ocr-worker": ROOT_DIR / "src" / "apps" / "ocr-worker" / "ocr" / "logging.py",
+}
+
+
+class DiscardHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        record.getMessage()
+
+
+def load_module(name: str, path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(f"bench_{name.replace('-', '_')}_logging", path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Failed to load {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_log_event(
+    logger: logging.Logger, *, op_id: str, code: str, duration_ms: int, message: str, **extra: Any
+) -> None:
+    """Previous implementation (with the timezone fix) kept as the baseline."""
+    payload = {
+        "ts": datetime.now(tz=UTC).isoformat(),
+        "opId": op_id,
+        "code": code,
+        "duration_ms": duration_ms,
+        "message": message,
+    }
+    if extra:
+        payload.update(extra)
+    logger.info(json.dumps(payload, separators=(",", ":")))
+
+
+def ns_per_event(events: int, repeat: int, func: Callable[..., None], logger: logging.Logger) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start_ns = time.perf_counter_ns()
+        for index in range(events):
+            func(logger, op_id="upload", code="OK", duration_ms=index, message="image accepted", request_id="req-1")
+        best = min(best, (time.perf_counter_ns() - start_ns) / events)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark structured log encoding")
+    parser.add_argument("--events", type=int, default=100_000, help="Events per run (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions (default: 3)")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("container_base.bench")
+    logger.handlers = [DiscardHandler()]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    results = []
+    for service, path in SERVICES.items():
+        module = load_module(service, path)
+        before = ns_per_event(args.events, args.repeat, legacy_log_event, logger)
+        after = ns_per_event(args.events, args.repeat, module.log_event, logger)
+        results.append(
+            {
+                "service": service,
+                "events": args.events,
+                "before_ns_per_event": round(before),
+                "after_ns_per_event": round(after),
+                "speedup": round(before / after, 2),
+            }
+        )
+
+    json.dump({"generated_at": datetime.utcnow().isoformat(), "results": results}, fp=sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
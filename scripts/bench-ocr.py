@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Benchmark the OCR recognizer cascade on a labelled sample set.
+
+Example usage::
+
+    python scripts/bench-ocr.py \
+        --samples samples/containers \
+        --tier ocr.backends:TesseractRecognizer \
+        --tier ocr.backends:PaddleRecognizer
+
+The sample directory must contain ``labels.csv`` with ``image,container_id``
+rows (image paths relative to the directory). Each ``--tier`` is a
+``module:factory`` import path resolved with ``src/apps/ocr-worker`` on
+``sys.path``; the factory is called without arguments and must return a
+recognizer. Tiers run in the order given.
+
+The script reports the cascade's average cost per image, its accuracy, and
+per-tier hit rates, alongside a baseline that runs only the last (heaviest)
+tier, and prints a JSON summary to stdout.
+
+``--onnx PATH`` adds an ONNX Runtime tier for a model file (an INT8
+``<stem>.int8.onnx`` sibling is preferred when present). With ``--compare``,
+every tier is instead benchmarked on its own for latency percentiles and
+throughput (images per second) over ``--rounds`` passes of the sample set.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib
+import json
+import sys
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+OCR_ROOT = ROOT_DIR / "src" / "apps" / "ocr-worker"
+sys.path.insert(0, str(OCR_ROOT))
+
+from ocr.onnx_backend import OnnxRecognizer, thread_settings  # noqa: E402
+from ocr.recognition import Recognizer, RecognizerCascade, normalize_container_number  # noqa: E402
+
+
+def load_samples(directory: Path) -> list[tuple[str, bytes, str]]:
+    labels = directory / "labels.csv"
+    if not labels.exists():
+        raise SystemExit(f"Expected {labels} with image,container_id rows")
+    samples = []
+    with labels.open("r", encoding="utf-8", newline="") as handle:
+        for row in csv.DictReader(handle):
+            image_path = directory / row["image"]
+            samples.append((row["image"], image_path.read_bytes(), normalize_container_number(row["container_id"])))
+    return samples
+
+
+def load_tier(spec: str) -> Recognizer:
+    module_name, _, factory_name = spec.partition(":")
+    if not factory_name:
+        raise SystemExit(f"Tier {spec!r} must use the module:factory form")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory()
+
+
+def run(cascade: RecognizerCascade, samples: Sequence[tuple[str, bytes, str]]) -> dict[str, Any]:
+    total_ms = 0.0
+    correct = 0
+    accepted = 0
+    for _, image, expected in samples:
+        result = cascade.recognize(image)
+        total_ms += result.duration_ms
+        accepted += int(result.accepted)
+        if result.recognition is not None and result.recognition.text == expected:
+            correct += 1
+    count = len(samples) or 1
+    return {
+        "images": len(samples),
+        "avg_ms_per_image": round(total_ms / count, 3),
+        "accepted_rate": round(accepted / count, 4),
+        "accuracy": round(correct / count, 4),
+        "tiers": cascade.stats(),
+    }
+
+
+def compare(tier: Recognizer, samples: Sequence[tuple[str, bytes, str]], rounds: int) -> dict[str, Any]:
+    if hasattr(tier, "load"):
+        tier.load()
+    latencies: list[float] = []
+    correct = 0
+    wall_start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for _, image, expected in samples:
+            start_ns = time.perf_counter_ns()
+            reading = tier.recognize(image)
+            latencies.append((time.perf_counter_ns() - start_ns) / 1_000_000)
+            if reading is not None and normalize_container_number(reading.text) == expected:
+                correct += 1
+    wall_s = (time.perf_counter_ns() - wall_start) / 1_000_000_000
+    latencies.sort()
+
+    def percentile(fraction: float) -> float | None:
+        if not latencies:
+            return None
+        return round(latencies[int(round(fraction * (len(latencies) - 1)))], 3)
+
+    return {
+        "name": tier.name,
+        "runs": len(latencies),
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "max_ms": round(latencies[-1], 3) if latencies else None,
+        "images_per_s": round(len(latencies) / wall_s, 2) if wall_s else None,
+        "accuracy": round(correct / len(latencies), 4) if latencies else None,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the OCR recognizer cascade")
+    parser.add_argument("--samples", type=Path, required=True, help="Directory with labels.csv and images")
+    parser.add_argument("--tier", action="append", dest="tiers", default=[], help="Recognizer factory (module:factory)")
+    parser.add_argument("--onnx", action="append", type=Path, default=[], help="ONNX model file to add as a tier")
+    parser.add_argument("--min-confidence", type=float, default=0.85, help="Acceptance threshold (default: 0.85)")
+    parser.add_argument("--compare", action="store_true", help="Benchmark each tier on its own instead of the cascade")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the sample set in --compare mode")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    samples = load_samples(args.samples)
+    tiers = [load_tier(spec) for spec in args.tiers]
+    intra, inter = thread_settings({})
+    tiers += [
+        OnnxRecognizer(path, name=path.stem, intra_op_threads=intra, inter_op_threads=inter) for path in args.onnx
+    ]
+    if not tiers:
+        raise SystemExit("Provide at least one --tier or --onnx backend")
+
+    if args.compare:
+        payload = {
+            "generated_at": datetime.utcnow().isoformat(),
+            "rounds": args.rounds,
+            "images": len(samples),
+            "results": [compare(tier, samples, args.rounds) for tier in tiers],
+        }
+        json.dump(payload, fp=sys.stdout)
+        sys.stdout.write("\n")
+        return
+
+    cascade = run(RecognizerCascade(tiers, min_confidence=args.min_confidence), samples)
+    baseline = run(RecognizerCascade(tiers[-1:], min_confidence=args.min_confidence), samples)
+
+    payload = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "min_confidence": args.min_confidence,
+        "cascade": cascade,
+        "heaviest_only": baseline,
+        "cost_ratio": round(cascade["avg_ms_per_image"] / baseline["avg_ms_per_image"], 3)
+        if baseline["avg_ms_per_image"]
+        else None,
+    }
+    json.dump(payload, fp=sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark scalar versus bulk PDPA masking helpers.
+
+Example usage::
+
+    python scripts/bench-pdpa.py --rows 1000000 --repeat 3
+
+The script generates synthetic emails and GPS coordinates, times the scalar
+`mask_email`/`round_gps` loops against `mask_emails`/`round_gps_array`, checks
+that both produce identical output, and prints a JSON summary to stdout.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.apps.api.service import pdpa  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None  # type: ignore[assignment]
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> tuple[float, Any]:
+    best = float("inf")
+    result: Any = None
+    for _ in range(repeat):
+        start_ns = time.perf_counter_ns()
+        result = func()
+        best = min(best, (time.perf_counter_ns() - start_ns) / 1_000_000)
+    return best, result
+
+
+def build_dataset(rows: int, seed: int) -> tuple[list[str], list[float], list[float]]:
+    rng = random.Random(seed)
+    emails = [f"user{index}@site{index % 97}.example.co.th" for index in range(rows)]
+    latitudes = [rng.uniform(5.0, 21.0) for _ in range(rows)]
+    longitudes = [rng.uniform(97.0, 106.0) for _ in range(rows)]
+    return emails, latitudes, longitudes
+
+
+def entry(name: str, rows: int, scalar_ms: float, bulk_ms: float, identical: bool) -> dict[str, Any]:
+    return {
+        "name": name,
+        "rows": rows,
+        "scalar_ms": round(scalar_ms, 2),
+        "bulk_ms": round(bulk_ms, 2),
+        "scalar_rows_per_s": round(rows / (scalar_ms / 1000)) if scalar_ms else None,
+        "bulk_rows_per_s": round(rows / (bulk_ms / 1000)) if bulk_ms else None,
+        "speedup": round(scalar_ms / bulk_ms, 2) if bulk_ms else None,
+        "identical": identical,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk PDPA masking helpers")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows per dataset (default: 200000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions (default: 3)")
+    parser.add_argument("--seed", type=int, default=26, help="Random seed for synthetic data")
+    args = parser.parse_args()
+
+    emails, latitudes, longitudes = build_dataset(args.rows, args.seed)
+    results = []
+
+    scalar_ms, scalar_emails = best_of(args.repeat, lambda: [pdpa.mask_email(email) for email in emails])
+    bulk_ms, bulk_emails = best_of(args.repeat, lambda: pdpa.mask_emails(emails))
+    results.append(entry("mask_emails", args.rows, scalar_ms, bulk_ms, scalar_emails == bulk_emails))
+
+    scalar_ms, scalar_gps = best_of(
+        args.repeat, lambda: [pdpa.round_gps(lat, lon) for lat, lon in zip(latitudes, longitudes, strict=True)]
+    )
+    lat_input: Any = latitudes
+    lon_input: Any = longitudes
+    if np is not None:
+        lat_input = np.asarray(latitudes, dtype=np.float64)
+        lon_input = np.asarray(longitudes, dtype=np.float64)
+    bulk_ms, (bulk_lat, bulk_lon) = best_of(args.repeat, lambda: pdpa.round_gps_array(lat_input, lon_input))
+    bulk_gps = list(zip((float(v) for v in bulk_lat), (float(v) for v in bulk_lon), strict=True))
+    results.append(entry("round_gps_array", args.rows, scalar_ms, bulk_ms, scalar_gps == bulk_gps))
+
+    payload = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "numpy": np is not None,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    json.dump(payload, fp=sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Compare bulk review writes with per-item updates against a database stand-in.
+
+Example usage::
+
+    python scripts/bench-review.py --tasks 500 --rtt-ms 2
+    python scripts/bench-review.py --database-url postgresql://postgres@localhost/cb --tasks 500
+
+Both modes use `TaskStore` from the API. "Per-item" reviews one task per
+transaction, as the portal did with one PATCH per row; "bulk" clears every
+task with a single `bulk_review` call. `--rtt-ms` adds a simulated network
+round trip to every statement so a local SQLite file approximates a remote
+Postgres such as Supabase.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+TASKS_PATH = ROOT_DIR / "src" / "apps" / "api" / "service" / "tasks.py"
+
+
+def load_tasks() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("bench_api_tasks", TASKS_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Failed to load {TASKS_PATH}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class RoundTripCursor:
+    """Cursor proxy that sleeps once per statement and counts statements."""
+
+    def __init__(self, cursor: Any, rtt: float, counter: dict[str, int]) -> None:
+        self._cursor = cursor
+        self._rtt = rtt
+        self._counter = counter
+
+    def execute(self, sql: str, params: Any = ()) -> Any:
+        self._counter["statements"] += 1
+        if self._rtt:
+            time.sleep(self._rtt)
+        return self._cursor.execute(sql, params)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class RoundTripConnection:
+    def __init__(self, connection: Any, rtt: float, counter: dict[str, int]) -> None:
+        self._connection = connection
+        self._rtt = rtt
+        self._counter = counter
+
+    def cursor(self) -> RoundTripCursor:
+        return RoundTripCursor(self._connection.cursor(), self._rtt, self._counter)
+
+    def commit(self) -> None:
+        self._counter["statements"] += 1
+        if self._rtt:
+            time.sleep(self._rtt)
+        self._connection.commit()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+
+def seed(store: Any, connect: Callable[[], Any], placeholder: str, tasks: int) -> list:
+    ids = [f"bench-{index:06d}" for index in range(tasks)]
+    store.create_schema()
+    connection = connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM container_events WHERE id LIKE 'bench-%'")
+        cursor.executemany(
+            f"INSERT INTO container_events (id, status) VALUES ({placeholder}, {placeholder})",
+            [(task_id, "under_review") for task_id in ids],
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    return ids
+
+
+def run(tasks_module: ModuleType, connect: Callable[[], Any], placeholder: str, args: argparse.Namespace) -> dict:
+    results = {}
+    for mode in ("per_item", "bulk"):
+        counter = {"statements": 0}
+
+        def instrumented(counter: dict[str, int] = counter) -> RoundTripConnection:
+            return RoundTripConnection(connect(), args.rtt_ms / 1000, counter)
+
+        store = tasks_module.TaskStore(instrumented, placeholder=placeholder, batch_size=args.batch_size)
+        ids = seed(tasks_module.TaskStore(connect, placeholder=placeholder), connect, placeholder, args.tasks)
+        counter["statements"] = 0
+
+        start = time.perf_counter()
+        if mode == "bulk":
+            updated = store.bulk_review(ids, "approve", "bench-admin").updated
+        else:
+            updated = sum(store.bulk_review([task_id], "approve", "bench-admin").updated for task_id in ids)
+        elapsed = time.perf_counter() - start
+
+        results[mode] = {
+            "updated": updated,
+            "statements": counter["statements"],
+            "total_ms": round(elapsed * 1000, 2),
+            "us_per_task": round(elapsed / args.tasks * 1_000_000, 2),
+        }
+    results["speedup"] = round(results["per_item"]["total_ms"] / max(results["bulk"]["total_ms"], 1e-9), 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk vs per-item review writes")
+    parser.add_argument("--tasks", type=int, default=500, help="Tasks to review (default: 500)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Ids per UPDATE statement (default: 500)")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Simulated round trip per statement (default: 0)")
+    parser.add_argument("--database-url", help="postgresql:// URL; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    tasks_module = load_tasks()
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.database_url:
+            import psycopg
+
+            def connect() -> Any:
+                return psycopg.connect(args.database_url)
+
+            placeholder = "%s"
+            backend = "postgresql"
+        else:
+            path = str(Path(workdir) / "bench.db")
+
+            def connect() -> Any:
+                return sqlite3.connect(path)
+
+            placeholder = "?"
+            backend = "sqlite"
+
+        summary = {
+            "generated_at": datetime.utcnow().isoformat(),
+            "backend": backend,
+            "tasks": args.tasks,
+            "rtt_ms": args.rtt_ms,
+            **run(tasks_module, connect, placeholder, args),
+        }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Measure the API's CPU and memory cost per image upload.
+
+Example usage::
+
+    python scripts/bench-uploads.py --uploads 5000 --image-kb 2048
+
+Compares issuing a presigned direct-to-storage upload (what `POST /uploads`
+does) with the previous proxy model, in which the API buffered every image
+body and re-sent it to storage. CPU is measured with `time.process_time` and
+peak allocation per upload with `tracemalloc`. Multipart plans are timed with
+the object store's create call stubbed out so only signing work is counted.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import io
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+STORAGE_PATH = ROOT_DIR / "src" / "apps" / "api" / "service" / "storage.py"
+CHUNK_BYTES = 64 * 1024
+
+
+def load_storage() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("bench_api_storage", STORAGE_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Failed to load {STORAGE_PATH}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def proxy_upload(image: bytes) -> int:
+    """Baseline: read the request body in chunks, buffer it, and copy it into an outbound request."""
+    stream = io.BytesIO(image)
+    chunks = []
+    while chunk := stream.read(CHUNK_BYTES):
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    outbound = io.BytesIO()
+    for offset in range(0, len(body), CHUNK_BYTES):
+        outbound.write(body[offset : offset + CHUNK_BYTES])
+    return outbound.tell()
+
+
+def measure(uploads: int, func: Callable[[int], object]) -> dict[str, float]:
+    start_cpu = time.process_time()
+    for index in range(uploads):
+        func(index)
+    cpu_us = (time.process_time() - start_cpu) / uploads * 1_000_000
+
+    tracemalloc.start()
+    func(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_us_per_upload": round(cpu_us, 2), "peak_kib_per_upload": round(peak / 1024, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure per-upload API CPU and memory")
+    parser.add_argument("--uploads", type=int, default=2000, help="Uploads per scenario (default: 2000)")
+    parser.add_argument("--image-kb", type=int, default=2048, help="Image size in KiB (default: 2048)")
+    args = parser.parse_args()
+
+    storage = load_storage()
+    presigner = storage.S3Presigner(
+        "https://example.supabase.co/storage/v1/s3",
+        region="ap-southeast-1",
+        access_key_id="bench-access",
+        secret_access_key="bench-secret",
+        bucket="container-images",
+    )
+    service = storage.UploadService(presigner)
+    service._create_multipart = lambda key, content_type: "bench-upload-id"
+    image = b"\xff" * (args.image_kb * 1024)
+    multipart_size = 3 * storage.MIN_PART_BYTES
+    loop = asyncio.new_event_loop()
+
+    def direct_single(index: int) -> object:
+        return loop.run_until_complete(service.plan_upload(f"uploads/bench/{index}.jpg", len(image), "image/jpeg"))
+
+    def direct_multipart(index: int) -> object:
+        return loop.run_until_complete(service.plan_upload(f"uploads/bench/{index}.jpg", multipart_size, "image/jpeg"))
+
+    summary = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "uploads": args.uploads,
+        "image_bytes": len(image),
+        "scenarios": {
+            "proxy": measure(args.uploads, lambda index: proxy_upload(image)),
+            "direct_single_put": measure(args.uploads, direct_single),
+            "direct_multipart_3_parts": measure(args.uploads, direct_multipart),
+        },
+    }
+    loop.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,19 +10,35 @@ The script accepts an optional JSON file describing current usage metrics:
 If no file is supplied, baseline sample data is used. The script prints a JSON
 summary to stdout and, when `--append` is provided, appends a markdown table to
 `docs/deployment/observability.md`.
+
+With `--samples`, the script instead reads a time series of usage samples as
+NDJSON or CSV (`ts,service,metric,used,limit`; `ts` is ISO-8601 or epoch
+seconds) and forecasts when each quota will be exhausted, using either an
+EWMA of the burn rate or a linear fit over the current billing period. Pass
+`--state` to persist reader offsets and fit state so repeated runs only read
+samples appended since the previous run.
 """
 from __future__ import annotations
 
 import argparse
+import csv
 import json
+import math
+import sys
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Iterable, List, Sequence
-import sys
+from typing import Any
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OBS_DOC = ROOT_DIR / "docs" / "deployment" / "observability.md"
+SECONDS_PER_DAY = 86_400.0
+# Forecasted exhaustion inside this horizon escalates an "ok" quota to "warning".
+FORECAST_HORIZON_DAYS = 7.0
+# Two-sided 95% band for burn-rate forecasts.
+CONFIDENCE_Z = 1.96
+CSV_FIELDS = ("ts", "service", "metric", "used", "limit")
 
 
 @dataclass(frozen=True)
@@ -33,6 +49,38 @@ class Quota:
     metric: str
     used: float
     limit: float
+    burn_rate_per_day: float | None = None
+    burn_rate_low: float | None = None
+    burn_rate_high: float | None = None
+    forecast_method: str | None = None
+
+    @property
+    def remaining(self) -> float:
+        return max(self.limit - self.used, 0.0)
+
+    @staticmethod
+    def _days_at(remaining: float, rate: float | None) -> float | None:
+        if rate is None:
+            return None
+        if remaining <= 0:
+            return 0.0
+        if rate <= 0:
+            return None  # Not burning; no exhaustion in sight.
+        return round(remaining / rate, 2)
+
+    @property
+    def days_to_exhaustion(self) -> float | None:
+        return self._days_at(self.remaining, self.burn_rate_per_day)
+
+    @property
+    def days_to_exhaustion_low(self) -> float | None:
+        """Pessimistic bound: exhaustion at the upper end of the burn-rate band."""
+        return self._days_at(self.remaining, self.burn_rate_high)
+
+    @property
+    def days_to_exhaustion_high(self) -> float | None:
+        """Optimistic bound: exhaustion at the lower end of the burn-rate band (None if unbounded)."""
+        return self._days_at(self.remaining, self.burn_rate_low)
 
     @property
     def percent(self) -> float:
@@ -48,10 +96,13 @@ class Quota:
             return "critical"
         if self.percent >= 80:
             return "warning"
+        days = self.days_to_exhaustion
+        if days is not None and days <= FORECAST_HORIZON_DAYS:
+            return "warning"
         return "ok"
 
-    def to_dict(self) -> dict[str, float | str]:
-        return {
+    def to_dict(self) -> dict[str, float | str | None]:
+        summary: dict[str, float | str | None] = {
             "service": self.service,
             "metric": self.metric,
             "used": self.used,
@@ -59,6 +110,21 @@ class Quota:
             "percent": self.percent,
             "status": self.status,
         }
+        if self.forecast_method is not None:
+            summary.update(
+                {
+                    "forecast_method": self.forecast_method,
+                    "burn_rate_per_day": _round(self.burn_rate_per_day),
+                    "days_to_exhaustion": self.days_to_exhaustion,
+                    "days_to_exhaustion_low": self.days_to_exhaustion_low,
+                    "days_to_exhaustion_high": self.days_to_exhaustion_high,
+                }
+            )
+        return summary
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 4) if value is not None else None
 
 
 DEFAULT_DATA: Sequence[dict[str, float | str]] = (
@@ -70,7 +136,7 @@ DEFAULT_DATA: Sequence[dict[str, float | str]] = (
 )
 
 
-def load_usage(path: Path | None) -> List[Quota]:
+def load_usage(path: Path | None) -> list[Quota]:
     data: Iterable[dict[str, float | str]]
     if path is None:
         data = DEFAULT_DATA
@@ -81,7 +147,7 @@ def load_usage(path: Path | None) -> List[Quota]:
             raise ValueError("Usage file must contain a JSON array")
         data = raw
 
-    quotas: List[Quota] = []
+    quotas: list[Quota] = []
     for item in data:
         try:
             quota = Quota(
@@ -96,12 +162,232 @@ def load_usage(path: Path | None) -> List[Quota]:
     return quotas
 
 
+@dataclass
+class MetricForecast:
+    """Incremental burn-rate state for one quota metric within a billing period.
+
+    Keeps an EWMA (with variance) of the per-day burn rate between consecutive
+    samples, plus running sums for an ordinary least-squares fit of usage over
+    time. Both update in O(1) per sample, so the state can be persisted and
+    resumed without re-reading earlier samples. A drop in `used` is treated as
+    a quota reset and starts a new period.
+    """
+
+    service: str
+    metric: str
+    limit: float = 0.0
+    last_ts: float | None = None
+    last_used: float = 0.0
+    origin_ts: float | None = None
+    ewma_rate: float | None = None
+    ewma_var: float = 0.0
+    n: int = 0
+    sum_t: float = 0.0
+    sum_y: float = 0.0
+    sum_tt: float = 0.0
+    sum_ty: float = 0.0
+    sum_yy: float = 0.0
+
+    def update(self, ts: float, used: float, limit: float, alpha: float) -> None:
+        if self.last_ts is not None and ts <= self.last_ts:
+            return  # Duplicate or out-of-order sample.
+        if self.last_ts is not None and used < self.last_used:
+            self._reset()
+        if self.origin_ts is None:
+            self.origin_ts = ts
+
+        if self.last_ts is not None:
+            rate = (used - self.last_used) / ((ts - self.last_ts) / SECONDS_PER_DAY)
+            if self.ewma_rate is None:
+                self.ewma_rate = rate
+            else:
+                delta = rate - self.ewma_rate
+                self.ewma_rate += alpha * delta
+                self.ewma_var = (1 - alpha) * (self.ewma_var + alpha * delta * delta)
+
+        t = (ts - self.origin_ts) / SECONDS_PER_DAY
+        self.n += 1
+        self.sum_t += t
+        self.sum_y += used
+        self.sum_tt += t * t
+        self.sum_ty += t * used
+        self.sum_yy += used * used
+        self.last_ts = ts
+        self.last_used = used
+        self.limit = limit
+
+    def _reset(self) -> None:
+        # Forget the previous sample too, so the drop itself is never scored as a burn rate.
+        self.last_ts = None
+        self.origin_ts = None
+        self.ewma_rate = None
+        self.ewma_var = 0.0
+        self.n = 0
+        self.sum_t = self.sum_y = self.sum_tt = self.sum_ty = self.sum_yy = 0.0
+
+    def ewma_band(self) -> tuple[float | None, float | None, float | None]:
+        if self.ewma_rate is None:
+            return None, None, None
+        spread = CONFIDENCE_Z * math.sqrt(self.ewma_var)
+        return self.ewma_rate, self.ewma_rate - spread, self.ewma_rate + spread
+
+    def linear_band(self) -> tuple[float | None, float | None, float | None]:
+        if self.n < 2:
+            return None, None, None
+        sxx = self.sum_tt - self.sum_t * self.sum_t / self.n
+        if sxx <= 0:
+            return None, None, None
+        sxy = self.sum_ty - self.sum_t * self.sum_y / self.n
+        syy = self.sum_yy - self.sum_y * self.sum_y / self.n
+        slope = sxy / sxx
+        if self.n < 3:
+            return slope, slope, slope
+        residual = max(syy - slope * sxy, 0.0) / (self.n - 2)
+        spread = CONFIDENCE_Z * math.sqrt(residual / sxx)
+        return slope, slope - spread, slope + spread
+
+    def to_quota(self, method: str) -> Quota:
+        rate, low, high = self.linear_band() if method == "linear" else self.ewma_band()
+        return Quota(
+            service=self.service,
+            metric=self.metric,
+            used=self.last_used,
+            limit=self.limit,
+            burn_rate_per_day=rate,
+            burn_rate_low=low,
+            burn_rate_high=high,
+            forecast_method=method,
+        )
+
+
+def _parse_ts(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+def _read_new_lines(path: Path, file_state: dict[str, Any]) -> Iterator[str]:
+    """Yield complete lines appended since the stored offset, advancing it as they are read."""
+
+    size = path.stat().st_size
+    if size < file_state.get("offset", 0):
+        raise ValueError(f"{path} shrank since the last run; delete the state file to re-read it")
+    with path.open("rb") as handle:
+        handle.seek(file_state.get("offset", 0))
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                break  # Partial line still being written; pick it up next run.
+            file_state["offset"] = file_state.get("offset", 0) + len(raw)
+            line = raw.decode("utf-8").strip()
+            if line:
+                yield line
+
+
+def iter_samples(path: Path, file_state: dict[str, Any]) -> Iterator[Any]:
+    """Yield one decoded record per new line; malformed lines come through as-is for the caller to reject."""
+
+    is_csv = path.suffix.lower() == ".csv"
+    for line in _read_new_lines(path, file_state):
+        if not is_csv:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
+            continue
+        if "header" not in file_state:
+            file_state["header"] = next(csv.reader([line]))
+            continue
+        # A truncated row simply lacks trailing columns; `update_forecasts` skips it.
+        yield dict(zip(file_state["header"], next(csv.reader([line])), strict=False))
+
+
+def update_forecasts(
+    path: Path, state: dict[str, Any], half_life_samples: float
+) -> dict[str, MetricForecast]:
+    alpha = 1 - 0.5 ** (1 / half_life_samples)
+    forecasts = {key: MetricForecast(**value) for key, value in state.get("metrics", {}).items()}
+    file_state = state.setdefault("files", {}).setdefault(str(path.resolve()), {"offset": 0})
+
+    skipped = 0
+    for item in iter_samples(path, file_state):
+        try:
+            service = str(item["service"])
+            metric = str(item["metric"])
+            ts = _parse_ts(item["ts"])
+            used = float(item["used"])
+            limit = float(item["limit"])
+        except (KeyError, TypeError, ValueError):
+            # The offset has already moved past this line, so one bad row cannot wedge later runs.
+            skipped += 1
+            continue
+        key = f"{service}|{metric}"
+        forecast = forecasts.get(key)
+        if forecast is None:
+            forecast = forecasts[key] = MetricForecast(service=service, metric=metric)
+        forecast.update(ts, used, limit, alpha)
+
+    if skipped:
+        file_state["skipped"] = file_state.get("skipped", 0) + skipped
+        sys.stderr.write(f"warning: skipped {skipped} invalid usage sample(s) in {path}\n")
+    state["metrics"] = {key: vars(forecast) for key, forecast in forecasts.items()}
+    return forecasts
+
+
+def load_state(path: Path | None) -> dict[str, Any]:
+    if path is None or not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_state(path: Path | None, state: dict[str, Any]) -> None:
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(path.suffix + ".tmp")
+    with temp.open("w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    temp.replace(path)
+
+
+def forecast_usage(
+    samples: Path, state_path: Path | None, method: str, half_life_samples: float
+) -> list[Quota]:
+    state = load_state(state_path)
+    forecasts = update_forecasts(samples, state, half_life_samples)
+    save_state(state_path, state)
+    return [forecast.to_quota(method) for forecast in forecasts.values()]
+
+
+def _days_cell(quota: Quota) -> str:
+    if quota.forecast_method is None:
+        return "-"
+    days = quota.days_to_exhaustion
+    if days is None:
+        return "not burning"
+    low = quota.days_to_exhaustion_low
+    high = quota.days_to_exhaustion_high
+    band = f"{low if low is not None else '?'}–{high if high is not None else '∞'}"
+    return f"{days} ({band})"
+
+
 def append_markdown(quotas: Sequence[Quota]) -> None:
     timestamp = datetime.utcnow().isoformat()
-    rows = ["| Service | Metric | Used | Limit | % | Status |", "| --- | --- | --- | --- | --- | --- |"]
+    rows = [
+        "| Service | Metric | Used | Limit | % | Status | Days to exhaustion (95% band) |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
     for quota in quotas:
         rows.append(
-            f"| {quota.service} | {quota.metric} | {quota.used:.2f} | {quota.limit:.2f} | {quota.percent:.2f}% | {quota.status} |"
+            f"| {quota.service} | {quota.metric} | {quota.used:.2f} | {quota.limit:.2f} | {quota.percent:.2f}% | {quota.status} | {_days_cell(quota)} |"
         )
 
     OBS_DOC.parent.mkdir(parents=True, exist_ok=True)
@@ -114,10 +400,21 @@ def append_markdown(quotas: Sequence[Quota]) -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Summarize free-tier quota usage")
     parser.add_argument("--source", type=Path, default=None, help="JSON file containing quota usage data")
+    parser.add_argument("--samples", type=Path, default=None, help="NDJSON or CSV time series of usage samples")
+    parser.add_argument("--state", type=Path, default=None, help="State file for incremental --samples runs")
+    parser.add_argument(
+        "--method", choices=("ewma", "linear"), default="ewma", help="Burn-rate model for --samples (default: ewma)"
+    )
+    parser.add_argument(
+        "--half-life", type=float, default=6.0, help="EWMA half-life in samples (default: 6)"
+    )
     parser.add_argument("--append", action="store_true", help="Append a markdown summary to observability doc")
     args = parser.parse_args()
 
-    quotas = load_usage(args.source)
+    if args.samples is not None:
+        quotas = forecast_usage(args.samples, args.state, args.method, args.half_life)
+    else:
+        quotas = load_usage(args.source)
     summary = [quota.to_dict() for quota in quotas]
     json.dump({"generated_at": datetime.utcnow().isoformat(), "quotas": summary}, fp=sys.stdout)
     sys.stdout.write("\n")
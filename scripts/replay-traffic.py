@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Replay captured request shapes against the API and OCR worker in-process.
+
+Example usage::
+
+    # Capture on a staging revision (sanitized NDJSON, see TRAFFIC_CAPTURE_PATH)
+    python scripts/replay-traffic.py trace.ndjson --speed 1
+    python scripts/replay-traffic.py trace.ndjson --speed 4 --jwt-secret "$JWT_SECRET" --lifespan
+
+Each record is sent to `service.main.app` or `ocr.main.app` (by its `service`
+field) through `httpx.ASGITransport`. Requests are issued at their recorded
+inter-arrival times divided by `--speed`, concurrently, the way they
+originally arrived. Recorded bearer tokens are never stored; with
+`--jwt-secret` the script mints an HS256 token per pseudonymous user so
+authenticated routes see the same per-user mix. The JSON report lists latency
+percentiles per route next to the latency observed at capture time.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import hmac
+import json
+import math
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_ROOTS = {
+    "api": (ROOT_DIR / "src" / "apps" / "api", "service.main"),
+    "ocr": (ROOT_DIR / "src" / "apps" / "ocr-worker", "ocr.main"),
+}
+
+
+def load_trace(paths: Iterable[Path], limit: int | None = None) -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    for path in paths:
+        with path.open(encoding="utf-8") as handle:
+            records.extend(json.loads(line) for line in handle if line.strip())
+    records.sort(key=lambda record: record.get("t", 0.0))
+    return records[:limit] if limit else records
+
+
+def load_app(service: str) -> Any:
+    root, module_name = APP_ROOTS[service]
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    module = __import__(module_name, fromlist=["app"])
+    return module.app
+
+
+def mint_token(secret: str, subject: str, role: str | None) -> str:
+    def segment(data: dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).rstrip(b"=").decode()
+
+    claims: dict[str, Any] = {"sub": subject, "exp": int(time.time()) + 3600}
+    if role:
+        claims["app_metadata"] = {"role": role}
+    signing_input = f"{segment({'alg': 'HS256', 'typ': 'JWT'})}.{segment(claims)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return round(ordered[rank], 3)
+
+
+def build_request(record: dict[str, Any], jwt_secret: str | None, role: str | None) -> dict[str, Any]:
+    headers = dict(record.get("headers") or {})
+    if record.get("auth") and jwt_secret:
+        headers["authorization"] = f"Bearer {mint_token(jwt_secret, headers.get('x-user-id', 'replay'), role)}"
+    request: dict[str, Any] = {
+        "method": record["method"],
+        "url": record["path"] + (f"?{record['query']}" if record.get("query") else ""),
+        "headers": headers,
+    }
+    if record.get("body") is not None:
+        request["json"] = record["body"]
+    elif record.get("body_bytes"):
+        request["content"] = b"\0" * int(record["body_bytes"])
+    return request
+
+
+async def replay(records: list[dict[str, Any]], args: argparse.Namespace) -> dict[str, Any]:
+    import httpx
+
+    services = sorted({record.get("service", "api") for record in records})
+    apps = {service: load_app(service) for service in services}
+    results: dict[str, dict[str, Any]] = defaultdict(
+        lambda: {"latency_ms": [], "captured_ms": [], "statuses": Counter(), "lag_ms": []}
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with contextlib.AsyncExitStack() as stack:
+        clients = {}
+        for service, app in apps.items():
+            if args.lifespan:
+                await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            clients[service] = await stack.enter_async_context(
+                httpx.AsyncClient(transport=transport, base_url=f"http://{service}.replay")
+            )
+
+        async def send(record: dict[str, Any], scheduled: float) -> None:
+            service = record.get("service", "api")
+            route = f"{service} {record['method']} {record['path']}"
+            bucket = results[route]
+            async with semaphore:
+                started = time.perf_counter()
+                bucket["lag_ms"].append((started - scheduled) * 1000)
+                try:
+                    response = await clients[service].request(**build_request(record, args.jwt_secret, args.jwt_role))
+                    status = str(response.status_code)
+                except Exception as exc:  # noqa: BLE001 - reported, not fatal
+                    status = type(exc).__name__
+                bucket["latency_ms"].append((time.perf_counter() - started) * 1000)
+                bucket["statuses"][status] += 1
+                if record.get("duration_ms") is not None:
+                    bucket["captured_ms"].append(float(record["duration_ms"]))
+
+        origin = records[0].get("t", 0.0) if records else 0.0
+        start = time.perf_counter()
+        pending = []
+        for record in records:
+            scheduled = start + (record.get("t", 0.0) - origin) / args.speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pending.append(asyncio.create_task(send(record, scheduled)))
+        await asyncio.gather(*pending)
+        wall = time.perf_counter() - start
+
+    routes = {}
+    every: list[float] = []
+    for route, bucket in sorted(results.items()):
+        every.extend(bucket["latency_ms"])
+        routes[route] = {
+            "requests": len(bucket["latency_ms"]),
+            "statuses": dict(bucket["statuses"]),
+            "p50_ms": percentile(bucket["latency_ms"], 50),
+            "p95_ms": percentile(bucket["latency_ms"], 95),
+            "p99_ms": percentile(bucket["latency_ms"], 99),
+            "max_ms": percentile(bucket["latency_ms"], 100),
+            "captured_p95_ms": percentile(bucket["captured_ms"], 95),
+            "schedule_lag_p95_ms": percentile(bucket["lag_ms"], 95),
+        }
+    return {
+        "requests": len(every),
+        "wall_seconds": round(wall, 3),
+        "achieved_rps": round(len(every) / wall, 2) if wall else None,
+        "p50_ms": percentile(every, 50),
+        "p95_ms": percentile(every, 95),
+        "p99_ms": percentile(every, 99),
+        "routes": routes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay captured traffic against the local ASGI apps")
+    parser.add_argument("trace", nargs="+", type=Path, help="NDJSON trace file(s) written by the capture middleware")
+    parser.add_argument("--speed", type=float, default=1.0, help="Divide recorded inter-arrival times by this factor")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum in-flight requests (default: 256)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--jwt-secret", help="Mint HS256 bearer tokens for requests that carried one")
+    parser.add_argument("--jwt-role", help="app_metadata.role claim for minted tokens (e.g. admin)")
+    parser.add_argument("--lifespan", action="store_true", help="Run each app's lifespan (needs its env vars)")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    records = load_trace(args.trace, args.limit)
+    summary = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "speed": args.speed,
+        **asyncio.run(replay(records, args)),
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""JWT verification with a verified-token cache for the Container Base API."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.request import Request as UrlRequest, urlopen
+
+from fastapi import HTTPException, Request
+
+__all__ = [
+    "AuthError",
+    "JWKSCache",
+    "TokenClaims",
+    "TokenVerifier",
+    "require_user",
+]
+
+_HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+_RSA_ALGORITHMS = {"RS256", "RS384", "RS512"}
+
+
+class AuthError(RuntimeError):
+    """Raised when a bearer token is missing, malformed, expired, or forged."""
+
+
+@dataclass(frozen=True, slots=True)
+class TokenClaims:
+    """Verified claims extracted from a bearer token."""
+
+    subject: str
+    expires_at: float
+    claims: Mapping[str, Any] = field(repr=False)
+
+
+def _b64decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (ValueError, TypeError) as exc:
+        raise AuthError("Token segment is not valid base64url") from exc
+
+
+def _rsa_verifier(jwk: Mapping[str, Any]) -> Callable[[str, bytes, bytes], bool]:
+    """Build an RSA PKCS#1 v1.5 verifier from a JWK; requires the `cryptography` package."""
+
+    try:
+        from cryptography.exceptions import InvalidSignature  # noqa: PLC0415
+        from cryptography.hazmat.primitives import hashes  # noqa: PLC0415
+        from cryptography.hazmat.primitives.asymmetric import padding, rsa  # noqa: PLC0415
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise AuthError("RSA token verification requires the 'cryptography' package") from exc
+
+    public_key = rsa.RSAPublicNumbers(
+        e=int.from_bytes(_b64decode(jwk["e"]), "big"),
+        n=int.from_bytes(_b64decode(jwk["n"]), "big"),
+    ).public_key()
+    digests = {"RS256": hashes.SHA256, "RS384": hashes.SHA384, "RS512": hashes.SHA512}
+
+    def verify(algorithm: str, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            public_key.verify(signature, signing_input, padding.PKCS1v15(), digests[algorithm]())
+        except InvalidSignature:
+            return False
+        return True
+
+    return verify
+
+
+class JWKSCache:
+    """Preloaded JSON Web Key Set with periodic background refresh.
+
+    Tokens with an unknown `kid` trigger an early refresh, at most once per
+    `min_refresh_seconds`, because the `kid` is chosen by whoever sent the token.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        refresh_seconds: float = 3600.0,
+        min_refresh_seconds: float = 60.0,
+        timeout: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.url = url
+        self._refresh_seconds = refresh_seconds
+        self._min_refresh_seconds = min_refresh_seconds
+        self._timeout = timeout
+        self._clock = clock
+        self._verifiers: dict[str, Callable[[str, bytes, bytes], bool]] = {}
+        self._wake: asyncio.Event | None = None
+        self._last_refresh = float("-inf")
+        self.refreshes = 0
+
+    def load(self, jwks: Mapping[str, Any]) -> None:
+        """Replace the key set with RSA signing keys from a JWKS document."""
+
+        verifiers = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kty") == "RSA" and jwk.get("use", "sig") == "sig" and "kid" in jwk:
+                verifiers[str(jwk["kid"])] = _rsa_verifier(jwk)
+        # Swap atomically so concurrent verifications never see a half-built key set.
+        self._verifiers = verifiers
+
+    def refresh(self) -> None:
+        """Fetch and load the key set synchronously (used at startup and from a thread)."""
+
+        self._last_refresh = self._clock()
+        self.refreshes += 1
+        request = UrlRequest(self.url, headers={"Accept": "application/json"}, method="GET")
+        with urlopen(request, timeout=self._timeout) as response:
+            self.load(json.loads(response.read()))
+
+    def get(self, kid: str) -> Callable[[str, bytes, bytes], bool] | None:
+        verifier = self._verifiers.get(kid)
+        if (
+            verifier is None
+            and self._wake is not None
+            and self._clock() - self._last_refresh >= self._min_refresh_seconds
+        ):
+            # Unknown key id usually means the issuer rotated keys; refresh ahead of schedule.
+            self._wake.set()
+        return verifier
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """Refresh the key set every `refresh_seconds` until `stop_event` is set."""
+
+        self._wake = asyncio.Event()
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._refresh_seconds)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            if stop_event.is_set():
+                break
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:  # noqa: BLE001 - keep serving with the previous key set
+                await asyncio.sleep(min(self._refresh_seconds, 30.0))
+
+
+class TokenVerifier:
+    """Verify bearer tokens, caching successful results by token digest until expiry."""
+
+    def __init__(
+        self,
+        *,
+        hmac_secret: str | None = None,
+        jwks: JWKSCache | None = None,
+        max_entries: int = 4096,
+        leeway_seconds: float = 30.0,
+        issuer: str | None = None,
+        audience: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._hmac_key = hmac_secret.encode() if hmac_secret else None
+        self.jwks = jwks
+        self._max_entries = max_entries
+        self._leeway = leeway_seconds
+        self._issuer = issuer
+        self._audience = audience
+        self._clock = clock
+        self._cache: OrderedDict[bytes, TokenClaims] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> TokenClaims:
+        """Return verified claims for `token`, raising AuthError when it is not acceptable."""
+
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            if cached.expires_at > self._clock():
+                self._cache.move_to_end(digest)
+                self.hits += 1
+                return cached
+            del self._cache[digest]
+
+        self.misses += 1
+        claims = self._verify_uncached(token)
+        self._cache[digest] = claims
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return claims
+
+    def _verify_uncached(self, token: str) -> TokenClaims:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+        except ValueError as exc:
+            raise AuthError("Token must have three segments") from exc
+
+        try:
+            header = json.loads(_b64decode(header_segment))
+            payload = json.loads(_b64decode(payload_segment))
+        except ValueError as exc:
+            raise AuthError("Token header or payload is not valid JSON") from exc
+        if not isinstance(header, dict) or not isinstance(payload, dict):
+            raise AuthError("Token header and payload must be JSON objects")
+
+        signing_input = f"{header_segment}.{payload_segment}".encode()
+        signature = _b64decode(signature_segment)
+        algorithm = header.get("alg")
+        if algorithm in _HMAC_ALGORITHMS and self._hmac_key is not None:
+            expected = hmac.new(self._hmac_key, signing_input, _HMAC_ALGORITHMS[algorithm]).digest()
+            valid = hmac.compare_digest(expected, signature)
+        elif algorithm in _RSA_ALGORITHMS and self.jwks is not None:
+            verifier = self.jwks.get(str(header.get("kid", "")))
+            if verifier is None:
+                raise AuthError("Token signing key is unknown")
+            valid = verifier(algorithm, signing_input, signature)
+        else:
+            raise AuthError(f"Token algorithm {algorithm!r} is not accepted")
+        if not valid:
+            raise AuthError("Token signature is invalid")
+
+        return self._validate_claims(payload)
+
+    def _validate_claims(self, payload: dict[str, Any]) -> TokenClaims:
+        now = self._clock()
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, int | float):
+            raise AuthError("Token has no expiry")
+        if expires_at + self._leeway <= now:
+            raise AuthError("Token has expired")
+        not_before = payload.get("nbf")
+        if isinstance(not_before, int | float) and not_before - self._leeway > now:
+            raise AuthError("Token is not yet valid")
+        if self._issuer is not None and payload.get("iss") != self._issuer:
+            raise AuthError("Token issuer is not accepted")
+        if self._audience is not None:
+            audience = payload.get("aud")
+            audiences = audience if isinstance(audience, list) else [audience]
+            if self._audience not in audiences:
+                raise AuthError("Token audience is not accepted")
+        subject = payload.get("sub")
+        if not isinstance(subject, str) or not subject:
+            raise AuthError("Token has no subject")
+
+        # Cache entries expire with the token, including the leeway granted above.
+        return TokenClaims(subject=subject, expires_at=float(expires_at) + self._leeway, claims=payload)
+
+
+async def require_user(request: Request) -> TokenClaims:
+    """FastAPI dependency returning verified claims that match the PDPA consent record."""
+
+    verifier: TokenVerifier | None = getattr(request.app.state, "token_verifier", None)
+    if verifier is None:
+        raise HTTPException(status_code=503, detail="Authentication is not configured")
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Bearer token is required")
+    try:
+        claims = verifier.verify(token.strip())
+    except AuthError as exc:
+        raise HTTPException(status_code=401, detail=str(exc)) from exc
+
+    consent_record = getattr(request.state, "consent_record", None)
+    if consent_record is None or consent_record.user_id != claims.subject:
+        # Consent is tracked per user; a token for a different subject must not ride on it.
+        raise HTTPException(status_code=403, detail="Consent record does not match token subject")
+
+    request.state.auth_claims = claims
+    return claims
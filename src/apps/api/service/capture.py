@@ -0,0 +1,264 @@
+"""Opt-in capture of sanitized request shapes for local replay benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, TextIO
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import pdpa
+
+__all__ = ["TraceWriter", "TrafficCaptureMiddleware", "sanitize_json", "sanitize_request"]
+
+# Only these headers are ever written; everything else (cookies, tokens, IPs) is dropped.
+_KEPT_HEADERS = ("content-type", "accept-encoding", "x-pdpa-consent-status", "x-pdpa-consent-at", "x-capture-mode")
+_GPS_KEYS = frozenset({"lat", "lon", "lng", "latitude", "longitude", "x-gps-lat", "x-gps-lon"})
+# Matches emails embedded in longer text too, e.g. `Name <a@b.com>` or a `/users/a@b.com` segment.
+_EMAIL_PATTERN = re.compile(r"[^@\s<>()\[\],;:\"'/]+@[^@\s<>()\[\],;:\"'/]+")
+
+
+def _mask_emails(text: str) -> str:
+    return _EMAIL_PATTERN.sub(lambda match: pdpa.mask_email(match.group()), text)
+
+
+def _pseudonym(user_id: str, salt: bytes) -> str:
+    return "u-" + hmac.new(salt, user_id.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def _pseudonymize(text: str, user_id: str | None, salt: bytes) -> str:
+    # Whole-token matches only, so `uploads/<id>/a.jpg` is rewritten but `<id>x` is left alone.
+    if not user_id:
+        return text
+    pattern = re.compile(rf"(?<![\w.-]){re.escape(user_id)}(?![\w.-])")
+    return pattern.sub(_pseudonym(user_id, salt), text)
+
+
+def _sanitize_scalar(key: str | None, value: Any, user_id: str | None = None, salt: bytes = b"") -> Any:
+    if key is not None and key.lower() in _GPS_KEYS:
+        try:
+            # Same precision rule as the PDPA middleware: three decimals before anything is stored.
+            return round(float(value), pdpa.GPS_DECIMALS)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, str):
+        return _mask_emails(_pseudonymize(value, user_id, salt))
+    return value
+
+
+def sanitize_json(value: Any, key: str | None = None, *, user_id: str | None = None, salt: bytes = b"") -> Any:
+    """Recursively mask email-shaped strings, round GPS-named fields, and pseudonymize `user_id`.
+
+    Occurrences of `user_id` inside string values (e.g. upload keys like
+    `uploads/<id>/...`) get the same salted pseudonym as the header and path,
+    so replayed requests still pass the per-user key checks.
+    """
+
+    if isinstance(value, dict):
+        return {name: sanitize_json(item, name, user_id=user_id, salt=salt) for name, item in value.items()}
+    if isinstance(value, list):
+        return [sanitize_json(item, key, user_id=user_id, salt=salt) for item in value]
+    return _sanitize_scalar(key, value, user_id, salt)
+
+
+def _sanitize_path(path: str, user_id: str | None, salt: bytes) -> str:
+    return "/".join(
+        _pseudonym(segment, salt) if user_id and segment == user_id else _mask_emails(segment)
+        for segment in path.split("/")
+    )
+
+
+def sanitize_request(
+    method: str,
+    path: str,
+    query_string: str,
+    headers: Mapping[str, str],
+    body: bytes | None,
+    *,
+    salt: bytes,
+) -> dict[str, Any]:
+    """Reduce a request to a replayable shape with PDPA rules applied before it is written.
+
+    User ids become salted pseudonyms (stable within one capture) in headers,
+    path segments, and JSON string values, emails anywhere in the path, query, or JSON body are
+    masked with `pdpa.mask_email`, GPS values follow the `pdpa.round_gps`
+    three-decimal rule, and bearer tokens are recorded only as present/absent.
+    """
+
+    kept = {name: headers[name] for name in _KEPT_HEADERS if name in headers}
+    if "x-user-id" in headers:
+        kept["x-user-id"] = _pseudonym(headers["x-user-id"], salt)
+    if "x-user-email" in headers:
+        kept["x-user-email"] = pdpa.mask_email(headers["x-user-email"])
+    if "x-gps-lat" in headers and "x-gps-lon" in headers:
+        try:
+            lat, lon = pdpa.round_gps(float(headers["x-gps-lat"]), float(headers["x-gps-lon"]))
+            kept["x-gps-lat"], kept["x-gps-lon"] = f"{lat:.3f}", f"{lon:.3f}"
+        except ValueError:
+            pass
+
+    user_id = headers.get("x-user-id")
+    query = urlencode(
+        [(name, _sanitize_scalar(name, value, user_id, salt)) for name, value in parse_qsl(query_string)]
+    )
+    record: dict[str, Any] = {
+        "method": method,
+        "path": _sanitize_path(path, user_id, salt),
+        "query": query,
+        "headers": kept,
+        "auth": headers.get("authorization", "").lower().startswith("bearer "),
+        "body_bytes": len(body) if body is not None else 0,
+        "body": None,
+    }
+    if body and headers.get("content-type", "").startswith("application/json"):
+        try:
+            record["body"] = sanitize_json(json.loads(body), user_id=user_id, salt=salt)
+        except ValueError:
+            pass
+    return record
+
+
+class TraceWriter:
+    """Append NDJSON records, flushing in batches so capture stays off the hot path.
+
+    `write` only buffers and reports when a batch is due; the caller runs
+    `flush` in a worker thread so file I/O never blocks the event loop. Batches
+    are taken under the I/O lock, so they land in the file in order.
+    """
+
+    def __init__(self, path: str | Path, *, flush_every: int = 64, flush_seconds: float = 1.0) -> None:
+        self.path = Path(path)
+        self._flush_every = flush_every
+        self._flush_seconds = flush_seconds
+        self._pending: list[str] = []
+        self._last_flush = time.monotonic()
+        self._flush_due = False
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._file: TextIO | None = None
+
+    def write(self, record: dict[str, Any]) -> bool:
+        """Buffer one record; return True if the caller should now run `flush`."""
+
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._pending.append(line)
+            now = time.monotonic()
+            if self._flush_due or (
+                len(self._pending) < self._flush_every and now - self._last_flush < self._flush_seconds
+            ):
+                return False
+            # Only one caller is told to flush until that flush has taken the batch.
+            self._flush_due = True
+            self._last_flush = now
+            return True
+
+    def flush(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._flush_due = False
+            if not batch:
+                return
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write("\n".join(batch) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class TrafficCaptureMiddleware:
+    """Record sanitized request shapes, arrival offsets, status, and latency.
+
+    Request bodies are teed from `receive` as the application reads them (up to
+    `max_body_bytes`), so capture never buffers or alters what the app sees.
+    `sample_rate` keeps the overhead proportional to the traffic actually kept.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        writer: TraceWriter,
+        service: str = "api",
+        sample_rate: float = 1.0,
+        max_body_bytes: int = 64 * 1024,
+        salt: bytes | None = None,
+    ) -> None:
+        self.app = app
+        self.writer = writer
+        self.service = service
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self._salt = salt or secrets.token_bytes(16)
+        self._origin = time.monotonic()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        chunks: list[bytes] = []
+        size = 0
+        status = 500
+
+        async def tee_receive() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= self.max_body_bytes:
+                    chunks.append(body)
+            return message
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, tee_receive, capture_send)
+        finally:
+            headers = Headers(scope=scope)
+            body = b"".join(chunks) if size <= self.max_body_bytes else None
+            record = sanitize_request(
+                scope["method"],
+                scope["path"],
+                scope.get("query_string", b"").decode("latin-1"),
+                headers,
+                body,
+                salt=self._salt,
+            )
+            if body is None:
+                record["body_bytes"] = size
+            record.update(
+                {
+                    "t": round(arrived - self._origin, 6),
+                    "service": self.service,
+                    "status": status,
+                    "duration_ms": round((time.monotonic() - arrived) * 1000, 3),
+                }
+            )
+            if self.writer.write(record):
+                await asyncio.to_thread(self.writer.flush)
@@ -0,0 +1,190 @@
+"""Negotiated response compression middleware for the Container Base API."""
+from __future__ import annotations
+
+import zlib
+from collections.abc import Callable, Iterable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # Optional codecs; gzip is always available through zlib.
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None  # type: ignore[assignment]
+
+__all__ = ["CompressionMiddleware", "available_encodings", "negotiate_encoding"]
+
+# Content types worth compressing; images and archives are already compressed.
+_COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/javascript", "application/xml")
+_COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _gzip(level: int) -> _Compressor:
+    # wbits=31 selects the gzip container rather than raw zlib.
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def _zstd(level: int) -> _Compressor:
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+# Preference order when the client weights encodings equally: best ratio per CPU first.
+_CODECS: dict[str, tuple[Callable[[int], _Compressor], int]] = {}
+if zstandard is not None:
+    _CODECS["zstd"] = (_zstd, 3)
+if brotli is not None:
+    _CODECS["br"] = (_BrotliCompressor, 4)
+_CODECS["gzip"] = (_gzip, 6)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return the encodings this process can produce, in server preference order."""
+
+    return tuple(_CODECS)
+
+
+def negotiate_encoding(accept_encoding: str, supported: Iterable[str] | None = None) -> str | None:
+    """Pick the best encoding from an `Accept-Encoding` header, honouring q-values."""
+
+    supported = tuple(supported) if supported is not None else available_encodings()
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    wildcard = weights.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in supported:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(_COMPRESSIBLE_PREFIXES) or media_type.endswith(_COMPRESSIBLE_SUFFIXES)
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli, or gzip based on `Accept-Encoding`.
+
+    Bodies smaller than `minimum_size` are sent untouched. Larger bodies are
+    compressed chunk by chunk as the application streams them, so memory use does
+    not grow with the response size.
+    """
+
+    def __init__(self, app: ASGIApp, *, minimum_size: int = 1024, levels: dict[str, int] | None = None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.levels)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int, levels: dict[str, int]) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._levels = levels
+        self._start: Message | None = None
+        self._pending: list[bytes] = []
+        self._pending_size = 0
+        self._compressor: _Compressor | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self._start = message
+            self._passthrough = "content-encoding" in headers or not _is_compressible(
+                headers.get("content-type", "")
+            )
+            if self._passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self._compressor is None:
+            self._pending.append(body)
+            self._pending_size += len(body)
+            if self._pending_size < self._minimum_size:
+                if more_body:
+                    return
+                # Whole response is below the threshold; compression would cost more than it saves.
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": b"".join(self._pending)})
+                return
+            await self._begin()
+            body = b"".join(self._pending)
+            self._pending = []
+
+        chunk = self._compressor.compress(body)
+        if not more_body:
+            chunk += self._compressor.flush()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _begin(self) -> None:
+        factory, default_level = _CODECS[self._encoding]
+        self._compressor = factory(self._levels.get(self._encoding, default_level))
+        start = self._start
+        assert start is not None
+        headers = MutableHeaders(raw=start["headers"])
+        del headers["content-length"]
+        headers["content-encoding"] = self._encoding
+        headers.add_vary_header("accept-encoding")
+        await self._send(start)
+
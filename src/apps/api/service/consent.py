@@ -0,0 +1,169 @@
+"""Consent lookup with an in-process TTL cache for the Container Base API."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any, Protocol
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from .pdpa import ConsentRecord
+
+__all__ = [
+    "ConsentResolver",
+    "ConsentStore",
+    "SupabaseConsentStore",
+]
+
+
+class ConsentStore(Protocol):
+    """Source of truth for consent records (Supabase `consent_records` in production)."""
+
+    async def fetch_consent(self, user_id: str) -> ConsentRecord | None:
+        """Return the latest consent record for `user_id`, or None when none exists."""
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    record: ConsentRecord | None
+    expires_at: float
+
+
+class ConsentResolver:
+    """Resolve consent records through a TTL cache with single-flight lookups.
+
+    Positive results are cached for `ttl_seconds`; users without a consent row are
+    negatively cached for `negative_ttl_seconds`. Concurrent misses for the same
+    user share one store round trip. Store errors are never cached so callers can
+    fail closed and retry on the next request.
+    """
+
+    def __init__(
+        self,
+        store: ConsentStore,
+        *,
+        ttl_seconds: float = 60.0,
+        negative_ttl_seconds: float = 10.0,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._store = store
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        # Invalidation detaches a user's lookup from here, so later callers never join a stale one.
+        self._inflight: dict[str, asyncio.Task[ConsentRecord | None]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def resolve(self, user_id: str) -> ConsentRecord | None:
+        """Return the consent record for `user_id`, consulting the store only on cache misses."""
+
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if entry.expires_at > self._clock():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry.record
+            del self._entries[user_id]
+
+        task = self._inflight.get(user_id)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(user_id))
+            self._inflight[user_id] = task
+        # Shield so a cancelled caller does not abort the lookup other callers are waiting on.
+        return await asyncio.shield(task)
+
+    async def _load(self, user_id: str) -> ConsentRecord | None:
+        task = asyncio.current_task()
+        try:
+            record = await self._store.fetch_consent(user_id)
+        finally:
+            # A lookup that was invalidated (or replaced) while running must not cache or evict its successor.
+            stale = self._inflight.get(user_id) is not task
+            if not stale:
+                del self._inflight[user_id]
+
+        if not stale:
+            ttl = self._ttl if record is not None else self._negative_ttl
+            self._entries[user_id] = _CacheEntry(record=record, expires_at=self._clock() + ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return record
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop any cached record for `user_id` so the next request re-reads the store."""
+
+        self._entries.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop every cached record (e.g. after a bulk consent migration)."""
+
+        for user_id in list(self._entries):
+            self.invalidate(user_id)
+
+    def handle_event(self, event: Mapping[str, Any]) -> str | None:
+        """Invalidate the user referenced by a consent change event.
+
+        Accepts Supabase database webhook payloads (`{"type", "table", "record",
+        "old_record"}`) as well as flat `{"user_id": ...}` mappings. Returns the
+        invalidated user id, or None when the event does not reference one.
+        """
+
+        for key in ("record", "old_record"):
+            row = event.get(key)
+            if isinstance(row, Mapping) and row.get("user_id"):
+                user_id = str(row["user_id"])
+                break
+        else:
+            if not event.get("user_id"):
+                return None
+            user_id = str(event["user_id"])
+
+        self.invalidate(user_id)
+        return user_id
+
+
+class SupabaseConsentStore:
+    """Read the latest `consent_records` row through Supabase PostgREST."""
+
+    def __init__(self, base_url: str, service_key: str, *, timeout: float = 2.0) -> None:
+        self._endpoint = f"{base_url.rstrip('/')}/rest/v1/consent_records"
+        self._headers = {
+            "apikey": service_key,
+            "Authorization": f"Bearer {service_key}",
+            "Accept": "application/json",
+        }
+        self._timeout = timeout
+
+    async def fetch_consent(self, user_id: str) -> ConsentRecord | None:
+        return await asyncio.to_thread(self._fetch, user_id)
+
+    def _fetch(self, user_id: str) -> ConsentRecord | None:
+        query = (
+            f"?select=user_id,consent_given_at,revoked_at&user_id=eq.{quote(user_id, safe='')}"
+            "&order=consent_given_at.desc&limit=1"
+        )
+        request = Request(self._endpoint + query, headers=self._headers, method="GET")
+        with urlopen(request, timeout=self._timeout) as response:
+            rows = json.loads(response.read())
+        if not rows:
+            return None
+        row = rows[0]
+        return ConsentRecord(
+            user_id=str(row["user_id"]),
+            consented_at=str(row["consent_given_at"]),
+            revoked_at=row.get("revoked_at"),
+        )
@@ -1,52 +1,249 @@
 """FastAPI application skeleton for Container Base API."""
+import asyncio
+import hmac
+import math
+import os
+import time
+import uuid
+from collections.abc import Mapping
 from contextlib import asynccontextmanager
+from typing import Any, Literal
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
 
 from . import pdpa
+from .auth import JWKSCache, TokenClaims, TokenVerifier, require_user
+from .capture import TraceWriter, TrafficCaptureMiddleware
+from .compression import CompressionMiddleware
+from .consent import ConsentResolver, SupabaseConsentStore
 from .logging import get_logger, log_event
+from .profiler import MAX_SECONDS, ProfilerBusyError, SamplingProfiler
+from .ratelimit import ShardedTokenBuckets, capture_mode
+from .storage import MIN_PART_BYTES, S3Presigner, StorageError, UploadService
+from .tasks import InvalidSyncTokenError, TaskStore
 
 logger = get_logger()
+SERVICE_NAME = "api"
+
+# Routes that bypass PDPA consent checks: platform probes, server-to-server hooks, and
+# token-gated operator diagnostics.
+PDPA_EXEMPT_PATHS = frozenset({"/healthz", "/readyz", "/internal/consent-events", "/debug/profile"})
+
+# JWT `app_metadata.role` values allowed to approve or reject tasks.
+REVIEWER_ROLES = frozenset({"admin"})
+MAX_BULK_REVIEW_TASKS = 2000
+
+# Image types clients may upload, mapped to the object key extension.
+UPLOAD_CONTENT_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+
+def _build_consent_resolver(env: Mapping[str, str]) -> ConsentResolver | None:
+    """Create a Supabase-backed consent resolver when `CONSENT_LOOKUP=supabase`."""
+
+    if env.get("CONSENT_LOOKUP", "headers").lower() != "supabase":
+        return None
+    store = SupabaseConsentStore(env["SUPABASE_URL"], env["SUPABASE_SERVICE_ROLE_KEY"])
+    return ConsentResolver(
+        store,
+        ttl_seconds=float(env.get("CONSENT_CACHE_TTL_SECONDS", "60")),
+        negative_ttl_seconds=float(env.get("CONSENT_NEGATIVE_TTL_SECONDS", "10")),
+    )
+
+
+def _build_token_verifier(env: Mapping[str, str]) -> TokenVerifier | None:
+    """Create the bearer token verifier from `JWT_SECRET` and/or `JWKS_URL`."""
+
+    jwks_url = env.get("JWKS_URL")
+    jwks = JWKSCache(jwks_url, refresh_seconds=float(env.get("JWKS_REFRESH_SECONDS", "3600"))) if jwks_url else None
+    secret = env.get("JWT_SECRET")
+    if not secret and jwks is None:
+        return None
+    return TokenVerifier(
+        hmac_secret=secret,
+        jwks=jwks,
+        max_entries=int(env.get("JWT_CACHE_SIZE", "4096")),
+        issuer=env.get("JWT_ISSUER"),
+        audience=env.get("JWT_AUDIENCE"),
+    )
+
+
+def _build_upload_service(env: Mapping[str, str]) -> UploadService | None:
+    """Create the presigned upload service when Supabase Storage S3 credentials are set."""
+
+    endpoint = env.get("STORAGE_S3_ENDPOINT")
+    if not endpoint:
+        return None
+    presigner = S3Presigner(
+        endpoint,
+        region=env.get("STORAGE_S3_REGION", "ap-southeast-1"),
+        access_key_id=env["STORAGE_S3_ACCESS_KEY_ID"],
+        secret_access_key=env["STORAGE_S3_SECRET_ACCESS_KEY"],
+        bucket=env.get("STORAGE_BUCKET", "container-images"),
+    )
+    return UploadService(
+        presigner,
+        expires_in=int(env.get("UPLOAD_URL_TTL_SECONDS", "300")),
+        part_size=int(env.get("UPLOAD_PART_BYTES", str(MIN_PART_BYTES))),
+    )
+
+
+def _build_task_store(env: Mapping[str, str]) -> TaskStore | None:
+    """Connect the task store to `TASKS_DATABASE_URL` (Supabase Postgres, or SQLite locally)."""
+
+    url = env.get("TASKS_DATABASE_URL")
+    if not url:
+        return None
+    return TaskStore.from_url(url, batch_size=int(env.get("REVIEW_BATCH_SIZE", "500")))
+
+
+async def _compact_changes(store: TaskStore, env: Mapping[str, str], stop_event: asyncio.Event) -> None:
+    """Periodically compact the sync change log until shutdown."""
+
+    retain_seconds = float(env.get("SYNC_RETENTION_SECONDS", str(7 * 24 * 3600)))
+    interval = float(env.get("SYNC_COMPACT_INTERVAL_SECONDS", "3600"))
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except TimeoutError:
+            pass
+        else:
+            return
+        start = time.perf_counter()
+        try:
+            deleted = await asyncio.to_thread(store.compact, retain_seconds)
+        except Exception as exc:  # noqa: BLE001 - compaction retries on the next interval
+            log_event(logger, op_id="sync_compact", code="COMPACT_FAIL", duration_ms=0, message=str(exc))
+            continue
+        log_event(
+            logger,
+            op_id="sync_compact",
+            code="COMPACT",
+            duration_ms=round((time.perf_counter() - start) * 1000),
+            message="Sync change log compacted",
+            deleted=deleted,
+        )
+
+
+def _build_profiler(env: Mapping[str, str]) -> SamplingProfiler | None:
+    """Create the on-demand profiler only when `DEBUG_PROFILE_ENABLED=true` and a token is set."""
+
+    if env.get("DEBUG_PROFILE_ENABLED", "false").lower() != "true" or not env.get("DEBUG_PROFILE_TOKEN"):
+        return None
+    return SamplingProfiler(max_seconds=float(env.get("DEBUG_PROFILE_MAX_SECONDS", str(MAX_SECONDS))))
+
+
+def _build_rate_limiter(env: Mapping[str, str]) -> ShardedTokenBuckets | None:
+    """Create the per-operator token buckets for the upload routes when `RATE_LIMIT_PER_MINUTE` is set."""
+
+    per_minute = env.get("RATE_LIMIT_PER_MINUTE")
+    if not per_minute:
+        return None
+    return ShardedTokenBuckets(
+        rate=float(per_minute) / 60,
+        burst=float(env.get("RATE_LIMIT_BURST", "20")),
+        live_reserve=float(env.get("RATE_LIMIT_LIVE_RESERVE", "5")),
+    )
+
+
+# Opt-in traffic capture for replay benchmarks; closed by the lifespan so buffered records are kept.
+capture_writer: TraceWriter | None = (
+    TraceWriter(os.environ["TRAFFIC_CAPTURE_PATH"]) if os.environ.get("TRAFFIC_CAPTURE_PATH") else None
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler to log startup/shutdown events."""
 
+    app.state.consent_resolver = _build_consent_resolver(os.environ)
+    app.state.token_verifier = _build_token_verifier(os.environ)
+    app.state.upload_service = _build_upload_service(os.environ)
+    if app.state.upload_service is not None and _max_image_bytes() <= app.state.upload_service.part_size:
+        # Parts must be at least 5 MiB, so resumable multipart only engages above one part.
+        log_event(
+            logger,
+            op_id="startup",
+            code="MULTIPART_OFF",
+            duration_ms=0,
+            message="MAX_IMAGE_MB does not exceed UPLOAD_PART_BYTES; every upload is a single presigned PUT",
+        )
+    app.state.task_store = _build_task_store(os.environ)
+    app.state.profiler = _build_profiler(os.environ)
+    app.state.rate_limiter = _build_rate_limiter(os.environ)
+    stop_event = asyncio.Event()
+    jwks_task: asyncio.Task[None] | None = None
+    compaction_task: asyncio.Task[None] | None = None
+    if app.state.task_store is not None:
+        compaction_task = asyncio.create_task(_compact_changes(app.state.task_store, os.environ, stop_event))
+    jwks = app.state.token_verifier.jwks if app.state.token_verifier is not None else None
+    if jwks is not None:
+        # Preload signing keys so the first authenticated request never waits on the issuer. A brief
+        # issuer outage must not crash-loop cold starts: the background refresh retries, and unknown
+        # key ids wake it early.
+        try:
+            await asyncio.to_thread(jwks.refresh)
+        except Exception as exc:  # noqa: BLE001 - fall back to the background refresh
+            log_event(logger, op_id="startup", code="JWKS_PRELOAD_FAIL", duration_ms=0, message=str(exc))
+        jwks_task = asyncio.create_task(jwks.run(stop_event))
     # Emit a structured startup log before yielding control to FastAPI.
     log_event(logger, op_id="startup", code="START", duration_ms=0, message="API service boot")
     try:
         yield
     finally:
+        stop_event.set()
+        if jwks_task is not None:
+            jwks_task.cancel()
+        if compaction_task is not None:
+            compaction_task.cancel()
+        if capture_writer is not None:
+            await asyncio.to_thread(capture_writer.close)
         # Mirror the startup log so platform monitors capture a balanced shutdown event.
         log_event(logger, op_id="shutdown", code="STOP", duration_ms=0, message="API service shutdown")
 
 
-app = FastAPI(title="Container Base API", version="0.1.0", lifespan=lifespan)
+app = FastAPI(
+    title="Container Base API",
+    version="0.1.0",
+    lifespan=lifespan,
+    # orjson serializes large timeline/export payloads several times faster than the stdlib encoder.
+    default_response_class=ORJSONResponse,
+)
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get("COMPRESSION_MIN_BYTES", "1024")))
 
 
 @app.middleware("http")
 async def enforce_pdpa(request: Request, call_next):
     """Apply PDPA consent, email masking, and GPS rounding for non-health routes."""
 
-    if request.url.path in {"/healthz", "/readyz"}:
+    if request.url.path in PDPA_EXEMPT_PATHS:
         return await call_next(request)
 
-    # Reconstruct a consent record from headers—downstream services expect a typed model.
-    consent_status = request.headers.get("x-pdpa-consent-status")
+    resolver: ConsentResolver | None = getattr(request.app.state, "consent_resolver", None)
     consent_record: pdpa.ConsentRecord | None = None
-    if consent_status:
-        consent_record = pdpa.ConsentRecord(
-            user_id=request.headers.get("x-user-id", "unknown"),
-            consented_at=request.headers.get("x-pdpa-consent-at", "1970-01-01T00:00:00Z"),
-            revoked_at=None if consent_status.lower() == "active" else "revoked",
-        )
-
     try:
+        if resolver is not None:
+            # Consent headers are untrusted once a store is configured; only the user id is used.
+            user_id = request.headers.get("x-user-id")
+            if user_id:
+                consent_record = await resolver.resolve(user_id)
+        else:
+            # Reconstruct a consent record from headers—downstream services expect a typed model.
+            consent_status = request.headers.get("x-pdpa-consent-status")
+            if consent_status:
+                consent_record = pdpa.ConsentRecord(
+                    user_id=request.headers.get("x-user-id", "unknown"),
+                    consented_at=request.headers.get("x-pdpa-consent-at", "1970-01-01T00:00:00Z"),
+                    revoked_at=None if consent_status.lower() == "active" else "revoked",
+                )
         request.state.consent_record = pdpa.require_consent(consent_record)
     except pdpa.ConsentMissingError as exc:
         # Deny requests without valid consent before they reach any handler logic.
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
+        return ORJSONResponse(status_code=403, content={"detail": str(exc)})
+    except Exception:
+        # Fail closed: a consent store outage must never grant access.
+        return ORJSONResponse(status_code=403, content={"detail": "Consent could not be verified"})
 
     email = request.headers.get("x-user-email")
     if email:
@@ -72,6 +269,286 @@ async def enforce_pdpa(request: Request, call_next):
 
     return response
 
+
+# Registered after `enforce_pdpa` so it is outermost and also records requests the PDPA check rejects.
+if capture_writer is not None:
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        writer=capture_writer,
+        sample_rate=float(os.environ.get("TRAFFIC_CAPTURE_SAMPLE_RATE", "1.0")),
+    )
+
+
+@app.post("/internal/consent-events", status_code=202)
+async def consent_events(request: Request) -> dict[str, Any]:
+    """Invalidate cached consent when Supabase reports a consent change or revocation."""
+
+    secret = os.environ.get("CONSENT_WEBHOOK_SECRET", "")
+    supplied = request.headers.get("x-webhook-secret", "")
+    if not secret or not hmac.compare_digest(secret.encode(), supplied.encode()):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+    event = await request.json()
+    if not isinstance(event, dict):
+        raise HTTPException(status_code=422, detail="Event payload must be a JSON object")
+    resolver: ConsentResolver | None = getattr(request.app.state, "consent_resolver", None)
+    user_id = resolver.handle_event(event) if resolver is not None else None
+    return {"invalidated": user_id}
+
+
+class UploadRequest(BaseModel):
+    """Metadata for an image the client is about to upload directly to storage."""
+
+    content_type: str
+    size_bytes: int = Field(..., gt=0)
+
+
+class UploadPart(BaseModel):
+    part_number: int = Field(..., ge=1)
+    etag: str = Field(..., min_length=1)
+
+
+class ResumeUploadRequest(BaseModel):
+    key: str
+    upload_id: str
+    size_bytes: int = Field(..., gt=0)
+    part_numbers: list[int] = Field(..., min_length=1)
+
+
+class CompleteUploadRequest(BaseModel):
+    key: str
+    upload_id: str | None = None
+    parts: list[UploadPart] = Field(default_factory=list)
+
+
+def _upload_service(request: Request) -> UploadService:
+    service: UploadService | None = getattr(request.app.state, "upload_service", None)
+    if service is None:
+        raise HTTPException(status_code=503, detail="Direct uploads are not configured")
+    return service
+
+
+def _max_image_bytes() -> int:
+    return int(os.environ.get("MAX_IMAGE_MB", "5")) * 1024 * 1024
+
+
+def _check_upload_size(size_bytes: int) -> None:
+    max_bytes = _max_image_bytes()
+    if size_bytes > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Images are limited to {max_bytes} bytes")
+
+
+def _require_owned_key(key: str, claims: TokenClaims) -> None:
+    # Keys are namespaced per user so a client can never sign URLs for someone else's object.
+    if not key.startswith(f"uploads/{claims.subject}/") or ".." in key:
+        raise HTTPException(status_code=403, detail="Upload key does not belong to this user")
+
+
+async def _require_upload_quota(
+    request: Request,
+    claims: TokenClaims = Depends(require_user),  # noqa: B008
+) -> TokenClaims:
+    """Spend one token from the verified caller's bucket; `x-user-id` alone never selects a bucket."""
+
+    buckets: ShardedTokenBuckets | None = getattr(request.app.state, "rate_limiter", None)
+    if buckets is None:
+        return claims
+    mode = capture_mode(request.headers)
+    wait = buckets.acquire(claims.subject, mode)
+    if wait > 0:
+        retry_after = max(1, math.ceil(wait))
+        log_event(
+            logger,
+            op_id="rate_limit",
+            code="THROTTLED",
+            duration_ms=0,
+            message="Per-user rate limit exceeded",
+            path=request.url.path,
+            mode=mode,
+            retry_after=retry_after,
+        )
+        raise HTTPException(
+            status_code=429, detail="Per-user rate limit exceeded", headers={"Retry-After": str(retry_after)}
+        )
+    return claims
+
+
+@app.post("/uploads", status_code=201)
+async def create_upload(
+    body: UploadRequest,
+    request: Request,
+    claims: TokenClaims = Depends(_require_upload_quota),  # noqa: B008
+) -> dict[str, Any]:
+    """Issue short-lived presigned URLs so the image goes straight to Supabase Storage."""
+
+    service = _upload_service(request)
+    extension = UPLOAD_CONTENT_TYPES.get(body.content_type.lower())
+    if extension is None:
+        raise HTTPException(status_code=415, detail="Only JPEG, PNG, and WebP images can be uploaded")
+    _check_upload_size(body.size_bytes)
+
+    start = time.perf_counter()
+    key = f"uploads/{claims.subject}/{uuid.uuid4().hex}.{extension}"
+    try:
+        plan = await service.plan_upload(key, body.size_bytes, body.content_type.lower())
+    except StorageError as exc:
+        log_event(logger, op_id="upload_issue", code="STORAGE_FAIL", duration_ms=0, message=str(exc))
+        raise HTTPException(status_code=502, detail="Object store is unavailable") from exc
+    log_event(
+        logger,
+        op_id="upload_issue",
+        code="UPLOAD_URL",
+        duration_ms=round((time.perf_counter() - start) * 1000),
+        message="Presigned upload issued",
+        parts=len(plan.parts),
+    )
+    return plan.to_dict()
+
+
+@app.post("/uploads/parts")
+async def resume_upload(
+    body: ResumeUploadRequest,
+    request: Request,
+    claims: TokenClaims = Depends(_require_upload_quota),  # noqa: B008
+) -> dict[str, Any]:
+    """Re-sign part URLs so an interrupted multipart upload can resume after its URLs expire."""
+
+    service = _upload_service(request)
+    _require_owned_key(body.key, claims)
+    _check_upload_size(body.size_bytes)
+    if any(number < 1 or number > service.part_count(body.size_bytes) for number in body.part_numbers):
+        raise HTTPException(status_code=422, detail="Part numbers must lie within the declared size")
+    parts = service.sign_parts(body.key, body.upload_id, body.part_numbers, body.size_bytes)
+    return {
+        "key": body.key,
+        "upload_id": body.upload_id,
+        "parts": [part.to_dict() for part in parts],
+        "expires_in": service.expires_in,
+    }
+
+
+@app.post("/uploads/complete")
+async def complete_upload(
+    body: CompleteUploadRequest,
+    request: Request,
+    claims: TokenClaims = Depends(_require_upload_quota),  # noqa: B008
+) -> dict[str, Any]:
+    """Finalize a multipart upload and return the object reference handed to the OCR worker."""
+
+    service = _upload_service(request)
+    _require_owned_key(body.key, claims)
+    if body.upload_id is not None:
+        if not body.parts:
+            raise HTTPException(status_code=422, detail="Multipart uploads must list their parts")
+        try:
+            await service.complete(body.key, body.upload_id, {part.part_number: part.etag for part in body.parts})
+        except StorageError as exc:
+            log_event(logger, op_id="upload_complete", code="STORAGE_FAIL", duration_ms=0, message=str(exc))
+            raise HTTPException(status_code=502, detail="Upload could not be completed") from exc
+    return {"key": body.key, "object_url": service.object_url(body.key)}
+
+
+class BulkReviewRequest(BaseModel):
+    """Approve or reject many tasks in one transaction (US-AD-002 shift-end clearing)."""
+
+    task_ids: list[str] = Field(..., min_length=1, max_length=MAX_BULK_REVIEW_TASKS)
+    action: Literal["approve", "reject"]
+
+
+@app.post("/review/bulk")
+async def bulk_review(
+    body: BulkReviewRequest,
+    request: Request,
+    claims: TokenClaims = Depends(require_user),  # noqa: B008
+) -> dict[str, Any]:
+    """Apply one review action to many tasks and report the outcome per task."""
+
+    store: TaskStore | None = getattr(request.app.state, "task_store", None)
+    if store is None:
+        raise HTTPException(status_code=503, detail="Task store is not configured")
+    app_metadata = claims.claims.get("app_metadata") or {}
+    if not isinstance(app_metadata, dict) or app_metadata.get("role") not in REVIEWER_ROLES:
+        raise HTTPException(status_code=403, detail="Only admins can review tasks")
+
+    start = time.perf_counter()
+    result = await asyncio.to_thread(store.bulk_review, body.task_ids, body.action, claims.subject)
+    if result.event_id is not None:
+        # One aggregated event per bulk action keeps timeline consumers from replaying N updates.
+        log_event(
+            logger,
+            op_id="review_bulk",
+            code="STATUS_CHANGE",
+            duration_ms=round((time.perf_counter() - start) * 1000),
+            message=f"{result.updated} tasks {result.status}",
+            event_id=result.event_id,
+            status=result.status,
+            task_count=result.updated,
+            requested=len(result.items),
+        )
+    return {
+        "action": body.action,
+        "status": result.status,
+        "updated": result.updated,
+        "event_id": result.event_id,
+        "results": [item.to_dict() for item in result.items],
+    }
+
+
+@app.get("/sync/changes")
+async def sync_changes(
+    request: Request,
+    since: str | None = Query(None, max_length=512),
+    limit: int = Query(200, ge=1, le=1000),
+    claims: TokenClaims = Depends(require_user),  # noqa: B008
+) -> dict[str, Any]:
+    """Return the caller's tasks changed since an opaque sync token (US-OP-003 reconnect)."""
+
+    store: TaskStore | None = getattr(request.app.state, "task_store", None)
+    if store is None:
+        raise HTTPException(status_code=503, detail="Task store is not configured")
+    try:
+        page = await asyncio.to_thread(store.changes_since, claims.subject, since, limit=limit)
+    except InvalidSyncTokenError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return page.to_dict()
+
+
+@app.get("/debug/profile", response_model=None)
+async def debug_profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0, le=MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    output: str = Query("collapsed", alias="format", pattern="^(collapsed|speedscope)$"),
+) -> PlainTextResponse | dict[str, Any]:
+    """Capture a sampling profile of this instance; enabled by `DEBUG_PROFILE_ENABLED`."""
+
+    profiler: SamplingProfiler | None = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        # Do not advertise the endpoint when profiling is switched off.
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = os.environ.get("DEBUG_PROFILE_TOKEN", "")
+    supplied = request.headers.get("x-debug-token", "")
+    if not token or not hmac.compare_digest(token.encode(), supplied.encode()):
+        raise HTTPException(status_code=401, detail="Invalid debug token")
+
+    try:
+        profile = await profiler.capture_async(seconds, interval=interval_ms / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    log_event(
+        logger,
+        op_id="debug_profile",
+        code="PROFILE",
+        duration_ms=round(profile.duration * 1000),
+        message="Sampling profile captured",
+        samples=profile.samples,
+        overhead_pct=profile.overhead_pct,
+    )
+    if output == "speedscope":
+        return profile.speedscope(name=SERVICE_NAME)
+    return PlainTextResponse(profile.collapsed())
+
+
 @app.get("/healthz")
 async def healthz() -> dict[str, str]:
     """Liveness probe endpoint."""
@@ -1,7 +1,7 @@
 """PDPA enforcement helpers for the Container Base API."""
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping, Sequence
 from typing import Any
 
 from pydantic import BaseModel, Field, ValidationError
@@ -11,9 +11,24 @@ __all__ = [
     "ConsentRecord",
     "require_consent",
     "mask_email",
+    "mask_emails",
     "round_gps",
+    "round_gps_array",
 ]
 
+try:  # NumPy is optional; bulk helpers fall back to pure Python without it.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None  # type: ignore[assignment]
+
+# Precision shared by the scalar and bulk GPS helpers.
+GPS_DECIMALS = 3
+_GPS_SCALE = 10.0**GPS_DECIMALS
+# Scaled values this close to a .5 boundary are re-rounded with `round` to stay bit-identical.
+_TIE_TOLERANCE = 1e-6
+# Beyond this magnitude `x * 1000` loses integer precision, so defer to `round` as well.
+_MAX_FAST_MAGNITUDE = 2.0**52 / _GPS_SCALE
+
 
 class ConsentMissingError(RuntimeError):
     """Raised when an incoming request lacks a valid consent record."""
@@ -71,4 +86,76 @@ def mask_email(email: str) -> str:
 def round_gps(latitude: float, longitude: float) -> tuple[float, float]:
     """Round GPS coordinates to three decimals for PDPA compliance."""
 
-    return (round(latitude, 3), round(longitude, 3))
+    return (round(latitude, GPS_DECIMALS), round(longitude, GPS_DECIMALS))
+
+
+def _as_values(values: Any) -> Any:
+    """Unwrap Arrow arrays/columns into NumPy arrays or Python lists."""
+
+    if np is not None and isinstance(values, np.ndarray):
+        return values
+    if hasattr(values, "to_numpy") and np is not None:
+        # pyarrow.Array / ChunkedArray expose `to_numpy`; copying is required for strings and nulls.
+        return values.to_numpy(zero_copy_only=False)
+    if hasattr(values, "to_pylist"):
+        return values.to_pylist()
+    return values
+
+
+def mask_emails(emails: Iterable[str | None]) -> list[str | None]:
+    """Bulk variant of `mask_email` for batch sync and export paths.
+
+    Accepts any iterable of strings, a NumPy object/str array, or an Arrow column.
+    Results are identical to calling `mask_email` per element; `None` (Arrow nulls)
+    is passed through unchanged. A bare `str` or `bytes` raises `TypeError`; use
+    `mask_email` for a single address.
+    """
+
+    if isinstance(emails, str | bytes):
+        raise TypeError("mask_emails expects a column of emails, not a single string; use mask_email")
+    masked: list[str | None] = []
+    append = masked.append
+    for email in _as_values(emails):
+        if email is None:
+            append(None)
+            continue
+        email = str(email)
+        # `partition` splits on the first "@" exactly like `split("@", maxsplit=1)` in `mask_email`.
+        _, sep, domain = email.partition("@")
+        append(f"***@{domain}" if sep and domain else email)
+    return masked
+
+
+def _round_array(values: Any) -> Any:
+    """Round an array to GPS precision, matching built-in `round` bit for bit."""
+
+    if np is None:
+        return [round(float(value), GPS_DECIMALS) for value in values]
+
+    array = np.asarray(values, dtype=np.float64)
+    scaled = array * _GPS_SCALE
+    rounded = np.rint(scaled) / _GPS_SCALE
+    # `round` works on the exact binary value; the fast path only diverges near .5 ties or
+    # for huge magnitudes, so those few elements are recomputed with the scalar function.
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5)
+        suspect = (distance < _TIE_TOLERANCE) | (np.abs(array) >= _MAX_FAST_MAGNITUDE)
+    suspect &= np.isfinite(array)
+    for index in np.flatnonzero(suspect):
+        rounded.flat[index] = round(float(array.flat[index]), GPS_DECIMALS)
+    return rounded
+
+
+def round_gps_array(latitudes: Sequence[float] | Any, longitudes: Sequence[float] | Any) -> tuple[Any, Any]:
+    """Bulk variant of `round_gps` returning rounded latitude and longitude columns.
+
+    NumPy arrays (or Arrow columns) are processed without per-element Python calls
+    and returned as `float64` arrays; without NumPy installed, lists are returned.
+    Each element equals `round_gps` applied to the same pair.
+    """
+
+    latitudes = _as_values(latitudes)
+    longitudes = _as_values(longitudes)
+    if len(latitudes) != len(longitudes):
+        raise ValueError("Latitude and longitude columns must have the same length")
+    return (_round_array(latitudes), _round_array(longitudes))
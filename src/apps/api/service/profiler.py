@@ -0,0 +1,223 @@
+"""On-demand statistical sampling profiler for the Container Base API."""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+__all__ = ["Profile", "ProfilerBusyError", "SamplingProfiler"]
+
+# Hard bounds so a debug request can never turn into a self-inflicted incident.
+MAX_SECONDS = 60.0
+MIN_INTERVAL_SECONDS = 0.001
+MAX_STACK_DEPTH = 128
+# Share of one core the sampler may use; the interval widens to stay under it.
+MAX_OVERHEAD = 0.03
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a capture is requested while another one is still running."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame: FrameType | None, depth: int) -> tuple[str, ...]:
+    labels: list[str] = []
+    while frame is not None and len(labels) < depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+@dataclass(slots=True)
+class Profile:
+    """Aggregated samples keyed by `(root, frame, ..., leaf)` stacks.
+
+    `interval` is the interval in effect at the end of the capture, which may be
+    wider than requested when the sampler had to respect its CPU budget.
+    """
+
+    interval: float
+    duration: float
+    samples: int = 0
+    sampler_cpu_seconds: float = 0.0
+    stacks: Counter[tuple[str, ...]] = field(default_factory=Counter)
+
+    @property
+    def sample_seconds(self) -> float:
+        """Wall time each sample stands for (the mean interval actually achieved)."""
+
+        return self.duration / self.samples if self.samples else self.interval
+
+    @property
+    def overhead_pct(self) -> float:
+        """Sampler CPU time as a share of wall time (one core)."""
+
+        return round(self.sampler_cpu_seconds / self.duration * 100, 3) if self.duration else 0.0
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack text, consumable by flamegraph.pl and speedscope."""
+
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name: str = "profile") -> dict[str, Any]:
+        """Speedscope file-format document with one sampled profile per thread or task."""
+
+        frames: list[dict[str, Any]] = []
+        index: dict[str, int] = {}
+        by_root: dict[str, tuple[list[list[int]], list[float]]] = {}
+        for stack, count in self.stacks.items():
+            root, *rest = stack
+            ids = []
+            for label in rest:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({"name": label})
+                ids.append(index[label])
+            samples, weights = by_root.setdefault(root, ([], []))
+            samples.append(ids)
+            weights.append(count * self.sample_seconds)
+
+        profiles = [
+            {
+                "type": "sampled",
+                "name": root,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+            for root, (samples, weights) in sorted(by_root.items())
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "container-base-profiler",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class SamplingProfiler:
+    """Sample every thread's Python stack, plus asyncio task stacks, at a fixed interval.
+
+    Sampling runs in the calling thread (endpoints use `capture_async`, which
+    starts a dedicated one) and only reads `sys._current_frames()`, so profiled
+    code is never instrumented.
+    Task stacks show where coroutines are suspended, which is where request time
+    goes when the event loop itself looks idle. Only one capture runs at a time.
+    Each tick holds the GIL while it walks every stack, so when the sampler's
+    own CPU time exceeds `max_overhead` of the elapsed time, the interval is
+    widened until it fits.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_seconds: float = MAX_SECONDS,
+        max_stack_depth: int = MAX_STACK_DEPTH,
+        max_overhead: float = MAX_OVERHEAD,
+    ) -> None:
+        self.max_seconds = min(max_seconds, MAX_SECONDS)
+        self.max_stack_depth = max_stack_depth
+        self.max_overhead = max_overhead
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def capture(
+        self,
+        seconds: float,
+        *,
+        interval: float = 0.01,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> Profile:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile capture is already running")
+        try:
+            return self._sample(min(max(seconds, 0.0), self.max_seconds), max(interval, MIN_INTERVAL_SECONDS), loop)
+        finally:
+            self._lock.release()
+
+    async def capture_async(self, seconds: float, *, interval: float = 0.01) -> Profile:
+        """Run `capture` on a dedicated thread so a saturated default executor cannot delay it."""
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Profile] = loop.create_future()
+
+        def resolve(outcome: Profile | BaseException) -> None:
+            if future.done():  # the request was cancelled while sampling
+                return
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+        def run() -> None:
+            try:
+                outcome: Profile | BaseException = self.capture(seconds, interval=interval, loop=loop)
+            except BaseException as exc:  # noqa: BLE001 - handed back to the awaiting request
+                outcome = exc
+            loop.call_soon_threadsafe(resolve, outcome)
+
+        threading.Thread(target=run, name="profiler", daemon=True).start()
+        return await future
+
+    def _sample(self, seconds: float, interval: float, loop: asyncio.AbstractEventLoop | None) -> Profile:
+        own_id = threading.get_ident()
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        deadline = start + seconds
+        profile = Profile(interval=interval, duration=seconds)
+        next_tick = start
+
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                root = f"thread:{names.get(thread_id, thread_id)}"
+                profile.stacks[(root, *_thread_stack(frame, self.max_stack_depth))] += 1
+            if loop is not None:
+                self._sample_tasks(loop, profile)
+            profile.samples += 1
+
+            # Mean CPU per tick divided by the budget is the narrowest interval that stays within it.
+            affordable = (time.thread_time() - cpu_start) / profile.samples / self.max_overhead
+            profile.interval = max(interval, affordable)
+            next_tick += profile.interval
+            now = time.perf_counter()
+            if next_tick >= deadline:
+                break
+            # Sleep to the next tick rather than a fixed interval so sampling cost does not skew the rate.
+            time.sleep(max(next_tick - now, 0.0))
+
+        profile.duration = time.perf_counter() - start
+        profile.sampler_cpu_seconds = time.thread_time() - cpu_start
+        return profile
+
+    def _sample_tasks(self, loop: asyncio.AbstractEventLoop, profile: Profile) -> None:
+        try:
+            tasks = asyncio.all_tasks(loop)
+        except RuntimeError:
+            return
+        for task in tasks:
+            try:
+                frames = task.get_stack(limit=self.max_stack_depth)
+            except RuntimeError:  # task finished or mutated while being read
+                continue
+            if frames:
+                profile.stacks[(f"task:{task.get_name()}", *map(_frame_label, frames))] += 1
@@ -0,0 +1,82 @@
+"""Per-operator token buckets for the upload routes."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+__all__ = ["BACKFILL", "LIVE", "ShardedTokenBuckets", "capture_mode"]
+
+# Clients tag offline-queue replays with `x-capture-mode: backfill`; anything else is a live capture.
+CAPTURE_MODE_HEADER = "x-capture-mode"
+LIVE = "live"
+BACKFILL = "backfill"
+
+
+def capture_mode(headers: Mapping[str, str]) -> str:
+    return BACKFILL if headers.get(CAPTURE_MODE_HEADER, "").strip().lower() == BACKFILL else LIVE
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated: float
+
+
+class ShardedTokenBuckets:
+    """Token buckets keyed by user id, spread over independently locked shards.
+
+    Each shard is a small LRU so memory stays bounded with many devices, and
+    concurrent callers only contend when their keys hash to the same shard.
+    Backfill requests may not spend the last `live_reserve` tokens of a bucket,
+    so an operator replaying an offline queue always keeps headroom for the
+    container they are photographing right now.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: float,
+        live_reserve: float = 0.0,
+        shards: int = 16,
+        max_entries: int = 16_384,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.live_reserve = min(live_reserve, burst - 1)
+        self._clock = clock
+        self._per_shard = max(1, max_entries // shards)
+        self._shards: list[tuple[threading.Lock, OrderedDict[str, _Bucket]]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+
+    def acquire(self, key: str, mode: str = LIVE, cost: float = 1.0) -> float:
+        """Spend `cost` tokens for `key`; return 0.0 on success or the seconds until it would succeed."""
+
+        floor = self.live_reserve if mode == BACKFILL else 0.0
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            now = self._clock()
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _Bucket(self.burst, now)
+                if len(buckets) > self._per_shard:
+                    # Evicting the least recently seen user only forgets a bucket that has long refilled.
+                    buckets.popitem(last=False)
+            else:
+                buckets.move_to_end(key)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+            if bucket.tokens - cost >= floor:
+                bucket.tokens -= cost
+                return 0.0
+            return (floor + cost - bucket.tokens) / self.rate
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
@@ -0,0 +1,250 @@
+"""Presigned direct-to-storage uploads against Supabase Storage's S3-compatible API."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import math
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+
+__all__ = [
+    "MIN_PART_BYTES",
+    "S3Presigner",
+    "SignedPart",
+    "StorageError",
+    "UploadPlan",
+    "UploadService",
+]
+
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+# S3 requires every multipart part except the last to be at least 5 MiB.
+MIN_PART_BYTES = 5 * 1024 * 1024
+
+
+class StorageError(RuntimeError):
+    """Raised when the object store rejects or fails a control-plane request."""
+
+
+def _uri_encode(value: str, *, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+class S3Presigner:
+    """Create AWS Signature V4 query-string presigned URLs for S3-compatible stores."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        region: str,
+        access_key_id: str,
+        secret_access_key: str,
+        bucket: str,
+        path_style: bool = True,
+        clock: Callable[[], datetime] = lambda: datetime.now(tz=UTC),
+    ) -> None:
+        parts = urlsplit(endpoint)
+        self._scheme = parts.scheme or "https"
+        self._base_path = parts.path.rstrip("/")
+        self._host = parts.netloc if path_style else f"{bucket}.{parts.netloc}"
+        self._region = region
+        self._access_key_id = access_key_id
+        self._secret = secret_access_key
+        self._bucket = bucket
+        self._path_style = path_style
+        self._clock = clock
+
+    @property
+    def bucket(self) -> str:
+        return self._bucket
+
+    def _signing_key(self, date: str) -> bytes:
+        key = f"AWS4{self._secret}".encode()
+        for part in (date, self._region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return key
+
+    def presign(
+        self,
+        method: str,
+        key: str,
+        *,
+        expires_in: int,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> str:
+        """Return a URL that authorizes `method` on `key` for `expires_in` seconds.
+
+        `headers` are included in the signature, so the request must send them
+        with exactly these values (e.g. `content-length` pins the object size).
+        """
+
+        now = self._clock()
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        scope = f"{date}/{self._region}/s3/aws4_request"
+        object_path = f"/{self._bucket}/{key}" if self._path_style else f"/{key}"
+        canonical_uri = _uri_encode(f"{self._base_path}{object_path}", safe="-_.~/")
+
+        signed = {"host": self._host, **{name.lower(): str(value).strip() for name, value in (headers or {}).items()}}
+        signed_names = ";".join(sorted(signed))
+        canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+
+        query = dict(params or {})
+        query.update(
+            {
+                "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+                "X-Amz-Credential": f"{self._access_key_id}/{scope}",
+                "X-Amz-Date": amz_date,
+                "X-Amz-Expires": str(expires_in),
+                "X-Amz-SignedHeaders": signed_names,
+            }
+        )
+        canonical_query = "&".join(
+            f"{_uri_encode(name)}={_uri_encode(value)}" for name, value in sorted(query.items())
+        )
+        canonical_request = "\n".join(
+            [method, canonical_uri, canonical_query, canonical_headers, signed_names, "UNSIGNED-PAYLOAD"]
+        )
+        string_to_sign = "\n".join(
+            ["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()]
+        )
+        signature = hmac.new(self._signing_key(date), string_to_sign.encode(), hashlib.sha256).hexdigest()
+        return f"{self._scheme}://{self._host}{canonical_uri}?{canonical_query}&X-Amz-Signature={signature}"
+
+
+@dataclass(frozen=True, slots=True)
+class SignedPart:
+    """One presigned PUT and the headers it must be sent with."""
+
+    part_number: int
+    url: str
+    headers: Mapping[str, str]
+
+    def to_dict(self) -> dict[str, object]:
+        return {"part_number": self.part_number, "url": self.url, "headers": dict(self.headers)}
+
+
+@dataclass(frozen=True, slots=True)
+class UploadPlan:
+    """Everything a client needs to upload one image straight to storage.
+
+    Each part carries the headers its URL was signed with; the client must send
+    them unchanged or the store rejects the upload.
+    """
+
+    key: str
+    upload_id: str | None
+    part_size: int
+    parts: tuple[SignedPart, ...]
+    expires_in: int
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "key": self.key,
+            "upload_id": self.upload_id,
+            "part_size": self.part_size,
+            "parts": [part.to_dict() for part in self.parts],
+            "expires_in": self.expires_in,
+        }
+
+
+class UploadService:
+    """Issue presigned upload plans and finalize multipart uploads.
+
+    Image bytes never pass through the API: small images get a single presigned
+    PUT, larger ones a multipart upload whose parts can be retried or resumed
+    independently. Only the create/complete control calls are made server-side.
+    """
+
+    def __init__(
+        self,
+        presigner: S3Presigner,
+        *,
+        expires_in: int = 300,
+        part_size: int = MIN_PART_BYTES,
+        timeout: float = 5.0,
+    ) -> None:
+        self.presigner = presigner
+        self.expires_in = expires_in
+        self.part_size = max(part_size, MIN_PART_BYTES)
+        self._timeout = timeout
+
+    def part_count(self, size_bytes: int) -> int:
+        return math.ceil(size_bytes / self.part_size)
+
+    async def plan_upload(self, key: str, size_bytes: int, content_type: str) -> UploadPlan:
+        """Sign a single PUT, or start a multipart upload when the image exceeds one part.
+
+        The declared type and size are signed into every URL, so the checks made
+        before planning also bind what the client actually stores.
+        """
+
+        if size_bytes <= self.part_size:
+            headers = {"content-length": str(size_bytes), "content-type": content_type}
+            url = self.presigner.presign("PUT", key, expires_in=self.expires_in, headers=headers)
+            return UploadPlan(key, None, self.part_size, (SignedPart(1, url, headers),), self.expires_in)
+
+        upload_id = await asyncio.to_thread(self._create_multipart, key, content_type)
+        parts = self.sign_parts(key, upload_id, range(1, self.part_count(size_bytes) + 1), size_bytes)
+        return UploadPlan(key, upload_id, self.part_size, parts, self.expires_in)
+
+    def sign_parts(
+        self, key: str, upload_id: str, part_numbers: Sequence[int] | range, size_bytes: int
+    ) -> tuple[SignedPart, ...]:
+        """Presign PUT URLs for the given parts (used to resume after URLs expire)."""
+
+        parts = []
+        for number in part_numbers:
+            length = min(self.part_size, size_bytes - (number - 1) * self.part_size)
+            headers = {"content-length": str(length)}
+            url = self.presigner.presign(
+                "PUT",
+                key,
+                expires_in=self.expires_in,
+                params={"partNumber": str(number), "uploadId": upload_id},
+                headers=headers,
+            )
+            parts.append(SignedPart(number, url, headers))
+        return tuple(parts)
+
+    async def complete(self, key: str, upload_id: str, etags: Mapping[int, str]) -> None:
+        await asyncio.to_thread(self._complete_multipart, key, upload_id, etags)
+
+    def object_url(self, key: str, expires_in: int | None = None) -> str:
+        """Presigned GET used as the object reference handed to the OCR worker."""
+
+        return self.presigner.presign("GET", key, expires_in=expires_in or self.expires_in)
+
+    def _request(
+        self, method: str, url: str, body: bytes | None = None, headers: Mapping[str, str] | None = None
+    ) -> bytes:
+        request = Request(url, data=body, headers=dict(headers or {}), method=method)
+        try:
+            with urlopen(request, timeout=self._timeout) as response:
+                return response.read()
+        except OSError as exc:
+            raise StorageError(f"Object store request failed: {exc}") from exc
+
+    def _create_multipart(self, key: str, content_type: str) -> str:
+        headers = {"content-type": content_type}
+        url = self.presigner.presign("POST", key, expires_in=60, params={"uploads": ""}, headers=headers)
+        document = ElementTree.fromstring(self._request("POST", url, b"", headers))
+        upload_id = document.findtext(f"{_S3_NS}UploadId") or document.findtext("UploadId")
+        if not upload_id:
+            raise StorageError("Object store did not return an UploadId")
+        return upload_id
+
+    def _complete_multipart(self, key: str, upload_id: str, etags: Mapping[int, str]) -> None:
+        root = ElementTree.Element("CompleteMultipartUpload")
+        for number in sorted(etags):
+            part = ElementTree.SubElement(root, "Part")
+            ElementTree.SubElement(part, "PartNumber").text = str(number)
+            ElementTree.SubElement(part, "ETag").text = etags[number]
+        url = self.presigner.presign("POST", key, expires_in=60, params={"uploadId": upload_id})
+        self._request("POST", url, ElementTree.tostring(root))
@@ -0,0 +1,367 @@
+"""Transactional task status writes and delta sync for the review and timeline flows."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+__all__ = [
+    "REVIEW_ACTIONS",
+    "REVIEWABLE_STATUSES",
+    "SCHEMA_STATEMENTS",
+    "BulkReviewResult",
+    "ChangePage",
+    "InvalidSyncTokenError",
+    "ReviewItem",
+    "TaskStore",
+    "decode_sync_token",
+    "encode_sync_token",
+]
+
+# Canonical statuses: queued, under_review, approved, rejected. Decisions are final.
+REVIEW_ACTIONS = {"approve": "approved", "reject": "rejected"}
+REVIEWABLE_STATUSES = ("queued", "under_review")
+
+# Columns returned to mobile clients; nothing here is PDPA-masked data.
+SYNC_COLUMNS = ("id", "container_id", "captured_at", "status", "reviewed_at")
+
+# Held until commit so `task_changes.seq` values commit in order and sync clients never skip one.
+# The Supabase trigger takes the same lock (see docs/deployment/supabase-schema.md).
+POSTGRES_CHANGE_LOCK = "SELECT pg_advisory_xact_lock(hashtext('task_changes'))"
+
+# Portable DDL for local SQLite stand-ins; Supabase migrations use native uuid/timestamptz types.
+SCHEMA_STATEMENTS = (
+    """CREATE TABLE IF NOT EXISTS container_events (
+        id TEXT PRIMARY KEY,
+        container_id TEXT,
+        captured_at TEXT,
+        status TEXT NOT NULL,
+        uploader_id TEXT,
+        reviewed_by TEXT,
+        reviewed_at TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS task_status_events (
+        id TEXT PRIMARY KEY,
+        occurred_at TEXT NOT NULL,
+        actor_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        task_ids TEXT NOT NULL,
+        task_count INTEGER NOT NULL
+    )""",
+    # Append-only change log; `seq` is the monotonic position encoded in sync tokens.
+    """CREATE TABLE IF NOT EXISTS task_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id TEXT NOT NULL,
+        uploader_id TEXT,
+        changed_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS task_changes_uploader_seq ON task_changes (uploader_id, seq)",
+    "CREATE INDEX IF NOT EXISTS task_changes_task_seq ON task_changes (task_id, seq)",
+    # Every write to a synced column is logged by the database itself, whichever client made it.
+    """CREATE TRIGGER IF NOT EXISTS container_events_log_insert AFTER INSERT ON container_events
+    BEGIN
+        INSERT INTO task_changes (task_id, uploader_id, changed_at)
+        VALUES (NEW.id, NEW.uploader_id, strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS container_events_log_update
+    AFTER UPDATE OF container_id, captured_at, status, uploader_id, reviewed_at ON container_events
+    BEGIN
+        INSERT INTO task_changes (task_id, uploader_id, changed_at)
+        VALUES (NEW.id, NEW.uploader_id, strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END""",
+    # Tokens at or below `compacted_through` may have missed deleted entries and must resync.
+    """CREATE TABLE IF NOT EXISTS sync_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        compacted_through INTEGER NOT NULL
+    )""",
+)
+
+
+class InvalidSyncTokenError(ValueError):
+    """Raised when a sync token cannot be decoded."""
+
+
+def encode_sync_token(seq: int, after_id: str | None = None) -> str:
+    """Encode a change-log position (and, mid-resync, the last task id sent) as an opaque token."""
+
+    raw = f"r:{seq}:{after_id}" if after_id is not None else f"d:{seq}"
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_sync_token(token: str) -> tuple[int, str | None]:
+    """Return `(seq, after_id)`; `after_id` is set only for a resync in progress."""
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        kind, _, rest = raw.partition(":")
+        if kind == "d":
+            return int(rest), None
+        if kind == "r":
+            seq, _, after_id = rest.partition(":")
+            return int(seq), after_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidSyncTokenError("Malformed sync token") from exc
+    raise InvalidSyncTokenError("Malformed sync token")
+
+
+@dataclass(frozen=True, slots=True)
+class ReviewItem:
+    """Outcome for one task: `updated`, `not_found`, or `invalid_state`."""
+
+    task_id: str
+    result: str
+    status: str | None
+
+    def to_dict(self) -> dict[str, str | None]:
+        return {"task_id": self.task_id, "result": self.result, "status": self.status}
+
+
+@dataclass(frozen=True, slots=True)
+class BulkReviewResult:
+    status: str
+    items: tuple[ReviewItem, ...]
+    event_id: str | None
+    occurred_at: str
+    updated_ids: tuple[str, ...] = field(default=())
+
+    @property
+    def updated(self) -> int:
+        return len(self.updated_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class ChangePage:
+    """One page of tasks for a client, plus the token to resume from."""
+
+    tasks: tuple[dict[str, Any], ...]
+    next_token: str
+    has_more: bool
+    reset: bool
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "tasks": list(self.tasks),
+            "next_token": self.next_token,
+            "has_more": self.has_more,
+            "reset": self.reset,
+        }
+
+
+def _chunks(values: Sequence[str], size: int) -> Iterable[Sequence[str]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class TaskStore:
+    """Apply review decisions through any DB-API 2.0 connection (psycopg or sqlite3).
+
+    A bulk decision runs in a single transaction: each chunk of ids is updated
+    with one `UPDATE ... WHERE id IN (...) RETURNING id` guarded by the
+    reviewable statuses, so concurrent reviewers cannot overwrite a final
+    decision. One aggregated row is written to `task_status_events` for
+    timeline consumers instead of one event per task. The `task_changes` log
+    that backs mobile delta sync is filled by triggers on `container_events`,
+    so captures and OCR writes made directly against the table are synced too.
+
+    Delta sync assumes change rows become visible in `seq` order. Postgres
+    hands out identity values at INSERT rather than COMMIT, so the triggers
+    serialize writers on an advisory lock. `change_lock` (set by `from_url`)
+    takes that lock before any row lock, so two reviews cannot deadlock on it;
+    SQLite already allows only one writer at a time.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        placeholder: str = "?",
+        batch_size: int = 500,
+        clock: Callable[[], datetime] = lambda: datetime.now(tz=UTC),
+        change_lock: str | None = None,
+    ) -> None:
+        self._connect = connect
+        self._placeholder = placeholder
+        self._change_lock = change_lock
+        # SQLite caps bound parameters at 999 on older builds; keep chunks well below it.
+        self.batch_size = max(1, batch_size)
+        self._clock = clock
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> TaskStore:
+        """Build a store from `postgresql://...` (psycopg) or `sqlite:///path` URLs."""
+
+        if url.startswith("sqlite:///"):
+            import sqlite3  # noqa: PLC0415
+
+            path = url.removeprefix("sqlite:///")
+            return cls(lambda: sqlite3.connect(path), placeholder="?", **kwargs)
+        if url.startswith(("postgres://", "postgresql://")):
+            import psycopg  # noqa: PLC0415
+
+            kwargs.setdefault("change_lock", POSTGRES_CHANGE_LOCK)
+            return cls(lambda: psycopg.connect(url), placeholder="%s", **kwargs)
+        raise ValueError("TASKS_DATABASE_URL must be a postgresql:// or sqlite:/// URL")
+
+    def create_schema(self) -> None:
+        with closing(self._connect()) as connection:
+            cursor = connection.cursor()
+            for statement in SCHEMA_STATEMENTS:
+                cursor.execute(statement)
+            connection.commit()
+
+    def _marks(self, count: int) -> str:
+        return ", ".join([self._placeholder] * count)
+
+    def bulk_review(self, task_ids: Sequence[str], action: str, reviewer_id: str) -> BulkReviewResult:
+        status = REVIEW_ACTIONS[action]
+        ordered = list(dict.fromkeys(task_ids))
+        occurred_at = self._clock().isoformat()
+        updated: list[str] = []
+        current: dict[str, str] = {}
+
+        with closing(self._connect()) as connection:
+            try:
+                cursor = connection.cursor()
+                if self._change_lock:
+                    # Taken before any row lock so two reviews cannot deadlock on it.
+                    cursor.execute(self._change_lock)
+                for chunk in _chunks(ordered, self.batch_size):
+                    cursor.execute(
+                        f"UPDATE container_events SET status = {self._placeholder}, "
+                        f"reviewed_by = {self._placeholder}, reviewed_at = {self._placeholder} "
+                        f"WHERE id IN ({self._marks(len(chunk))}) "
+                        f"AND status IN ({self._marks(len(REVIEWABLE_STATUSES))}) RETURNING id",
+                        (status, reviewer_id, occurred_at, *chunk, *REVIEWABLE_STATUSES),
+                    )
+                    changed = {row[0] for row in cursor.fetchall()}
+                    updated.extend(task_id for task_id in chunk if task_id in changed)
+                    remaining = [task_id for task_id in chunk if task_id not in changed]
+                    if remaining:
+                        cursor.execute(
+                            f"SELECT id, status FROM container_events WHERE id IN ({self._marks(len(remaining))})",
+                            remaining,
+                        )
+                        current.update((row[0], row[1]) for row in cursor.fetchall())
+
+                event_id = None
+                if updated:
+                    event_id = str(uuid.uuid4())
+                    cursor.execute(
+                        f"INSERT INTO task_status_events (id, occurred_at, actor_id, status, task_ids, task_count) "
+                        f"VALUES ({self._marks(6)})",
+                        (event_id, occurred_at, reviewer_id, status, json.dumps(updated), len(updated)),
+                    )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+        changed_ids = set(updated)
+        items = tuple(
+            ReviewItem(task_id, "updated", status)
+            if task_id in changed_ids
+            else ReviewItem(task_id, "invalid_state", current[task_id])
+            if task_id in current
+            else ReviewItem(task_id, "not_found", None)
+            for task_id in ordered
+        )
+        return BulkReviewResult(status, items, event_id, occurred_at, tuple(updated))
+
+    def changes_since(self, uploader_id: str, token: str | None, *, limit: int = 200) -> ChangePage:
+        """Return the caller's tasks changed after `token`, or a full resync page.
+
+        A missing token, or one older than the compaction watermark (or newer
+        than the log, e.g. after a restore), starts a full resync that pages
+        through every task by id and then hands over to delta tokens.
+        """
+
+        seq, after_id = decode_sync_token(token) if token else (None, None)
+        columns = ", ".join(f"e.{column}" for column in SYNC_COLUMNS)
+        mark = self._placeholder
+
+        with closing(self._connect()) as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT compacted_through FROM sync_state WHERE id = 1")
+            row = cursor.fetchone()
+            watermark = row[0] if row else 0
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM task_changes")
+            # Age-based compaction can empty the log; the watermark still marks how far it reached.
+            head = max(cursor.fetchone()[0], watermark)
+
+            if seq is not None and after_id is None and watermark <= seq <= head:
+                cursor.execute(
+                    f"SELECT c.seq, {columns} FROM task_changes c JOIN container_events e ON e.id = c.task_id "
+                    f"WHERE c.uploader_id = {mark} AND c.seq > {mark} ORDER BY c.seq LIMIT {mark}",
+                    (uploader_id, seq, limit + 1),
+                )
+                rows = cursor.fetchall()
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+                latest: dict[str, dict[str, Any]] = {}
+                for change in rows:
+                    task = dict(zip(SYNC_COLUMNS, change[1:], strict=True))
+                    latest.pop(task["id"], None)
+                    latest[task["id"]] = task
+                next_seq = rows[-1][0] if rows else seq
+                return ChangePage(tuple(latest.values()), encode_sync_token(next_seq), has_more, reset=False)
+
+            reset = after_id is None or seq is None or seq > head
+            if reset:
+                # Snapshot the log head before reading tasks so concurrent changes are replayed later.
+                seq, after_id = head, ""
+            cursor.execute(
+                f"SELECT {columns} FROM container_events e WHERE e.uploader_id = {mark} AND e.id > {mark} "
+                f"ORDER BY e.id LIMIT {mark}",
+                (uploader_id, after_id, limit + 1),
+            )
+            rows = cursor.fetchall()
+        has_more = len(rows) > limit
+        tasks = tuple(dict(zip(SYNC_COLUMNS, task, strict=True)) for task in rows[:limit])
+        next_token = encode_sync_token(seq, tasks[-1]["id"]) if has_more else encode_sync_token(seq)
+        return ChangePage(tasks, next_token, has_more, reset=reset)
+
+    def compact(self, retain_seconds: float) -> int:
+        """Drop superseded change rows and rows older than the retention window.
+
+        Superseded rows (the same task changed again later) can always be
+        removed: any client positioned before them still sees the newer row.
+        Dropping rows by age advances `sync_state.compacted_through`, so tokens
+        that predate it fall back to a full resync. Returns rows deleted.
+        """
+
+        cutoff = (self._clock() - timedelta(seconds=retain_seconds)).isoformat()
+        with closing(self._connect()) as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "DELETE FROM task_changes WHERE seq < "
+                    "(SELECT MAX(newer.seq) FROM task_changes newer WHERE newer.task_id = task_changes.task_id)"
+                )
+                deleted = max(cursor.rowcount, 0)
+                cursor.execute(
+                    f"SELECT MAX(seq) FROM task_changes WHERE changed_at < {self._placeholder}", (cutoff,)
+                )
+                expired_through = cursor.fetchone()[0]
+                if expired_through is not None:
+                    cursor.execute(f"DELETE FROM task_changes WHERE seq <= {self._placeholder}", (expired_through,))
+                    deleted += max(cursor.rowcount, 0)
+                    cursor.execute(
+                        f"UPDATE sync_state SET compacted_through = {self._placeholder} WHERE id = 1",
+                        (expired_through,),
+                    )
+                    if cursor.rowcount == 0:
+                        cursor.execute(
+                            f"INSERT INTO sync_state (id, compacted_through) VALUES (1, {self._placeholder})",
+                            (expired_through,),
+                        )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        return deleted
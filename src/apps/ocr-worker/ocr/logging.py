@@ -4,7 +4,8 @@ from __future__ import annotations
 import json
 import logging
 import sys
-from datetime import datetime
+import time
+from datetime import UTC, datetime
 from typing import Any, TypedDict
 
 
@@ -32,6 +33,38 @@ def get_logger() -> logging.Logger:
     return logger
 
 
+class _CoarseClock:
+    """ISO-8601 UTC timestamp that is formatted at most once per millisecond."""
+
+    __slots__ = ("_cached",)
+
+    def __init__(self) -> None:
+        self._cached: tuple[int, str] = (-1, "")
+
+    def now(self) -> str:
+        millis = time.time_ns() // 1_000_000
+        cached_millis, text = self._cached
+        if millis != cached_millis:
+            text = datetime.fromtimestamp(millis / 1000, tz=UTC).isoformat(timespec="milliseconds")
+            # Single tuple assignment keeps the (millis, text) pair consistent across threads.
+            self._cached = (millis, text)
+        return text
+
+
+_clock = _CoarseClock()
+# C-accelerated string escaper used by `json.dumps`; output stays byte-identical to it.
+_encode_str = json.encoder.encode_basestring_ascii
+_encode_value = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _encode_field(value: Any) -> str:
+    if type(value) is str:
+        return _encode_str(value)
+    if type(value) is int:
+        return str(value)
+    return _encode_value(value)
+
+
 def log_event(
     logger: logging.Logger,
     *,
@@ -42,15 +75,28 @@ def log_event(
     ts: str | None = None,
     **extra: Any,
 ) -> None:
-    """Emit a structured log following `{ ts, opId, code, duration_ms }` schema."""
-    payload: LogPayload = {
-        "ts": ts or datetime.now(tz=datetime.UTC).isoformat(),
-        "opId": op_id,
-        "code": code,
-        "duration_ms": duration_ms,
-        "message": message,
-    }
-    if extra:
-        payload.update(extra)
-
-    logger.info(json.dumps(payload, separators=(",", ":")))
+    """Emit a structured log following `{ ts, opId, code, duration_ms }` schema.
+
+    The `LogPayload` fields are encoded in a fixed order without building an
+    intermediate dict; `extra` fields are appended after them.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    parts = [
+        '{"ts":',
+        _encode_str(ts or _clock.now()),
+        ',"opId":',
+        _encode_str(op_id),
+        ',"code":',
+        _encode_str(code),
+        ',"duration_ms":',
+        _encode_field(duration_ms),
+        ',"message":',
+        _encode_str(message),
+    ]
+    for key, value in extra.items():
+        parts += (",", _encode_str(key), ":", _encode_field(value))
+    parts.append("}")
+
+    logger.info("".join(parts))
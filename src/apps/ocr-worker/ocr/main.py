@@ -2,17 +2,113 @@
 from __future__ import annotations
 
 import asyncio
+import hmac
+import math
 import os
+from collections.abc import Mapping
 from contextlib import asynccontextmanager
 from typing import Any
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
 
 from . import pdpa
 from .logging import get_logger, log_event
+from .profiler import MAX_SECONDS, ProfilerBusyError, SamplingProfiler
+from .ratelimit import BACKFILL, LIVE, FairScheduler, RateLimitedError, capture_mode
+from .recognition import CascadeResult, RecognizerCascade
+from .storage import ObjectFetcher, ObjectFetchError, ObjectTooLargeError, UnsupportedObjectError
 
 logger = get_logger()
+SERVICE_NAME = "ocr-worker"
+# Requests that do not prove they come from the API share this fair-queue flow.
+ANONYMOUS_FLOW = "anonymous"
+
+
+def _build_recognizer(env: Mapping[str, str]) -> RecognizerCascade | None:
+    """Build the ONNX recognizer cascade from `OCR_FAST_MODEL_PATH` / `OCR_MODEL_PATH`."""
+
+    model_paths = [
+        (name, env[key]) for name, key in (("fast", "OCR_FAST_MODEL_PATH"), ("full", "OCR_MODEL_PATH")) if env.get(key)
+    ]
+    if not model_paths:
+        return None
+
+    from .onnx_backend import DEFAULT_CHARSET, OnnxRecognizer, thread_settings  # noqa: PLC0415
+
+    # Tiers run one after another, but up to OCR_MAX_INFLIGHT recognitions run at once, each
+    # driving its own intra-op pool; share the CPU budget between those.
+    intra, inter = thread_settings(env, concurrency=int(env.get("OCR_MAX_INFLIGHT") or "1"))
+    tiers = [
+        OnnxRecognizer(
+            path,
+            name=name,
+            charset=env.get("OCR_CHARSET", DEFAULT_CHARSET),
+            intra_op_threads=intra,
+            inter_op_threads=inter,
+        )
+        for name, path in model_paths
+    ]
+    return RecognizerCascade(
+        tiers,
+        min_confidence=float(env.get("OCR_MIN_CONFIDENCE", "0.85")),
+        logger=logger,
+        stats_every=int(env.get("OCR_STATS_LOG_EVERY") or "100"),
+    )
+
+
+def _build_fetcher(env: Mapping[str, str]) -> ObjectFetcher | None:
+    """Build the storage fetcher only when `STORAGE_ALLOWED_HOSTS` names the hosts references may use."""
+
+    hosts = [host.strip() for host in env.get("STORAGE_ALLOWED_HOSTS", "").split(",") if host.strip()]
+    if not hosts:
+        return None
+    return ObjectFetcher(
+        max_bytes=int(env.get("MAX_IMAGE_MB", "5")) * 1024 * 1024,
+        chunk_bytes=int(env.get("STORAGE_RANGE_BYTES", str(1024 * 1024))),
+        timeout=int(env.get("TIMEOUT_MS", "15000")) / 1000,
+        allowed_hosts=hosts,
+    )
+
+
+def _build_scheduler(env: Mapping[str, str]) -> FairScheduler | None:
+    """Cap concurrent recognitions at `OCR_MAX_INFLIGHT` and queue the rest fairly per uploader."""
+
+    inflight = int(env.get("OCR_MAX_INFLIGHT") or "0")
+    if inflight <= 0:
+        return None
+    return FairScheduler(
+        capacity=inflight,
+        weights={LIVE: float(env.get("OCR_LIVE_WEIGHT", "4")), BACKFILL: 1.0},
+        max_queue=int(env.get("OCR_QUEUE_MAX", "256")),
+        max_wait=float(env.get("OCR_QUEUE_TIMEOUT_SECONDS", "10")),
+    )
+
+
+def _flow_key(request: Request) -> str:
+    """Fair-queue flow for a request: the forwarded user only when the caller presents `OCR_CALLER_SECRET`.
+
+    The API forwards its verified token subject in `x-user-id`. Without the
+    shared secret that header (like anything in the body) is caller-chosen, so
+    such requests all queue in one flow and cannot push back a real user's work.
+    """
+
+    secret = os.environ.get("OCR_CALLER_SECRET", "")
+    supplied = request.headers.get("x-caller-secret", "")
+    user_id = request.headers.get("x-user-id")
+    if user_id and secret and hmac.compare_digest(secret.encode(), supplied.encode()):
+        return user_id
+    return ANONYMOUS_FLOW
+
+
+def _build_profiler(env: Mapping[str, str]) -> SamplingProfiler | None:
+    """Create the on-demand profiler only when `DEBUG_PROFILE_ENABLED=true` and a token is set."""
+
+    if env.get("DEBUG_PROFILE_ENABLED", "false").lower() != "true" or not env.get("DEBUG_PROFILE_TOKEN"):
+        return None
+    return SamplingProfiler(max_seconds=float(env.get("DEBUG_PROFILE_MAX_SECONDS", str(MAX_SECONDS))))
 
 
 async def _run_worker(stop_event: asyncio.Event) -> None:
@@ -38,6 +134,31 @@ async def lifespan(app: FastAPI):
         raise RuntimeError("OCR worker refused to start due to credential violation") from exc
 
     app.state.supabase_credentials = sanitized_env
+    recognizer = _build_recognizer(os.environ)
+    if recognizer is not None:
+        # Load sessions before serving so cold-start model loading never lands on a request.
+        for tier in recognizer.tiers:
+            await asyncio.to_thread(tier.load)
+        log_event(
+            logger,
+            op_id="startup",
+            code="MODEL_READY",
+            duration_ms=0,
+            message="OCR models preloaded",
+            tiers=[tier.name for tier in recognizer.tiers],
+        )
+    app.state.recognizer = recognizer
+    app.state.object_fetcher = _build_fetcher(os.environ)
+    if app.state.object_fetcher is None:
+        log_event(
+            logger,
+            op_id="startup",
+            code="FETCH_OFF",
+            duration_ms=0,
+            message="STORAGE_ALLOWED_HOSTS is not set; /recognize is disabled",
+        )
+    app.state.profiler = _build_profiler(os.environ)
+    app.state.scheduler = _build_scheduler(os.environ)
     stop_event = asyncio.Event()
     # Spawn the background loop that performs periodic OCR tasks.
     worker_task: asyncio.Task[Any] = asyncio.create_task(_run_worker(stop_event))
@@ -55,6 +176,103 @@ async def lifespan(app: FastAPI):
 app = FastAPI(title="Container Base OCR Worker", version="0.1.0", lifespan=lifespan)
 
 
+class RecognizeRequest(BaseModel):
+    """Reference to an uploaded image; the worker never receives image bytes from the API."""
+
+    object_url: str = Field(..., min_length=1)
+
+
+async def _fetch_and_recognize(
+    recognizer: RecognizerCascade, fetcher: ObjectFetcher, object_url: str
+) -> CascadeResult:
+    try:
+        image = await asyncio.to_thread(fetcher.fetch, object_url)
+    except ObjectTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except UnsupportedObjectError as exc:
+        raise HTTPException(status_code=415, detail=str(exc)) from exc
+    except ObjectFetchError as exc:
+        log_event(logger, op_id="object_fetch", code="FETCH_FAIL", duration_ms=0, message=str(exc))
+        raise HTTPException(status_code=502, detail="Object could not be fetched") from exc
+    return await asyncio.to_thread(recognizer.recognize, image)
+
+
+@app.post("/recognize")
+async def recognize(body: RecognizeRequest, request: Request) -> dict[str, Any]:
+    """Fetch an uploaded image by reference and run the recognizer cascade on it."""
+
+    recognizer: RecognizerCascade | None = getattr(request.app.state, "recognizer", None)
+    fetcher: ObjectFetcher | None = getattr(request.app.state, "object_fetcher", None)
+    if recognizer is None or fetcher is None:
+        raise HTTPException(status_code=503, detail="Recognizer is not configured")
+
+    scheduler: FairScheduler | None = getattr(request.app.state, "scheduler", None)
+    if scheduler is None:
+        result = await _fetch_and_recognize(recognizer, fetcher, body.object_url)
+    else:
+        mode = capture_mode(request.headers)
+        try:
+            async with scheduler.slot(_flow_key(request), mode):
+                result = await _fetch_and_recognize(recognizer, fetcher, body.object_url)
+        except RateLimitedError as exc:
+            retry_after = max(1, math.ceil(exc.retry_after))
+            log_event(
+                logger,
+                op_id="rate_limit",
+                code="THROTTLED",
+                duration_ms=0,
+                message=exc.reason,
+                mode=mode,
+                retry_after=retry_after,
+            )
+            raise HTTPException(
+                status_code=429, detail=exc.reason, headers={"Retry-After": str(retry_after)}
+            ) from exc
+    reading = result.recognition
+    return {
+        "text": reading.text if reading else None,
+        "confidence": reading.confidence if reading else None,
+        "accepted": result.accepted,
+        "tier": result.tier,
+    }
+
+
+@app.get("/debug/profile", response_model=None)
+async def debug_profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0, le=MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    output: str = Query("collapsed", alias="format", pattern="^(collapsed|speedscope)$"),
+) -> PlainTextResponse | dict[str, Any]:
+    """Capture a sampling profile of this instance; enabled by `DEBUG_PROFILE_ENABLED`."""
+
+    profiler: SamplingProfiler | None = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        # Do not advertise the endpoint when profiling is switched off.
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = os.environ.get("DEBUG_PROFILE_TOKEN", "")
+    supplied = request.headers.get("x-debug-token", "")
+    if not token or not hmac.compare_digest(token.encode(), supplied.encode()):
+        raise HTTPException(status_code=401, detail="Invalid debug token")
+
+    try:
+        profile = await profiler.capture_async(seconds, interval=interval_ms / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    log_event(
+        logger,
+        op_id="debug_profile",
+        code="PROFILE",
+        duration_ms=round(profile.duration * 1000),
+        message="Sampling profile captured",
+        samples=profile.samples,
+        overhead_pct=profile.overhead_pct,
+    )
+    if output == "speedscope":
+        return profile.speedscope(name=SERVICE_NAME)
+    return PlainTextResponse(profile.collapsed())
+
+
 @app.get("/healthz")
 async def healthz() -> dict[str, str]:
     """Liveness probe endpoint for Cloud Run."""
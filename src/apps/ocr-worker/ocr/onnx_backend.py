@@ -0,0 +1,190 @@
+"""ONNX Runtime CPU recognizer backend for the OCR worker."""
+from __future__ import annotations
+
+import io
+import math
+import os
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+from .recognition import Recognition
+
+__all__ = [
+    "DEFAULT_CHARSET",
+    "OnnxRecognizer",
+    "cgroup_cpu_limit",
+    "ctc_greedy_decode",
+    "resolve_model_path",
+    "thread_settings",
+]
+
+# Index 0 is reserved for the CTC blank symbol.
+DEFAULT_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> float | None:
+    """Return the container CPU quota in cores (cgroup v2 or v1), or None when unlimited."""
+
+    cpu_max = root / "cpu.max"
+    try:
+        if cpu_max.exists():
+            quota, _, period = cpu_max.read_text().strip().partition(" ")
+            if quota == "max":
+                return None
+            return int(quota) / int(period or "100000")
+
+        quota_file = root / "cpu" / "cpu.cfs_quota_us"
+        period_file = root / "cpu" / "cpu.cfs_period_us"
+        if quota_file.exists() and period_file.exists():
+            quota_us = int(quota_file.read_text().strip())
+            if quota_us <= 0:
+                return None
+            return quota_us / int(period_file.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def thread_settings(env: Mapping[str, str], root: Path = CGROUP_ROOT, *, concurrency: int = 1) -> tuple[int, int]:
+    """Choose per-inference (intra_op, inter_op) thread counts that fit the container's CPU quota.
+
+    `OCR_INTRA_OP_THREADS` / `OCR_INTER_OP_THREADS` override the derived values;
+    empty values fall back to them. Oversubscribing a fractional Cloud Run CPU
+    makes every inference slower, so the intra-op budget is capped at the quota
+    rounded up to whole cores and split across the `concurrency` recognitions that
+    may run at once (each in its own `asyncio.to_thread` call).
+    """
+
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        available = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    cores = max(1, min(available, math.ceil(limit))) if limit is not None else available
+
+    budget = int(env.get("OCR_INTRA_OP_THREADS") or cores)
+    inter = int(env.get("OCR_INTER_OP_THREADS") or 1)
+    return max(1, budget // max(1, concurrency)), max(1, inter)
+
+
+def resolve_model_path(path: str | Path, *, prefer_int8: bool = True) -> Path:
+    """Return `path`, or its INT8-quantized sibling (`<stem>.int8.onnx`) when one exists."""
+
+    model = Path(path)
+    if prefer_int8 and not model.stem.endswith(".int8"):
+        quantized = model.with_name(f"{model.stem}.int8{model.suffix}")
+        if quantized.exists():
+            return quantized
+    return model
+
+
+def ctc_greedy_decode(probabilities: Any, charset: str = DEFAULT_CHARSET) -> Recognition:
+    """Decode a `(time, classes)` probability matrix with greedy CTC (blank = class 0)."""
+
+    import numpy as np  # noqa: PLC0415
+
+    best = np.asarray(probabilities).reshape(-1, len(charset) + 1)
+    indices = best.argmax(axis=1)
+    scores = best.max(axis=1)
+    chars: list[str] = []
+    kept: list[float] = []
+    previous = 0
+    for index, score in zip(indices.tolist(), scores.tolist(), strict=True):
+        if index != 0 and index != previous:
+            chars.append(charset[index - 1])
+            kept.append(score)
+        previous = index
+    confidence = float(sum(kept) / len(kept)) if kept else 0.0
+    return Recognition("".join(chars), confidence)
+
+
+def _default_preprocess(image: bytes, height: int, width: int) -> Any:
+    """Decode an image into a normalized `(1, 1, height, width)` float32 tensor."""
+
+    import numpy as np  # noqa: PLC0415
+    from PIL import Image  # noqa: PLC0415
+
+    with Image.open(io.BytesIO(image)) as decoded:
+        grayscale = decoded.convert("L").resize((width, height), Image.Resampling.BILINEAR)
+        pixels = np.asarray(grayscale, dtype=np.float32)
+    pixels = (pixels / 255.0 - 0.5) / 0.5
+    return np.ascontiguousarray(pixels[np.newaxis, np.newaxis, :, :])
+
+
+class OnnxRecognizer:
+    """Text recognizer backed by an ONNX Runtime CPU session.
+
+    The session is created lazily or explicitly via `load()` (the worker does this
+    during `lifespan` so the first request does not pay for model loading). Inputs
+    and outputs are bound through IO binding so ONNX Runtime reads the
+    preprocessed array in place instead of copying it per run.
+    """
+
+    def __init__(
+        self,
+        model_path: str | Path,
+        *,
+        name: str = "onnx",
+        charset: str = DEFAULT_CHARSET,
+        input_size: tuple[int, int] = (48, 320),
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1,
+        prefer_int8: bool = True,
+        preprocess: Callable[[bytes, int, int], Any] | None = None,
+        session: Any | None = None,
+    ) -> None:
+        self.name = name
+        self.model_path = resolve_model_path(model_path, prefer_int8=prefer_int8)
+        self.charset = charset
+        self.input_size = input_size
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self._preprocess = preprocess or _default_preprocess
+        self._session = session
+        self._input_name: str | None = None
+        self._output_name: str | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
+
+    def load(self) -> None:
+        """Create the inference session and run one warm-up pass."""
+
+        if self._session is None:
+            import onnxruntime as ort  # noqa: PLC0415
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.intra_op_threads
+            options.inter_op_num_threads = self.inter_op_threads
+            options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            # Spinning idle threads burns billed CPU on Cloud Run between requests.
+            options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+            self._session = ort.InferenceSession(
+                str(self.model_path), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+        self._input_name = self._session.get_inputs()[0].name
+        self._output_name = self._session.get_outputs()[0].name
+
+        import numpy as np  # noqa: PLC0415
+
+        height, width = self.input_size
+        self._run(np.zeros((1, 1, height, width), dtype=np.float32))
+
+    def _run(self, tensor: Any) -> Any:
+        binding = self._session.io_binding()
+        binding.bind_cpu_input(self._input_name, tensor)
+        binding.bind_output(self._output_name, "cpu")
+        self._session.run_with_iobinding(binding)
+        return binding.get_outputs()[0].numpy()
+
+    def recognize(self, image: bytes) -> Recognition | None:
+        if self._input_name is None:
+            self.load()
+        height, width = self.input_size
+        output = self._run(self._preprocess(image, height, width))
+        reading = ctc_greedy_decode(output, self.charset)
+        return reading if reading.text else None
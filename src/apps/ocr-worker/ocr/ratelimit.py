@@ -0,0 +1,127 @@
+"""Weighted fair admission to recognition so one operator's backlog cannot starve the rest."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+
+__all__ = ["BACKFILL", "LIVE", "FairScheduler", "RateLimitedError", "capture_mode"]
+
+# Clients tag offline-queue replays with `x-capture-mode: backfill`; anything else is a live capture.
+CAPTURE_MODE_HEADER = "x-capture-mode"
+LIVE = "live"
+BACKFILL = "backfill"
+
+
+def capture_mode(headers: Mapping[str, str]) -> str:
+    return BACKFILL if headers.get(CAPTURE_MODE_HEADER, "").strip().lower() == BACKFILL else LIVE
+
+
+class RateLimitedError(Exception):
+    """Raised when a request must be rejected; `retry_after` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class FairScheduler:
+    """Weighted fair queuing over a fixed number of in-flight slots.
+
+    While slots are free, requests pass straight through. Once saturated, each
+    waiting request gets a virtual finish tag `max(vtime, last tag of its flow)
+    + 1 / weight`, and freed slots go to the smallest tag. A flow is one user
+    in one capture mode, so a device with a deep backlog only delays itself,
+    and live captures (higher weight) are served ahead of backfill without
+    starving it.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        weights: Mapping[str, float] | None = None,
+        max_queue: int = 256,
+        max_wait: float = 10.0,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.weights = dict(weights or {LIVE: 4.0, BACKFILL: 1.0})
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._virtual = 0.0
+        self._finish: dict[tuple[str, str], float] = {}
+        self._queue: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        # Smoothed slot hold time, used to tell rejected clients when to come back.
+        self._service_seconds = 1.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def retry_after(self) -> float:
+        return (len(self._queue) + 1) / self.capacity * self._service_seconds
+
+    @asynccontextmanager
+    async def slot(self, key: str, mode: str = LIVE) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the body of the `async with` block."""
+
+        await self._acquire(key, mode)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_seconds += 0.2 * (time.monotonic() - start - self._service_seconds)
+            self._active -= 1
+            self._dispatch()
+
+    async def _acquire(self, key: str, mode: str) -> None:
+        if self._active < self.capacity and not self._queue:
+            self._active += 1
+            return
+        if len(self._queue) >= self.max_queue:
+            raise RateLimitedError("OCR queue is full", self.retry_after())
+
+        flow = (key, mode)
+        finish = max(self._virtual, self._finish.get(flow, 0.0)) + 1.0 / self.weights.get(mode, 1.0)
+        self._finish[flow] = finish
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (finish, next(self._sequence), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except TimeoutError:
+            if future.done() and not future.cancelled():
+                # Granted in the same tick the wait expired; hand the slot on.
+                self._active -= 1
+                self._dispatch()
+            future.cancel()
+            raise RateLimitedError("Timed out waiting for an OCR slot", self.retry_after()) from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._active -= 1
+                self._dispatch()
+            future.cancel()
+            raise
+
+    def _dispatch(self) -> None:
+        while self._active < self.capacity and self._queue:
+            finish, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self._virtual = finish
+            self._active += 1
+            future.set_result(None)
+        if not self._queue:
+            # No backlog: all flows are even again, so finish tags can be forgotten.
+            self._finish.clear()
@@ -0,0 +1,227 @@
+"""Tiered container-number recognition for the OCR worker."""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from .logging import log_event
+
+__all__ = [
+    "CascadeResult",
+    "Recognition",
+    "Recognizer",
+    "RecognizerCascade",
+    "iso6346_check_digit",
+    "is_valid_container_number",
+    "normalize_container_number",
+]
+
+
+def _letter_values() -> dict[str, int]:
+    # ISO 6346 letter values start at 10 and skip multiples of 11 (11, 22, 33).
+    values: dict[str, int] = {}
+    value = 10
+    for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        if value % 11 == 0:
+            value += 1
+        values[letter] = value
+        value += 1
+    return values
+
+
+_LETTER_VALUES = _letter_values()
+_CONTAINER_PATTERN = re.compile(r"[A-Z]{3}[UJZ]\d{7}")
+
+
+def iso6346_check_digit(code: str) -> int:
+    """Return the ISO 6346 check digit for the first ten characters of `code`."""
+
+    total = 0
+    for position, char in enumerate(code[:10]):
+        value = _LETTER_VALUES[char] if char.isalpha() else int(char)
+        total += value << position
+    return total % 11 % 10
+
+
+def normalize_container_number(text: str) -> str:
+    """Uppercase and strip separators that OCR engines commonly emit (spaces, dashes)."""
+
+    return "".join(char for char in text.upper() if char.isalnum())
+
+
+def is_valid_container_number(text: str) -> bool:
+    """True when `text` is an owner/category/serial code whose check digit verifies."""
+
+    code = normalize_container_number(text)
+    if not _CONTAINER_PATTERN.fullmatch(code):
+        return False
+    return iso6346_check_digit(code) == int(code[10])
+
+
+@dataclass(frozen=True, slots=True)
+class Recognition:
+    """Text read from an image together with the engine's confidence (0.0–1.0)."""
+
+    text: str
+    confidence: float
+
+
+class Recognizer(Protocol):
+    """Pluggable recognition backend used as one tier of the cascade."""
+
+    name: str
+
+    def recognize(self, image: bytes) -> Recognition | None:
+        """Return the best reading for `image`, or None when nothing was found."""
+
+
+@dataclass(slots=True)
+class TierStats:
+    calls: int = 0
+    accepted: int = 0
+    errors: int = 0
+    total_ns: int = 0
+
+    def to_dict(self) -> dict[str, float | int]:
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "errors": self.errors,
+            "hit_rate": round(self.accepted / self.calls, 4) if self.calls else 0.0,
+            "avg_ms": round(self.total_ns / self.calls / 1_000_000, 3) if self.calls else 0.0,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class CascadeResult:
+    """Outcome of a cascade run: the chosen reading and how much work it took."""
+
+    recognition: Recognition | None
+    tier: str | None
+    accepted: bool
+    tier_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return sum(self.tier_ms.values())
+
+
+class RecognizerCascade:
+    """Run cheap recognizers first and escalate only when their reading is not trustworthy.
+
+    A reading is accepted when its confidence reaches `min_confidence` and the
+    container number passes the ISO 6346 check digit. Otherwise the next (more
+    expensive) tier runs. When no tier is accepted, the highest-confidence
+    reading is returned with `accepted=False` so callers can route it to review.
+
+    Runs may happen concurrently on worker threads, so tier counters are updated
+    under a lock. Every `stats_every` runs the per-tier hit rates are logged.
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[Recognizer],
+        *,
+        min_confidence: float = 0.85,
+        logger: logging.Logger | None = None,
+        stats_every: int = 100,
+    ) -> None:
+        if not tiers:
+            raise ValueError("RecognizerCascade requires at least one tier")
+        self.tiers = tuple(tiers)
+        self.min_confidence = min_confidence
+        self.stats_every = stats_every
+        self._logger = logger
+        self._stats = {tier.name: TierStats() for tier in self.tiers}
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def recognize(self, image: bytes) -> CascadeResult:
+        best: Recognition | None = None
+        best_tier: str | None = None
+        tier_ms: dict[str, float] = {}
+        timings: list[tuple[str, int, bool]] = []
+        result: CascadeResult | None = None
+
+        for tier in self.tiers:
+            failed = False
+            start_ns = time.perf_counter_ns()
+            try:
+                reading = tier.recognize(image)
+            except Exception:  # noqa: BLE001 - a failing tier escalates instead of failing the request
+                reading = None
+                failed = True
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            timings.append((tier.name, elapsed_ns, failed))
+            tier_ms[tier.name] = elapsed_ns / 1_000_000
+
+            if reading is None:
+                continue
+            reading = Recognition(normalize_container_number(reading.text), reading.confidence)
+            if reading.confidence >= self.min_confidence and is_valid_container_number(reading.text):
+                result = CascadeResult(reading, tier.name, True, tier_ms)
+                break
+            if best is None or reading.confidence > best.confidence:
+                best, best_tier = reading, tier.name
+
+        if result is None:
+            result = CascadeResult(best, best_tier, False, tier_ms)
+        runs, snapshot = self._record(timings, result)
+        self._log(result)
+        if snapshot is not None:
+            self._log_stats(runs, snapshot)
+        return result
+
+    def stats(self) -> dict[str, dict[str, float | int]]:
+        """Per-tier call counts, hit rates, and mean latency since startup."""
+
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def _record(
+        self, timings: list[tuple[str, int, bool]], result: CascadeResult
+    ) -> tuple[int, dict[str, dict[str, float | int]] | None]:
+        with self._lock:
+            for name, elapsed_ns, failed in timings:
+                stats = self._stats[name]
+                stats.calls += 1
+                stats.total_ns += elapsed_ns
+                stats.errors += failed
+            if result.accepted and result.tier is not None:
+                self._stats[result.tier].accepted += 1
+            self._runs += 1
+            if self.stats_every <= 0 or self._runs % self.stats_every:
+                return self._runs, None
+            return self._runs, {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def _log_stats(self, runs: int, snapshot: dict[str, dict[str, float | int]]) -> None:
+        if self._logger is None:
+            return
+        log_event(
+            self._logger,
+            op_id="ocr_cascade",
+            code="OCR_TIER_STATS",
+            duration_ms=0,
+            message="Cascade tier hit rates",
+            runs=runs,
+            tiers=snapshot,
+        )
+
+    def _log(self, result: CascadeResult) -> None:
+        if self._logger is None:
+            return
+        log_event(
+            self._logger,
+            op_id="ocr_cascade",
+            code="OCR_OK" if result.accepted else "OCR_FAIL",
+            duration_ms=round(result.duration_ms),
+            message="Container number accepted" if result.accepted else "No tier produced a valid container number",
+            tier=result.tier,
+            tiers_tried=len(result.tier_ms),
+            tier_ms={name: round(ms, 2) for name, ms in result.tier_ms.items()},
+        )
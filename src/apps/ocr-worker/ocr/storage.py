@@ -0,0 +1,139 @@
+"""Fetch uploaded images from object storage by reference using ranged reads."""
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable
+from typing import Any
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+__all__ = [
+    "ObjectFetchError",
+    "ObjectFetcher",
+    "ObjectTooLargeError",
+    "UnsupportedObjectError",
+    "sniff_image_type",
+]
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class ObjectFetchError(RuntimeError):
+    """Raised when an object cannot be read from storage."""
+
+
+class ObjectTooLargeError(ObjectFetchError):
+    """Raised when an object exceeds the worker's `MAX_IMAGE_MB` limit."""
+
+
+class UnsupportedObjectError(ObjectFetchError):
+    """Raised when an object is not a JPEG, PNG, or WebP image."""
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """Return the image media type implied by the leading bytes, or None."""
+
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class _RefuseRedirects(HTTPRedirectHandler):
+    """Surface 3xx responses as errors instead of following them to another host."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_open_without_redirects = build_opener(_RefuseRedirects).open
+
+
+class ObjectFetcher:
+    """Download objects through presigned GET URLs in fixed-size byte ranges.
+
+    The first range doubles as a probe: it reveals the object size (via
+    `Content-Range`) and the file signature, so oversized or non-image objects
+    are rejected after reading at most `chunk_bytes`. Each later range is
+    retried on its own, so a dropped connection does not restart the download.
+
+    References come from clients, so only `allowed_hosts` may be contacted and
+    redirects are never followed; otherwise the worker could be pointed at
+    internal endpoints such as the metadata server.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        chunk_bytes: int = 1024 * 1024,
+        retries: int = 2,
+        timeout: float = 10.0,
+        allowed_hosts: Iterable[str],
+        opener: Callable[..., Any] = _open_without_redirects,
+    ) -> None:
+        self.allowed_hosts = frozenset(allowed_hosts)
+        if not self.allowed_hosts:
+            raise ValueError("ObjectFetcher requires at least one allowed storage host")
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+        self.retries = retries
+        self.timeout = timeout
+        self._opener = opener
+
+    def fetch(self, url: str) -> bytes:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"}:
+            raise ObjectFetchError("Object reference must be an http(s) URL")
+        if parts.netloc not in self.allowed_hosts:
+            # Only follow references into our own storage; anything else is an SSRF vector.
+            raise ObjectFetchError(f"Object host {parts.netloc!r} is not allowed")
+
+        head, total = self._read_range(url, 0, self.chunk_bytes - 1)
+        if total is not None and total > self.max_bytes:
+            raise ObjectTooLargeError(f"Object is {total} bytes; limit is {self.max_bytes}")
+        if sniff_image_type(head) is None:
+            raise UnsupportedObjectError("Object is not a JPEG, PNG, or WebP image")
+        if total is None or len(head) >= total:
+            if len(head) > self.max_bytes:
+                raise ObjectTooLargeError(f"Object exceeds {self.max_bytes} bytes")
+            return head
+
+        buffer = bytearray(total)
+        buffer[: len(head)] = head
+        offset = len(head)
+        while offset < total:
+            end = min(offset + self.chunk_bytes, total) - 1
+            chunk, _ = self._read_range(url, offset, end)
+            if not chunk:
+                raise ObjectFetchError(f"Object store returned no data at offset {offset}")
+            buffer[offset : offset + len(chunk)] = chunk
+            offset += len(chunk)
+        return bytes(buffer)
+
+    def _read_range(self, url: str, start: int, end: int) -> tuple[bytes, int | None]:
+        request = Request(url, headers={"Range": f"bytes={start}-{end}"})
+        for attempt in range(self.retries + 1):
+            try:
+                with self._opener(request, timeout=self.timeout) as response:
+                    body = response.read()
+                    status = getattr(response, "status", 200)
+                    content_range = response.headers.get("Content-Range", "")
+            except HTTPError as exc:
+                if exc.code < 500 or attempt == self.retries:
+                    raise ObjectFetchError(f"Object store responded {exc.code}") from exc
+            except OSError as exc:
+                if attempt == self.retries:
+                    raise ObjectFetchError(f"Object store request failed: {exc}") from exc
+            else:
+                if status != 206:
+                    # The store ignored the Range header and sent the whole object.
+                    return body, len(body)
+                match = _CONTENT_RANGE.fullmatch(content_range.strip())
+                total = int(match.group(3)) if match and match.group(3) != "*" else None
+                return body, total
+        raise AssertionError("unreachable")  # pragma: no cover
@@ -0,0 +1,281 @@
+"""Bearer token verification and cache tests for the API auth dependency."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+from conftest import JWT_SECRET, b64url, jwt_segment, mint_token
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _verifier(clock: FakeClock, **kwargs):
+    from src.apps.api.service.auth import TokenVerifier  # noqa: PLC0415
+
+    return TokenVerifier(hmac_secret=JWT_SECRET, leeway_seconds=0, clock=clock, **kwargs)
+
+
+def test_verified_tokens_are_cached_until_expiry() -> None:
+    """A token is verified once and served from cache until its `exp` claim passes."""
+    from src.apps.api.service.auth import AuthError  # noqa: PLC0415
+
+    clock = FakeClock()
+    verifier = _verifier(clock)
+    token = mint_token({"sub": "user-123", "exp": 1_060})
+
+    for _ in range(5):
+        assert verifier.verify(token).subject == "user-123"
+    assert (verifier.misses, verifier.hits) == (1, 4)
+
+    clock.now = 1_061
+    with pytest.raises(AuthError):
+        verifier.verify(token)
+
+
+def test_forged_and_malformed_tokens_are_rejected() -> None:
+    """Bad signatures, unsupported algorithms, and missing claims must fail verification."""
+    from src.apps.api.service.auth import AuthError  # noqa: PLC0415
+
+    verifier = _verifier(FakeClock())
+    bad_tokens = [
+        mint_token({"sub": "user-123", "exp": 2_000}, secret="other-secret"),
+        mint_token({"sub": "user-123", "exp": 2_000}, alg="none"),
+        mint_token({"sub": "user-123"}),
+        mint_token({"exp": 2_000}),
+        "not-a-jwt",
+    ]
+    for token in bad_tokens:
+        with pytest.raises(AuthError):
+            verifier.verify(token)
+    assert verifier.hits == 0
+
+
+def test_cache_is_bounded_lru() -> None:
+    """The cache evicts least recently used tokens beyond `max_entries`."""
+    verifier = _verifier(FakeClock(), max_entries=2)
+    tokens = [mint_token({"sub": f"user-{index}", "exp": 2_000}) for index in range(3)]
+
+    for token in tokens:
+        verifier.verify(token)
+    verifier.verify(tokens[0])
+    assert verifier.misses == 4
+
+
+def test_require_user_checks_consent_subject() -> None:
+    """The dependency only accepts tokens whose subject matches the PDPA consent record."""
+    pytest.importorskip("httpx")
+    from fastapi import Depends, FastAPI, Request  # noqa: PLC0415
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+    from src.apps.api.service.auth import TokenClaims, TokenVerifier, require_user  # noqa: PLC0415
+
+    app = FastAPI()
+    app.state.token_verifier = TokenVerifier(hmac_secret=JWT_SECRET)
+
+    @app.middleware("http")
+    async def consent(request: Request, call_next):
+        request.state.consent_record = pdpa.ConsentRecord(user_id="user-123", consented_at="2025-11-01T10:00:00Z")
+        return await call_next(request)
+
+    @app.get("/me")
+    async def me(claims: TokenClaims = Depends(require_user)) -> dict[str, str]:  # noqa: B008
+        return {"sub": claims.subject}
+
+    client = TestClient(app)
+    exp = 4_102_444_800
+    own = mint_token({"sub": "user-123", "exp": exp})
+    other = mint_token({"sub": "user-999", "exp": exp})
+
+    assert client.get("/me", headers={"authorization": f"Bearer {own}"}).json() == {"sub": "user-123"}
+    assert client.get("/me", headers={"authorization": f"Bearer {other}"}).status_code == 403
+    assert client.get("/me").status_code == 401
+
+
+class StandInIssuer:
+    """Serve a JWKS document from a local HTTP server and count fetches."""
+
+    def __init__(self) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: PLC0415
+
+        issuer = self
+        self.keys: list[dict] = []
+        self.fetches = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:  # noqa: N802
+                issuer.fetches += 1
+                body = json.dumps({"keys": issuer.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/.well-known/jwks.json"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class RSAKey:
+    def __init__(self, kid: str) -> None:
+        from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: PLC0415
+
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def jwk(self) -> dict:
+        numbers = self.private_key.public_key().public_numbers()
+
+        def encode(value: int) -> str:
+            return b64url(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+
+        return {"kty": "RSA", "use": "sig", "alg": "RS256", "kid": self.kid, "n": encode(numbers.n), "e": encode(numbers.e)}
+
+    def token(self, claims: dict, kid: str | None = None) -> str:
+        from cryptography.hazmat.primitives import hashes  # noqa: PLC0415
+        from cryptography.hazmat.primitives.asymmetric import padding  # noqa: PLC0415
+
+        signing_input = f"{jwt_segment({'alg': 'RS256', 'typ': 'JWT', 'kid': kid or self.kid})}.{jwt_segment(claims)}"
+        signature = self.private_key.sign(signing_input.encode(), padding.PKCS1v15(), hashes.SHA256())
+        return f"{signing_input}.{b64url(signature)}"
+
+
+@pytest.fixture(scope="module")
+def rsa_keys() -> tuple[RSAKey, RSAKey]:
+    pytest.importorskip("cryptography")
+    return RSAKey("key-1"), RSAKey("key-2")
+
+
+@pytest.fixture
+def issuer():
+    server = StandInIssuer()
+    yield server
+    server.close()
+
+
+def test_rs256_tokens_verify_against_jwks(rsa_keys) -> None:
+    """RS256 tokens verify with the matching JWK; wrong keys and unknown key ids are rejected."""
+    from src.apps.api.service.auth import AuthError, JWKSCache, TokenVerifier  # noqa: PLC0415
+
+    first, second = rsa_keys
+    jwks = JWKSCache("http://issuer.invalid/jwks.json")
+    jwks.load({"keys": [first.jwk(), {"kty": "EC", "kid": "ignored"}]})
+    verifier = TokenVerifier(jwks=jwks, clock=FakeClock())
+
+    assert verifier.verify(first.token({"sub": "user-123", "exp": 2_000})).subject == "user-123"
+    for token in (
+        second.token({"sub": "user-123", "exp": 2_000}, kid="key-1"),
+        second.token({"sub": "user-123", "exp": 2_000}),
+        mint_token({"sub": "user-123", "exp": 2_000}),
+    ):
+        with pytest.raises(AuthError):
+            verifier.verify(token)
+
+
+def test_lifespan_preloads_jwks(rsa_keys, issuer: StandInIssuer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """With `JWKS_URL` set the API boots with the key set loaded and accepts RS256 tokens."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.main import app  # noqa: PLC0415
+
+    first, _ = rsa_keys
+    issuer.keys = [first.jwk()]
+    monkeypatch.setenv("JWKS_URL", issuer.url)
+    monkeypatch.delenv("JWT_SECRET", raising=False)
+    headers = {"x-user-id": "user-123", "x-pdpa-consent-status": "active"}
+    token = first.token({"sub": "user-123", "exp": 4_102_444_800})
+    try:
+        with TestClient(app) as client:
+            assert issuer.fetches == 1
+            # Authenticated, then 503 because no task store is configured in this test.
+            response = client.get("/sync/changes", headers={**headers, "authorization": f"Bearer {token}"})
+            assert response.status_code == 503
+            assert client.get("/sync/changes", headers=headers).status_code == 401
+    finally:
+        app.state.token_verifier = None
+
+
+def test_lifespan_survives_an_issuer_outage(issuer: StandInIssuer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failed JWKS preload is logged and left to the background refresh instead of aborting startup."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.main import app  # noqa: PLC0415
+
+    url = issuer.url
+    issuer.close()
+    monkeypatch.setenv("JWKS_URL", url)
+    monkeypatch.delenv("JWT_SECRET", raising=False)
+    headers = {"x-user-id": "user-123", "x-pdpa-consent-status": "active"}
+    try:
+        with TestClient(app) as client:
+            assert app.state.token_verifier.jwks.refreshes == 1
+            assert client.get("/healthz").status_code == 200
+            assert client.get("/sync/changes", headers=headers).status_code == 401
+    finally:
+        app.state.token_verifier = None
+
+
+def test_unknown_kid_refreshes_early_at_most_once_per_interval(rsa_keys, issuer: StandInIssuer) -> None:
+    """Key rotation is picked up by the background task; unknown `kid` floods do not hammer the issuer."""
+    from src.apps.api.service.auth import JWKSCache  # noqa: PLC0415
+
+    first, second = rsa_keys
+    issuer.keys = [first.jwk()]
+    clock = FakeClock()
+    jwks = JWKSCache(issuer.url, refresh_seconds=3600, min_refresh_seconds=60, clock=clock)
+
+    async def wait_for_fetches(count: int) -> None:
+        for _ in range(200):
+            if issuer.fetches >= count:
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"expected {count} fetches, saw {issuer.fetches}")
+
+    async def scenario() -> None:
+        jwks.refresh()
+        stop = asyncio.Event()
+        task = asyncio.create_task(jwks.run(stop))
+        await asyncio.sleep(0)
+
+        issuer.keys = [first.jwk(), second.jwk()]
+        clock.now += 61
+        assert jwks.get("key-2") is None
+        await wait_for_fetches(2)
+        for _ in range(50):
+            if jwks.get("key-2") is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert jwks.get("key-2") is not None
+
+        for index in range(20):
+            assert jwks.get(f"forged-{index}") is None
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        assert issuer.fetches == 2
+
+        clock.now += 61
+        jwks.get("forged-again")
+        await wait_for_fetches(3)
+
+        stop.set()
+        task.cancel()
+
+    asyncio.run(scenario())
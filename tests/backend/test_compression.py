@@ -0,0 +1,108 @@
+"""Negotiated response compression middleware tests."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+
+PAYLOAD = json.dumps([{"task_id": index, "status": "under_review"} for index in range(200)]).encode()
+
+
+def _run(app, accept_encoding: str) -> tuple[dict[str, str], list[bytes]]:
+    from src.apps.api.service.compression import CompressionMiddleware  # noqa: PLC0415
+
+    middleware = CompressionMiddleware(app, minimum_size=512)
+    messages: list[dict] = []
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    return headers, [message.get("body", b"") for message in messages[1:]]
+
+
+def _app(chunks: list[bytes], content_type: str = "application/json"):
+    async def app(scope, receive, send) -> None:
+        headers = [(b"content-type", content_type.encode())]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+
+    return app
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip;q=0.5, br;q=0.9", "br"),
+        ("zstd;q=0, gzip", "gzip"),
+        ("identity", None),
+        ("*;q=0", None),
+    ],
+)
+def test_negotiate_encoding_honours_q_values(header: str, expected: str | None) -> None:
+    """Clients choose the codec via q-values; unsupported or refused codecs are skipped."""
+    from src.apps.api.service.compression import negotiate_encoding  # noqa: PLC0415
+
+    assert negotiate_encoding(header, supported=("zstd", "br", "gzip")) == expected
+
+
+def test_small_responses_are_not_compressed() -> None:
+    """Bodies under the threshold pass through with their original headers."""
+    headers, body = _run(_app([b'{"status":"ok"}']), "gzip")
+    assert "content-encoding" not in headers
+    assert b"".join(body) == b'{"status":"ok"}'
+
+
+def test_streamed_response_is_compressed_in_chunks() -> None:
+    """Multi-chunk responses are compressed incrementally and decode to the original bytes."""
+    chunks = [PAYLOAD[index : index + 1000] for index in range(0, len(PAYLOAD), 1000)]
+    headers, body = _run(_app(chunks), "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in headers["vary"].lower()
+    assert gzip.decompress(b"".join(body)) == PAYLOAD
+
+
+def test_content_length_is_dropped_when_compressing() -> None:
+    """A fixed content-length would be wrong once the body is re-encoded."""
+    headers, body = _run(_app([PAYLOAD]), "gzip")
+    assert "content-length" not in headers
+    assert gzip.decompress(b"".join(body)) == PAYLOAD
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_optional_codecs_round_trip(encoding: str) -> None:
+    """Brotli and zstd are used when the codec package is installed."""
+    module = pytest.importorskip("brotli" if encoding == "br" else "zstandard")
+    headers, body = _run(_app([PAYLOAD]), encoding)
+
+    assert headers["content-encoding"] == encoding
+    if encoding == "br":
+        assert module.decompress(b"".join(body)) == PAYLOAD
+    else:
+        assert module.ZstdDecompressor().decompressobj().decompress(b"".join(body)) == PAYLOAD
+
+
+def test_binary_content_is_not_recompressed() -> None:
+    """Already-compressed media such as JPEG images are passed through."""
+    image = bytes(range(256)) * 8
+    headers, body = _run(_app([image], content_type="image/jpeg"), "gzip")
+    assert "content-encoding" not in headers
+    assert b"".join(body) == image
@@ -0,0 +1,192 @@
+"""Consent resolver caching, coalescing, and fail-closed middleware tests."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StandInStore:
+    """Local stand-in for the Supabase `consent_records` table."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, dict[str, str | None]] = {}
+        self.calls = 0
+        self.delay = 0.0
+        self.fail = False
+
+    async def fetch_consent(self, user_id: str):
+        from src.apps.api.service import pdpa  # noqa: PLC0415
+
+        self.calls += 1
+        # Read before the simulated latency, like a query snapshot taken when it starts.
+        row = self.rows.get(user_id)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("store unavailable")
+        return pdpa.ConsentRecord.model_validate(row) if row else None
+
+
+@pytest.fixture
+def store() -> StandInStore:
+    store = StandInStore()
+    store.rows["user-123"] = {
+        "user_id": "user-123",
+        "consented_at": "2025-11-01T10:00:00Z",
+        "revoked_at": None,
+    }
+    return store
+
+
+def _resolver(store: StandInStore, clock: FakeClock | None = None):
+    from src.apps.api.service.consent import ConsentResolver  # noqa: PLC0415
+
+    return ConsentResolver(store, ttl_seconds=30, negative_ttl_seconds=5, clock=clock or FakeClock())
+
+
+def test_resolver_caches_until_ttl_expires(store: StandInStore) -> None:
+    """Repeated lookups within the TTL must not hit the store."""
+    clock = FakeClock()
+    resolver = _resolver(store, clock)
+
+    async def scenario() -> None:
+        for _ in range(3):
+            record = await resolver.resolve("user-123")
+            assert record is not None and record.revoked_at is None
+        assert store.calls == 1
+        clock.now = 31
+        await resolver.resolve("user-123")
+        assert store.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_resolver_coalesces_concurrent_misses(store: StandInStore) -> None:
+    """Concurrent misses for one user share a single store round trip."""
+    store.delay = 0.01
+    resolver = _resolver(store)
+
+    async def scenario() -> None:
+        results = await asyncio.gather(*(resolver.resolve("user-123") for _ in range(20)))
+        assert all(result is not None for result in results)
+
+    asyncio.run(scenario())
+    assert store.calls == 1
+    assert resolver.coalesced == 19
+
+
+def test_resolver_negatively_caches_missing_consent(store: StandInStore) -> None:
+    """Users without consent rows are cached as None for the shorter negative TTL."""
+    clock = FakeClock()
+    resolver = _resolver(store, clock)
+
+    async def scenario() -> None:
+        assert await resolver.resolve("ghost") is None
+        assert await resolver.resolve("ghost") is None
+        assert store.calls == 1
+        clock.now = 6
+        assert await resolver.resolve("ghost") is None
+        assert store.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_revocation_event_invalidates_immediately(store: StandInStore) -> None:
+    """A revocation webhook must take effect on the very next lookup."""
+    resolver = _resolver(store)
+
+    async def scenario() -> None:
+        assert (await resolver.resolve("user-123")).revoked_at is None
+        store.rows["user-123"]["revoked_at"] = "2025-11-02T00:00:00Z"
+        assert resolver.handle_event({"type": "UPDATE", "record": store.rows["user-123"]}) == "user-123"
+        assert (await resolver.resolve("user-123")).revoked_at == "2025-11-02T00:00:00Z"
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_during_lookup_is_not_cached_or_retained(store: StandInStore) -> None:
+    """A lookup racing a revocation is not cached, and generation state does not outlive it."""
+    resolver = _resolver(store)
+    store.delay = 0.01
+
+    async def scenario() -> None:
+        lookup = asyncio.ensure_future(resolver.resolve("user-123"))
+        while not store.calls:
+            await asyncio.sleep(0)
+        resolver.invalidate("user-123")
+        await lookup
+        assert await resolver.resolve("user-123") is not None
+
+    asyncio.run(scenario())
+    assert store.calls == 2
+    for index in range(100):
+        resolver.invalidate(f"user-{index}")
+    assert resolver._inflight == {}
+
+
+def test_callers_after_invalidation_do_not_join_the_stale_lookup(store: StandInStore) -> None:
+    """A request arriving after a revocation starts a fresh lookup instead of sharing the old one."""
+    resolver = _resolver(store)
+    store.delay = 0.05
+
+    async def scenario() -> None:
+        before = asyncio.ensure_future(resolver.resolve("user-123"))
+        while not store.calls:
+            await asyncio.sleep(0)
+        store.rows["user-123"] = {**store.rows["user-123"], "revoked_at": "2025-11-02T10:00:00Z"}
+        resolver.invalidate("user-123")
+        after = await resolver.resolve("user-123")
+        assert after is not None and after.revoked_at is not None
+        assert (await before).revoked_at is None
+        assert (await resolver.resolve("user-123")).revoked_at is not None
+
+    asyncio.run(scenario())
+    assert store.calls == 2
+    assert resolver._inflight == {}
+
+
+def test_store_errors_are_not_cached(store: StandInStore) -> None:
+    """Lookup failures propagate and the next request retries the store."""
+    resolver = _resolver(store)
+    store.fail = True
+
+    async def scenario() -> None:
+        with pytest.raises(ConnectionError):
+            await resolver.resolve("user-123")
+        store.fail = False
+        assert await resolver.resolve("user-123") is not None
+
+    asyncio.run(scenario())
+    assert store.calls == 2
+
+
+def test_middleware_fails_closed_with_resolver(store: StandInStore) -> None:
+    """With a resolver configured, headers cannot grant consent and outages deny access."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.main import app  # noqa: PLC0415
+
+    app.state.consent_resolver = _resolver(store)
+    try:
+        client = TestClient(app)
+        spoofed = client.get("/missing", headers={"x-user-id": "ghost", "x-pdpa-consent-status": "active"})
+        assert spoofed.status_code == 403
+
+        allowed = client.get("/missing", headers={"x-user-id": "user-123"})
+        assert allowed.status_code == 404
+
+        store.fail = True
+        app.state.consent_resolver.invalidate("user-123")
+        assert client.get("/missing", headers={"x-user-id": "user-123"}).status_code == 403
+    finally:
+        app.state.consent_resolver = None
@@ -0,0 +1,78 @@
+"""Structured log encoding tests for the API service."""
+from __future__ import annotations
+
+import json
+import logging
+import re
+
+import pytest
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(record.getMessage())
+
+
+@pytest.fixture
+def capture() -> tuple[logging.Logger, CaptureHandler]:
+    logger = logging.getLogger("container_base.test.api")
+    handler = CaptureHandler()
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger, handler
+
+
+def test_log_event_matches_json_dumps(capture: tuple[logging.Logger, CaptureHandler]) -> None:
+    """The hand-written encoder must produce the same bytes as `json.dumps` on the schema."""
+    from src.apps.api.service.logging import log_event  # noqa: PLC0415
+
+    logger, handler = capture
+    log_event(
+        logger,
+        op_id="upload",
+        code="OK",
+        duration_ms=42,
+        message='ส่ง "ภาพ"\n',
+        ts="2025-11-01T10:00:00.000+00:00",
+        request_id="req-1",
+        retry=False,
+        tags=["a", 1],
+    )
+
+    expected = {
+        "ts": "2025-11-01T10:00:00.000+00:00",
+        "opId": "upload",
+        "code": "OK",
+        "duration_ms": 42,
+        "message": 'ส่ง "ภาพ"\n',
+        "request_id": "req-1",
+        "retry": False,
+        "tags": ["a", 1],
+    }
+    assert handler.lines == [json.dumps(expected, separators=(",", ":"))]
+
+
+def test_log_event_stamps_utc_milliseconds(capture: tuple[logging.Logger, CaptureHandler]) -> None:
+    """Timestamps come from the coarse clock as UTC ISO-8601 with millisecond precision."""
+    from src.apps.api.service.logging import log_event  # noqa: PLC0415
+
+    logger, handler = capture
+    log_event(logger, op_id="healthz", code="HEALTH", duration_ms=0, message="probe")
+
+    ts = json.loads(handler.lines[0])["ts"]
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}\+00:00", ts)
+
+
+def test_log_event_skips_encoding_when_disabled(capture: tuple[logging.Logger, CaptureHandler]) -> None:
+    """Nothing is encoded or emitted when INFO is disabled for the logger."""
+    from src.apps.api.service.logging import log_event  # noqa: PLC0415
+
+    logger, handler = capture
+    logger.setLevel(logging.WARNING)
+    log_event(logger, op_id="healthz", code="HEALTH", duration_ms=0, message="probe")
+    assert handler.lines == []
@@ -0,0 +1,117 @@
+"""Equivalence tests for the bulk PDPA masking helpers."""
+from __future__ import annotations
+
+import random
+import struct
+
+import pytest
+
+
+EDGE_EMAILS = [
+    "user@example.com",
+    "นายกสมาคม@thai.co.th",
+    "no-at-sign",
+    "trailing@",
+    "@leading.example",
+    "a@b@c",
+    "@",
+    "",
+]
+
+EDGE_COORDINATES = [
+    0.0,
+    -0.0,
+    -0.0001,
+    0.0005,
+    0.0015,
+    2.675,
+    13.756331,
+    -0.127758,
+    179.9995,
+    -180.0,
+    1e20,
+    float("inf"),
+    float("-inf"),
+]
+
+
+def _random_emails(count: int, seed: int = 26) -> list[str]:
+    rng = random.Random(seed)
+    alphabet = "ab@.xé"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+
+def _random_coordinates(count: int, seed: int = 26) -> list[float]:
+    rng = random.Random(seed)
+    values = [rng.uniform(-180, 180) for _ in range(count)]
+    # Values sitting on (or one ulp from) the .0005 boundary are where fast rounding diverges.
+    values += [rng.randint(-180_000, 180_000) / 1000 + 0.0005 for _ in range(count)]
+    return values
+
+
+def _bits(value: float) -> bytes:
+    return struct.pack("<d", value)
+
+
+def test_mask_emails_matches_scalar_for_edge_and_random_inputs() -> None:
+    """Bulk masking must equal `mask_email` for every element, including odd shapes."""
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+
+    emails = EDGE_EMAILS + _random_emails(2000)
+    assert pdpa.mask_emails(emails) == [pdpa.mask_email(email) for email in emails]
+
+
+def test_mask_emails_passes_nulls_through() -> None:
+    """Arrow nulls arrive as None and must not be masked into strings."""
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+
+    assert pdpa.mask_emails(["user@example.com", None]) == ["***@example.com", None]
+
+
+def test_mask_emails_rejects_a_single_string() -> None:
+    """A bare string is iterable but is not a column; it must not be masked character by character."""
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+
+    for value in ("user@example.com", b"user@example.com"):
+        with pytest.raises(TypeError):
+            pdpa.mask_emails(value)
+
+
+def test_round_gps_array_matches_scalar_without_numpy_inputs() -> None:
+    """Plain sequences are rounded element-wise with identical results."""
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+
+    latitudes = EDGE_COORDINATES + _random_coordinates(500)
+    longitudes = list(reversed(latitudes))
+    rounded_lat, rounded_lon = pdpa.round_gps_array(latitudes, longitudes)
+
+    for lat, lon, out_lat, out_lon in zip(latitudes, longitudes, rounded_lat, rounded_lon, strict=True):
+        expected_lat, expected_lon = pdpa.round_gps(lat, lon)
+        assert _bits(float(out_lat)) == _bits(expected_lat)
+        assert _bits(float(out_lon)) == _bits(expected_lon)
+
+
+def test_round_gps_array_rejects_mismatched_columns() -> None:
+    """Latitude and longitude columns must pair up one-to-one."""
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+
+    with pytest.raises(ValueError):
+        pdpa.round_gps_array([1.0, 2.0], [1.0])
+
+
+def test_bulk_helpers_are_bit_identical_on_numpy_arrays() -> None:
+    """The vectorised NumPy path must agree with the scalar helpers bit for bit."""
+    np = pytest.importorskip("numpy")
+    from src.apps.api.service import pdpa  # noqa: PLC0415
+
+    coordinates = EDGE_COORDINATES + [float("nan")] + _random_coordinates(20_000)
+    array = np.array(coordinates, dtype=np.float64)
+    rounded_lat, rounded_lon = pdpa.round_gps_array(array, array[::-1])
+
+    assert rounded_lat.dtype == np.float64
+    for value, out_lat in zip(coordinates, rounded_lat.tolist(), strict=True):
+        assert _bits(out_lat) == _bits(round(value, 3))
+    assert _bits(rounded_lon.tolist()[0]) == _bits(round(coordinates[-1], 3))
+
+    emails = np.array(EDGE_EMAILS + _random_emails(500), dtype=object)
+    assert pdpa.mask_emails(emails) == [pdpa.mask_email(email) for email in emails]
@@ -0,0 +1,133 @@
+"""Sampling profiler and `/debug/profile` endpoint tests for the API."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_capture_samples_threads_and_tasks() -> None:
+    """Thread stacks and suspended asyncio task stacks both appear in the collapsed output."""
+    from src.apps.api.service.profiler import SamplingProfiler  # noqa: PLC0415
+
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+
+    async def waiting_handler() -> None:
+        await asyncio.sleep(1)
+
+    async def scenario():
+        task = asyncio.create_task(waiting_handler(), name="handler")
+        try:
+            return await SamplingProfiler().capture_async(0.2, interval=0.005)
+        finally:
+            task.cancel()
+
+    try:
+        profile = asyncio.run(scenario())
+    finally:
+        stop.set()
+        worker.join()
+
+    collapsed = profile.collapsed()
+    assert profile.samples >= 10
+    assert any(line.startswith("thread:busy-worker;") and "busy_loop" in line for line in collapsed.splitlines())
+    assert any(line.startswith("task:handler;waiting_handler") for line in collapsed.splitlines())
+    # The sampler never profiles itself.
+    assert "thread:profiler;" not in collapsed
+
+
+def test_speedscope_document_references_shared_frames() -> None:
+    """Each thread becomes a sampled profile whose sample indices resolve to shared frames."""
+    from src.apps.api.service.profiler import SamplingProfiler  # noqa: PLC0415
+
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        document = SamplingProfiler().capture(0.05, interval=0.01).speedscope(name="api")
+    finally:
+        stop.set()
+        worker.join()
+    frames = document["shared"]["frames"]
+    assert document["$schema"].endswith("file-format-schema.json")
+    assert "thread:busy-worker" in {profile["name"] for profile in document["profiles"]}
+    for profile in document["profiles"]:
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(0 <= index < len(frames) for sample in profile["samples"] for index in sample)
+
+
+def test_only_one_capture_runs_at_a_time() -> None:
+    """A second capture is refused instead of stacking sampler overhead."""
+    from src.apps.api.service.profiler import ProfilerBusyError, SamplingProfiler  # noqa: PLC0415
+
+    profiler = SamplingProfiler()
+    first = threading.Thread(target=profiler.capture, args=(0.3,))
+    first.start()
+    while not profiler.busy:
+        time.sleep(0.001)
+    with pytest.raises(ProfilerBusyError):
+        profiler.capture(0.1)
+    first.join()
+    assert profiler.capture(0.01).samples >= 1
+
+
+def test_sampler_widens_interval_to_stay_within_cpu_budget() -> None:
+    """A 1 ms request against many threads is slowed down instead of exceeding the overhead budget."""
+    from src.apps.api.service.profiler import SamplingProfiler  # noqa: PLC0415
+
+    stop = threading.Event()
+    workers = [threading.Thread(target=busy_loop, args=(stop,), name=f"busy-{index}") for index in range(8)]
+    for worker in workers:
+        worker.start()
+    try:
+        profile = SamplingProfiler(max_overhead=0.005).capture(0.3, interval=0.001)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    assert profile.interval > 0.001
+    assert profile.samples < 300
+    assert profile.overhead_pct < 2.0
+    assert profile.sample_seconds == pytest.approx(profile.duration / profile.samples)
+
+
+def test_endpoint_is_gated_by_flag_and_token(monkeypatch) -> None:
+    """The endpoint hides when disabled, requires the token, and returns 409 while busy."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.main import _build_profiler, app  # noqa: PLC0415
+
+    client = TestClient(app)
+    app.state.profiler = None
+    assert client.get("/debug/profile").status_code == 404
+
+    env = {"DEBUG_PROFILE_ENABLED": "true", "DEBUG_PROFILE_TOKEN": "s3cret"}
+    monkeypatch.setenv("DEBUG_PROFILE_TOKEN", "s3cret")
+    app.state.profiler = _build_profiler(env)
+    try:
+        assert client.get("/debug/profile?seconds=0.05", headers={"x-debug-token": "wrong"}).status_code == 401
+        assert client.get("/debug/profile?seconds=120", headers={"x-debug-token": "s3cret"}).status_code == 422
+
+        response = client.get("/debug/profile?seconds=0.05&format=speedscope", headers={"x-debug-token": "s3cret"})
+        assert response.status_code == 200
+        assert response.json()["name"] == "api"
+
+        app.state.profiler._lock.acquire()
+        try:
+            assert client.get("/debug/profile?seconds=0.05", headers={"x-debug-token": "s3cret"}).status_code == 409
+        finally:
+            app.state.profiler._lock.release()
+    finally:
+        app.state.profiler = None
@@ -0,0 +1,92 @@
+"""Per-operator rate limiting tests: token buckets and the 429 contract on the upload routes."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+from conftest import JWT_SECRET, auth_headers
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_backfill_cannot_spend_the_live_reserve() -> None:
+    """Backfill stops at the reserve, live captures still pass, and buckets refill over time."""
+    from src.apps.api.service.ratelimit import BACKFILL, LIVE, ShardedTokenBuckets  # noqa: PLC0415
+
+    clock = FakeClock()
+    buckets = ShardedTokenBuckets(rate=1.0, burst=3, live_reserve=1, clock=clock)
+
+    assert buckets.acquire("op-1", BACKFILL) == 0.0
+    assert buckets.acquire("op-1", BACKFILL) == 0.0
+    assert buckets.acquire("op-1", BACKFILL) == pytest.approx(1.0)
+    assert buckets.acquire("op-1", LIVE) == 0.0
+    assert buckets.acquire("op-1", LIVE) == pytest.approx(1.0)
+    # Other operators are unaffected.
+    assert buckets.acquire("op-2", BACKFILL) == 0.0
+
+    clock.now += 2
+    assert buckets.acquire("op-1", BACKFILL) == 0.0
+
+
+def test_buckets_stay_bounded_per_shard() -> None:
+    """Least recently seen users are evicted once a shard is full."""
+    from src.apps.api.service.ratelimit import ShardedTokenBuckets  # noqa: PLC0415
+
+    buckets = ShardedTokenBuckets(rate=1.0, burst=2, shards=4, max_entries=8)
+    for index in range(100):
+        buckets.acquire(f"op-{index}")
+    assert len(buckets) <= 8
+
+
+def test_upload_routes_return_429_with_retry_after() -> None:
+    """Throttled uploads get 429 + Retry-After and are logged; other routes are untouched."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.auth import TokenVerifier  # noqa: PLC0415
+    from src.apps.api.service.main import _build_rate_limiter, app  # noqa: PLC0415
+
+    records: list[str] = []
+
+    class Collect(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            records.append(record.getMessage())
+
+    handler = Collect()
+    logger = logging.getLogger("container_base.api")
+    logger.addHandler(handler)
+    app.state.token_verifier = TokenVerifier(hmac_secret=JWT_SECRET)
+    app.state.rate_limiter = _build_rate_limiter(
+        {"RATE_LIMIT_PER_MINUTE": "6", "RATE_LIMIT_BURST": "2", "RATE_LIMIT_LIVE_RESERVE": "1"}
+    )
+    client = TestClient(app)
+    victim = auth_headers("op-1")
+    body = {"content_type": "image/jpeg", "size_bytes": 1024}
+    try:
+        # Requests rejected by the PDPA gate or the token check never reach the buckets.
+        for _ in range(3):
+            assert client.post("/uploads", json=body, headers={"x-user-id": "op-1"}).status_code == 403
+            forged = {**auth_headers("op-2"), "x-user-id": "op-1"}
+            assert client.post("/uploads", json=body, headers=forged).status_code == 403
+        backfill = {**victim, "x-capture-mode": "backfill"}
+        assert client.post("/uploads", json=body, headers=backfill).status_code != 429
+        throttled = client.post("/uploads", json=body, headers=backfill)
+        assert client.post("/uploads", json=body, headers=victim).status_code != 429
+        assert client.post("/uploads", json=body, headers=victim).status_code == 429
+        assert client.post("/uploads", json=body, headers=auth_headers("op-2")).status_code != 429
+        assert client.get("/healthz").status_code == 200
+    finally:
+        app.state.token_verifier = None
+        app.state.rate_limiter = None
+        logger.removeHandler(handler)
+
+    assert throttled.status_code == 429
+    assert throttled.headers["retry-after"] == "10"
+    assert any('"code":"THROTTLED"' in line and '"mode":"backfill"' in line for line in records)
+    assert not any("op-1" in line for line in records)
@@ -0,0 +1,97 @@
+"""Bulk review store and `/review/bulk` endpoint tests against a SQLite stand-in."""
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from conftest import JWT_SECRET, auth_headers
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> Path:
+    from src.apps.api.service.tasks import TaskStore  # noqa: PLC0415
+
+    path = tmp_path / "tasks.db"
+    TaskStore.from_url(f"sqlite:///{path}").create_schema()
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO container_events (id, status) VALUES (?, ?)",
+            [("t1", "queued"), ("t2", "under_review"), ("t3", "approved"), ("t4", "queued"), ("t5", "rejected")],
+        )
+    return path
+
+
+def _statuses(path: Path) -> dict[str, str]:
+    with sqlite3.connect(path) as connection:
+        return dict(connection.execute("SELECT id, status FROM container_events"))
+
+
+def test_bulk_review_reports_each_item_and_one_event(database: Path) -> None:
+    """Reviewable tasks are updated in chunks; others are reported without being touched."""
+    from src.apps.api.service.tasks import TaskStore  # noqa: PLC0415
+
+    statements: list[str] = []
+
+    def connect() -> sqlite3.Connection:
+        connection = sqlite3.connect(database)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    store = TaskStore(connect, batch_size=2)
+    result = store.bulk_review(["t1", "t2", "t1", "t3", "missing", "t4"], "approve", "admin-1")
+
+    assert [(item.task_id, item.result, item.status) for item in result.items] == [
+        ("t1", "updated", "approved"),
+        ("t2", "updated", "approved"),
+        ("t3", "invalid_state", "approved"),
+        ("missing", "not_found", None),
+        ("t4", "updated", "approved"),
+    ]
+    assert result.updated == 3
+    # SQLite traces the statement again for each change-log trigger step, so count distinct chunks.
+    assert len({statement for statement in statements if statement.startswith("UPDATE")}) == 3
+    assert _statuses(database) == dict.fromkeys(["t1", "t2", "t3", "t4"], "approved") | {"t5": "rejected"}
+    with sqlite3.connect(database) as connection:
+        events = connection.execute("SELECT id, actor_id, status, task_ids, task_count FROM task_status_events").fetchall()
+    assert events == [(result.event_id, "admin-1", "approved", json.dumps(["t1", "t2", "t4"]), 3)]
+
+
+def test_bulk_review_is_all_or_nothing(database: Path) -> None:
+    """If the aggregated event cannot be written, no status change is committed."""
+    from src.apps.api.service.tasks import TaskStore  # noqa: PLC0415
+
+    with sqlite3.connect(database) as connection:
+        connection.execute("DROP TABLE task_status_events")
+    with pytest.raises(sqlite3.OperationalError):
+        TaskStore.from_url(f"sqlite:///{database}").bulk_review(["t1", "t2"], "reject", "admin-1")
+    assert _statuses(database)["t1"] == "queued"
+    assert _statuses(database)["t2"] == "under_review"
+
+
+def test_bulk_review_endpoint_requires_admin(database: Path) -> None:
+    """Only admins may review; the response lists per-item outcomes."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.auth import TokenVerifier  # noqa: PLC0415
+    from src.apps.api.service.main import _build_task_store, app  # noqa: PLC0415
+
+    app.state.token_verifier = TokenVerifier(hmac_secret=JWT_SECRET)
+    app.state.task_store = _build_task_store({"TASKS_DATABASE_URL": f"sqlite:///{database}"})
+    client = TestClient(app)
+    body = {"task_ids": ["t1", "t3"], "action": "reject"}
+    try:
+        assert client.post("/review/bulk", json=body, headers=auth_headers("admin-1")).status_code == 403
+        assert client.post("/review/bulk", json={**body, "action": "delete"}, headers=auth_headers("admin-1", "admin")).status_code == 422
+
+        response = client.post("/review/bulk", json=body, headers=auth_headers("admin-1", "admin"))
+    finally:
+        app.state.token_verifier = None
+        app.state.task_store = None
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["updated"] == 1 and payload["status"] == "rejected" and payload["event_id"]
+    assert [item["result"] for item in payload["results"]] == ["updated", "invalid_state"]
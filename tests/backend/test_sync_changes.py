@@ -0,0 +1,187 @@
+"""Delta sync (`/sync/changes`) tests against a SQLite stand-in."""
+from __future__ import annotations
+
+import sqlite3
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from conftest import JWT_SECRET, auth_headers
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        # Change rows are stamped by the database, so the fake clock starts at the real time.
+        self.now = datetime.now(tz=UTC)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> Path:
+    from src.apps.api.service.tasks import TaskStore  # noqa: PLC0415
+
+    path = tmp_path / "tasks.db"
+    TaskStore.from_url(f"sqlite:///{path}").create_schema()
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO container_events (id, container_id, status, uploader_id) VALUES (?, ?, ?, ?)",
+            [
+                ("t1", "MSCU1234565", "under_review", "op-1"),
+                ("t2", "TGHU7654321", "under_review", "op-1"),
+                ("t3", "CSQU3054383", "queued", "op-1"),
+                ("t4", "MAEU1111111", "under_review", "op-2"),
+            ],
+        )
+    return path
+
+
+def _store(path: Path, clock: FakeClock | None = None):
+    from src.apps.api.service.tasks import TaskStore  # noqa: PLC0415
+
+    return TaskStore(lambda: sqlite3.connect(path), clock=clock or FakeClock())
+
+
+def _drain(store, user_id: str, token: str | None, limit: int = 2):
+    pages = [store.changes_since(user_id, token, limit=limit)]
+    while pages[-1].has_more:
+        pages.append(store.changes_since(user_id, pages[-1].next_token, limit=limit))
+    return pages
+
+
+def test_full_resync_then_only_changed_tasks(database: Path) -> None:
+    """Without a token the client pages through its tasks; later calls return only deltas."""
+    store = _store(database)
+
+    pages = _drain(store, "op-1", None)
+    assert pages[0].reset and not pages[-1].has_more
+    assert [task["id"] for page in pages for task in page.tasks] == ["t1", "t2", "t3"]
+    token = pages[-1].next_token
+    assert store.changes_since("op-1", token).tasks == ()
+
+    store.bulk_review(["t2", "t4"], "approve", "admin-1")
+    delta = store.changes_since("op-1", token)
+    assert not delta.reset
+    assert [(task["id"], task["status"]) for task in delta.tasks] == [("t2", "approved")]
+    assert store.changes_since("op-1", delta.next_token).tasks == ()
+    assert [task["id"] for task in store.changes_since("op-2", token).tasks] == ["t4"]
+
+
+def test_writes_outside_bulk_review_reach_the_delta(database: Path) -> None:
+    """New captures and OCR updates written straight to the table are logged by the trigger."""
+    store = _store(database)
+    token = _drain(store, "op-1", None)[-1].next_token
+
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "INSERT INTO container_events (id, container_id, status, uploader_id) VALUES ('t5', NULL, 'queued', 'op-1')"
+        )
+        connection.execute("UPDATE container_events SET container_id = 'TCLU2040122' WHERE id = 't3'")
+        # Columns clients do not sync are not logged.
+        connection.execute("UPDATE container_events SET reviewed_by = 'nobody' WHERE id = 't1'")
+    delta = store.changes_since("op-1", token)
+    assert not delta.reset
+    assert [(task["id"], task["container_id"]) for task in delta.tasks] == [("t5", None), ("t3", "TCLU2040122")]
+
+
+def test_compaction_keeps_valid_tokens_and_resets_stale_ones(database: Path) -> None:
+    """Superseded rows are dropped silently; expiring rows forces older tokens to resync."""
+    clock = FakeClock()
+    store = _store(database, clock)
+    start = store.changes_since("op-1", None, limit=10).next_token
+
+    store.bulk_review(["t1"], "approve", "admin-1")
+    with sqlite3.connect(database) as connection:
+        # A later change to the same task (e.g. an OCR retry) supersedes its earlier log rows.
+        connection.execute("UPDATE container_events SET container_id = 'MSCU1234566' WHERE id = 't1'")
+    assert store.compact(retain_seconds=3600) == 2
+    page = store.changes_since("op-1", start)
+    assert not page.reset and [task["id"] for task in page.tasks] == ["t1"]
+
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "UPDATE task_changes SET changed_at = ?", ((clock.now - timedelta(hours=2)).isoformat(),)
+        )
+    store.bulk_review(["t3"], "reject", "admin-1")
+    # t3's capture row is superseded; the other three rows are past retention.
+    assert store.compact(retain_seconds=3600) == 4
+    stale = store.changes_since("op-1", start, limit=10)
+    assert stale.reset and [task["id"] for task in stale.tasks] == ["t1", "t2", "t3"]
+    fresh = store.changes_since("op-1", page.next_token)
+    assert not fresh.reset and [task["id"] for task in fresh.tasks] == ["t3"]
+
+
+def test_tokens_survive_compaction_that_empties_the_log(database: Path) -> None:
+    """Once every change row has expired, a token at the watermark keeps syncing deltas."""
+    clock = FakeClock()
+    store = _store(database, clock)
+    store.bulk_review(["t1", "t2"], "approve", "admin-1")
+    token = _drain(store, "op-1", None)[-1].next_token
+
+    clock.now += timedelta(days=8)
+    assert store.compact(retain_seconds=7 * 86400) == 6
+    for _ in range(3):
+        page = store.changes_since("op-1", token)
+        assert not page.reset and page.tasks == ()
+        token = page.next_token
+
+    store.bulk_review(["t3"], "reject", "admin-1")
+    page = store.changes_since("op-1", token)
+    assert not page.reset and [task["id"] for task in page.tasks] == ["t3"]
+
+
+def test_change_lock_runs_before_any_review_write(database: Path) -> None:
+    """The serializing statement is the first one in each review transaction."""
+    from src.apps.api.service.tasks import TaskStore  # noqa: PLC0415
+
+    statements: list[str] = []
+
+    def connect() -> sqlite3.Connection:
+        connection = sqlite3.connect(database)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    store = TaskStore(connect, clock=FakeClock(), change_lock="SELECT 'change-lock'")
+    store.bulk_review(["t1"], "approve", "admin-1")
+    writes = [statement for statement in statements if statement.startswith(("SELECT 'change-lock'", "UPDATE", "INSERT"))]
+    assert writes[0] == "SELECT 'change-lock'" and len(writes) > 1
+
+
+def test_tokens_are_opaque_and_validated() -> None:
+    """Tokens round-trip, and garbage is rejected instead of silently resyncing."""
+    from src.apps.api.service.tasks import (  # noqa: PLC0415
+        InvalidSyncTokenError,
+        decode_sync_token,
+        encode_sync_token,
+    )
+
+    assert decode_sync_token(encode_sync_token(42)) == (42, None)
+    assert decode_sync_token(encode_sync_token(7, "t2")) == (7, "t2")
+    for token in ("not-a-token", encode_sync_token(1).upper(), "!!!"):
+        with pytest.raises(InvalidSyncTokenError):
+            decode_sync_token(token)
+
+
+def test_sync_endpoint_scopes_to_token_subject(database: Path) -> None:
+    """The endpoint only returns the caller's tasks and rejects malformed tokens."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from src.apps.api.service.auth import TokenVerifier  # noqa: PLC0415
+    from src.apps.api.service.main import _build_task_store, app  # noqa: PLC0415
+
+    headers = auth_headers("op-2")
+
+    app.state.token_verifier = TokenVerifier(hmac_secret=JWT_SECRET)
+    app.state.task_store = _build_task_store({"TASKS_DATABASE_URL": f"sqlite:///{database}"})
+    client = TestClient(app)
+    try:
+        payload = client.get("/sync/changes", headers=headers).json()
+        assert client.get("/sync/changes?since=garbage", headers=headers).status_code == 400
+    finally:
+        app.state.token_verifier = None
+        app.state.task_store = None
+
+    assert payload["reset"] is True and payload["has_more"] is False
+    assert [task["id"] for task in payload["tasks"]] == ["t4"]
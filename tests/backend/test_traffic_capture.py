@@ -0,0 +1,126 @@
+"""Traffic capture middleware tests: PDPA rules are applied before anything is written."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+
+def _app(trace: Path, **kwargs):
+    from starlette.applications import Starlette  # noqa: PLC0415
+    from starlette.responses import JSONResponse  # noqa: PLC0415
+    from starlette.routing import Route  # noqa: PLC0415
+
+    from src.apps.api.service.capture import TraceWriter, TrafficCaptureMiddleware  # noqa: PLC0415
+
+    async def upload(request):
+        return JSONResponse({"received": len(await request.body())}, status_code=201)
+
+    app = Starlette(routes=[Route("/uploads", upload, methods=["POST"])])
+    writer = TraceWriter(trace, flush_every=1)
+    app.add_middleware(TrafficCaptureMiddleware, writer=writer, salt=b"fixed-salt", **kwargs)
+    return app, writer
+
+
+def test_capture_writes_sanitized_shapes(tmp_path: Path) -> None:
+    """Emails are masked, GPS rounded, user ids pseudonymized, and tokens never written."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    trace = tmp_path / "trace.ndjson"
+    app, writer = _app(trace)
+    client = TestClient(app)
+    headers = {
+        "authorization": "Bearer secret-token",
+        "x-user-id": "user-123",
+        "x-user-email": "somchai@example.co.th",
+        "x-gps-lat": "13.756331",
+        "x-gps-lon": "100.501762",
+        "cookie": "session=abc",
+    }
+    body = {"content_type": "image/jpeg", "size_bytes": 1024, "contact": "ops@example.com", "lat": 13.7563319}
+    assert client.post("/uploads?email=a@b.co&since=tok", json=body, headers=headers).status_code == 201
+    client.post("/uploads", json=body, headers={"x-user-id": "user-123"})
+    writer.close()
+
+    raw = trace.read_text()
+    for secret in ("secret-token", "somchai", "ops@", "user-123", "13.756331", "13.7563319", "session=abc"):
+        assert secret not in raw
+
+    first, second = (json.loads(line) for line in raw.splitlines())
+    assert first["method"] == "POST" and first["path"] == "/uploads" and first["status"] == 201
+    assert first["auth"] is True and second["auth"] is False
+    assert first["headers"]["x-user-email"] == "***@example.co.th"
+    assert (first["headers"]["x-gps-lat"], first["headers"]["x-gps-lon"]) == ("13.756", "100.502")
+    assert first["headers"]["x-user-id"] == second["headers"]["x-user-id"]
+    assert first["headers"]["x-user-id"].startswith("u-")
+    assert first["body"] == {"content_type": "image/jpeg", "size_bytes": 1024, "contact": "***@example.com", "lat": 13.756}
+    assert first["query"] == "email=%2A%2A%2A%40b.co&since=tok"
+    assert second["t"] >= first["t"] >= 0
+
+
+def test_capture_records_size_only_for_large_or_binary_bodies(tmp_path: Path) -> None:
+    """Bodies above the limit are measured, not stored, and the app still receives every byte."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    trace = tmp_path / "trace.ndjson"
+    app, writer = _app(trace, max_body_bytes=16)
+    response = TestClient(app).post("/uploads", content=b"x" * 100, headers={"content-type": "application/json"})
+    writer.close()
+
+    assert response.json() == {"received": 100}
+    record = json.loads(trace.read_text())
+    assert record["body"] is None and record["body_bytes"] == 100
+
+
+def test_capture_masks_embedded_emails_and_path_identifiers(tmp_path: Path) -> None:
+    """Emails inside longer strings and user ids or emails in the path are never written."""
+    from src.apps.api.service.capture import sanitize_request  # noqa: PLC0415
+
+    body = json.dumps({"contact": "Somchai <somchai@example.co.th>", "note": "cc ops@example.com, thanks"})
+    record = sanitize_request(
+        "POST",
+        "/users/user-123/mail/a.b@example.com/tasks",
+        "to=Ops%20%3Cops%40example.com%3E",
+        {"x-user-id": "user-123", "content-type": "application/json"},
+        body.encode(),
+        salt=b"fixed-salt",
+    )
+
+    raw = json.dumps(record)
+    for secret in ("somchai@", "ops@", "a.b@", "user-123"):
+        assert secret not in raw
+    assert record["body"] == {"contact": "Somchai <***@example.co.th>", "note": "cc ***@example.com, thanks"}
+    assert record["path"] == f"/users/{record['headers']['x-user-id']}/mail/***@example.com/tasks"
+    assert record["query"] == "to=Ops+%3C%2A%2A%2A%40example.com%3E"
+
+
+def test_capture_flushes_off_the_event_loop(tmp_path: Path) -> None:
+    """Trace file writes run in a worker thread, never on the thread running the event loop."""
+    pytest.importorskip("httpx")
+    import asyncio  # noqa: PLC0415
+
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    trace = tmp_path / "trace.ndjson"
+    app, writer = _app(trace)
+    on_loop: list[bool] = []
+    flush = writer.flush
+
+    def tracked_flush() -> None:
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        flush()
+
+    writer.flush = tracked_flush
+    client = TestClient(app)
+    for _ in range(3):
+        assert client.post("/uploads", content=b"{}", headers={"content-type": "application/json"}).status_code == 201
+
+    assert on_loop == [False, False, False]
+    assert len(trace.read_text().splitlines()) == 3
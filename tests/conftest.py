@@ -0,0 +1,40 @@
+"""Shared test helpers: HS256 bearer tokens and the headers the API expects with them."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+
+
+JWT_SECRET = "test-secret"
+# 2100-01-01; far enough out that tests never race token expiry.
+FAR_FUTURE = 4_102_444_800
+
+
+def b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def jwt_segment(data: dict) -> str:
+    return b64url(json.dumps(data, separators=(",", ":")).encode())
+
+
+def mint_token(claims: dict, secret: str = JWT_SECRET, alg: str = "HS256") -> str:
+    """Sign `claims` as a compact JWT; `alg` only changes the header so tests can forge bad ones."""
+
+    signing_input = f"{jwt_segment({'alg': alg, 'typ': 'JWT'})}.{jwt_segment(claims)}"
+    return f"{signing_input}.{b64url(hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest())}"
+
+
+def auth_headers(user_id: str, role: str | None = None) -> dict[str, str]:
+    """Bearer token for `user_id` plus matching PDPA consent headers."""
+
+    claims: dict = {"sub": user_id, "exp": FAR_FUTURE}
+    if role is not None:
+        claims["app_metadata"] = {"role": role}
+    return {
+        "authorization": f"Bearer {mint_token(claims)}",
+        "x-user-id": user_id,
+        "x-pdpa-consent-status": "active",
+    }
@@ -0,0 +1,122 @@
+"""Offline log analytics tests for scripts/analyze-logs.py."""
+from __future__ import annotations
+
+import gzip
+import importlib.util
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "analyze-logs.py"
+
+
+@pytest.fixture(scope="module")
+def analyze_logs():
+    spec = importlib.util.spec_from_file_location("analyze_logs", SCRIPT_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Failed to load analyze-logs script")
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses resolve string annotations through sys.modules during class creation.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _write_lines(path: Path, count: int, seed: int = 31) -> list[dict]:
+    rng = random.Random(seed)
+    events = []
+    for index in range(count):
+        events.append(
+            {
+                "ts": f"2025-11-01T10:{index % 60:02d}:{index % 7:02d}.000+00:00",
+                "opId": "upload" if index % 2 else "timeline",
+                "code": "UPSTREAM_ERROR" if index % 50 == 0 else "OK",
+                "duration_ms": int(rng.lognormvariate(5, 0.5)),
+                "message": "event",
+            }
+        )
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt", encoding="utf-8") as handle:
+        for event in events:
+            handle.write(json.dumps(event, separators=(",", ":")) + "\n")
+    return events
+
+
+def test_sketch_quantile_within_relative_accuracy(analyze_logs) -> None:
+    """The p95 estimate stays within the sketch's 1% relative accuracy."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(6, 0.8) for _ in range(20_000)]
+    sketch = analyze_logs.LatencySketch()
+    for value in values:
+        sketch.add(value)
+
+    exact = sorted(values)[int(0.95 * (len(values) - 1))]
+    assert sketch.quantile(0.95) == pytest.approx(exact, rel=0.02)
+
+
+def test_chunked_parsing_matches_single_pass(analyze_logs, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Newline-aligned chunks must merge to the same totals as a single pass."""
+    log_file = tmp_path / "api.ndjson"
+    _write_lines(log_file, 5_000)
+    inputs = [("api", log_file)]
+
+    single = analyze_logs.analyze_files(inputs, 300, analyze_logs.DEFAULT_ERROR_PATTERN, workers=1)
+    monkeypatch.setattr(analyze_logs, "MIN_CHUNK_BYTES", 4096)
+    assert len(analyze_logs.chunk_ranges(log_file, 4)) > 1
+    chunked = analyze_logs.analyze_files(inputs, 300, analyze_logs.DEFAULT_ERROR_PATTERN, workers=1)
+
+    assert single.keys() == chunked.keys()
+    for key, stats in single.items():
+        assert (stats.events, stats.failures, stats.sketch.buckets) == (
+            chunked[key].events,
+            chunked[key].failures,
+            chunked[key].sketch.buckets,
+        )
+
+
+def test_report_computes_guardrail_metrics(analyze_logs, tmp_path: Path) -> None:
+    """API error rate and OCR failure rate come from error codes; gzip input is streamed."""
+    api_file = tmp_path / "api.ndjson"
+    ocr_file = tmp_path / "ocr.ndjson.gz"
+    api_events = _write_lines(api_file, 1_000)
+    _write_lines(ocr_file, 200, seed=5)
+
+    aggregate = analyze_logs.analyze_files(
+        [("api", api_file), ("ocr", ocr_file)], 0, analyze_logs.DEFAULT_ERROR_PATTERN, workers=1
+    )
+    report = analyze_logs.build_report(aggregate, 0)
+
+    expected_errors = sum(1 for event in api_events if event["code"] != "OK")
+    assert report["guardrails"]["api_error_rate_pct"] == round(expected_errors / 1_000 * 100, 3)
+    assert report["guardrails"]["ocr_failure_rate_pct"] == 2.0
+    assert {"p95_ms", "min_ms", "max_ms", "iterations"} <= set(report["results"][0])
+
+
+def test_probe_and_lifecycle_events_do_not_move_guardrails(analyze_logs, tmp_path: Path) -> None:
+    """Zero-latency probes and startup logs are listed per opId but left out of p95 and rates."""
+    api_file = tmp_path / "api.ndjson"
+    events = _write_lines(api_file, 400)
+    baseline = analyze_logs.build_report(
+        analyze_logs.analyze_files([("api", api_file)], 0, analyze_logs.DEFAULT_ERROR_PATTERN, workers=1), 0
+    )["guardrails"]
+
+    noise = [
+        {"ts": event["ts"], "opId": op_id, "code": code, "duration_ms": 0, "message": "noise"}
+        for event in events
+        for op_id, code in (("healthz", "HEALTH"), ("readyz", "READY"), ("heartbeat", "HEARTBEAT"))
+    ]
+    noise.append({"ts": events[0]["ts"], "opId": "startup", "code": "PDPA_DENY", "duration_ms": 0, "message": "noise"})
+    with api_file.open("a", encoding="utf-8") as handle:
+        for event in noise:
+            handle.write(json.dumps(event) + "\n")
+
+    aggregate = analyze_logs.analyze_files([("api", api_file)], 0, analyze_logs.DEFAULT_ERROR_PATTERN, workers=1)
+    assert analyze_logs.build_report(aggregate, 0)["guardrails"] == baseline
+    included = analyze_logs.build_report(aggregate, 0, excluded_ops=())
+    assert included["guardrails"]["api_p95_ms"] < baseline["api_p95_ms"]
+    assert any(row["opId"] == "healthz" for row in included["results"])
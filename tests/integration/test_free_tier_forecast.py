@@ -0,0 +1,114 @@
+"""Burn-rate forecasting tests for scripts/check-free-tier.py."""
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "check-free-tier.py"
+DAY = 86_400
+
+
+@pytest.fixture(scope="module")
+def free_tier():
+    spec = importlib.util.spec_from_file_location("check_free_tier", SCRIPT_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Failed to load check-free-tier script")
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses resolve string annotations through sys.modules during class creation.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _sample(day: int, used: float, limit: float = 360_000) -> str:
+    return json.dumps(
+        {"ts": 1_760_000_000 + day * DAY, "service": "Cloud Run", "metric": "API CPU seconds", "used": used, "limit": limit}
+    )
+
+
+def test_linear_forecast_reports_time_to_exhaustion(free_tier, tmp_path: Path) -> None:
+    """A steady 20k/day burn with 120k remaining exhausts in six days and triggers a warning."""
+    samples = tmp_path / "usage.ndjson"
+    samples.write_text("\n".join(_sample(day, 160_000 + day * 20_000) for day in range(5)) + "\n")
+
+    (quota,) = free_tier.forecast_usage(samples, None, "linear", 6.0)
+
+    assert quota.burn_rate_per_day == pytest.approx(20_000)
+    assert quota.days_to_exhaustion == pytest.approx(6.0)
+    assert quota.percent < 80
+    assert quota.status == "warning"
+
+
+def test_incremental_runs_only_read_new_samples(free_tier, tmp_path: Path) -> None:
+    """With a state file, a second run resumes from the stored offset and matches a full read."""
+    samples = tmp_path / "usage.ndjson"
+    state = tmp_path / "state.json"
+    lines = [_sample(day, day * 10_000 + (day % 2) * 1_000) for day in range(8)]
+
+    samples.write_text("\n".join(lines[:5]) + "\n" + lines[5][:10])
+    free_tier.forecast_usage(samples, state, "ewma", 3.0)
+    assert json.loads(state.read_text())["metrics"]["Cloud Run|API CPU seconds"]["n"] == 5
+
+    samples.write_text("\n".join(lines) + "\n")
+    (incremental,) = free_tier.forecast_usage(samples, state, "ewma", 3.0)
+    (full,) = free_tier.forecast_usage(samples, None, "ewma", 3.0)
+
+    assert json.loads(state.read_text())["metrics"]["Cloud Run|API CPU seconds"]["n"] == 8
+    assert incremental == full
+
+
+def test_csv_samples_and_quota_reset(free_tier, tmp_path: Path) -> None:
+    """CSV input is supported and a drop in usage starts a new billing period."""
+    samples = tmp_path / "usage.csv"
+    rows = ["ts,service,metric,used,limit"]
+    rows += [f"2025-10-{day:02d}T00:00:00Z,Supabase,Row reads,{day * 100_000},4000000" for day in range(25, 31)]
+    rows += [f"2025-11-{day:02d}T00:00:00Z,Supabase,Row reads,{day * 50_000},4000000" for day in range(1, 4)]
+    samples.write_text("\n".join(rows) + "\n")
+
+    (quota,) = free_tier.forecast_usage(samples, None, "linear", 6.0)
+
+    assert quota.used == 150_000
+    assert quota.burn_rate_per_day == pytest.approx(50_000)
+    assert quota.days_to_exhaustion_low <= quota.days_to_exhaustion <= quota.days_to_exhaustion_high
+
+
+def test_ewma_restarts_cleanly_after_quota_reset(free_tier, tmp_path: Path) -> None:
+    """The first sample after a reset does not feed the drop into the EWMA burn rate."""
+    samples = tmp_path / "usage.csv"
+    rows = ["ts,service,metric,used,limit"]
+    rows += [f"2025-10-{day:02d}T00:00:00Z,Supabase,Row reads,{day * 33},1000" for day in range(28, 31)]
+    rows += [f"2025-11-{day:02d}T00:00:00Z,Supabase,Row reads,{day * 100},1000" for day in range(1, 5)]
+    samples.write_text("\n".join(rows) + "\n")
+
+    (quota,) = free_tier.forecast_usage(samples, None, "ewma", 3.0)
+
+    assert quota.used == 400
+    assert quota.burn_rate_per_day == pytest.approx(100)
+    assert quota.days_to_exhaustion == pytest.approx(6)
+
+
+def test_invalid_rows_are_skipped_and_do_not_wedge_later_runs(free_tier, tmp_path: Path, capsys) -> None:
+    """A truncated CSV row is counted and skipped, and the stored offset still moves past it."""
+    samples = tmp_path / "usage.csv"
+    state = tmp_path / "state.json"
+    rows = ["ts,service,metric,used,limit"]
+    rows += [f"2025-11-{day:02d}T00:00:00Z,Supabase,Row reads,{day * 100},4000" for day in range(1, 4)]
+    rows.append("2025-11-04T00:00:00Z,Supabase,Row reads")
+    samples.write_text("\n".join(rows) + "\n")
+
+    (quota,) = free_tier.forecast_usage(samples, state, "ewma", 3.0)
+    assert quota.used == 300
+    assert "skipped 1 invalid usage sample" in capsys.readouterr().err
+
+    with samples.open("a", encoding="utf-8") as handle:
+        handle.write("2025-11-05T00:00:00Z,Supabase,Row reads,500,4000\n")
+    (quota,) = free_tier.forecast_usage(samples, state, "ewma", 3.0)
+    assert quota.used == 500
+    assert capsys.readouterr().err == ""
+    assert json.loads(state.read_text())["files"][str(samples.resolve())]["skipped"] == 1
@@ -0,0 +1,129 @@
+"""OCR recognizer cascade and ISO 6346 check-digit tests."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+OCR_WORKER_ROOT = REPO_ROOT / "src" / "apps" / "ocr-worker"
+
+
+@pytest.fixture(scope="module")
+def recognition():
+    sys.path.insert(0, str(OCR_WORKER_ROOT))
+    try:
+        from ocr import recognition  # noqa: PLC0415
+
+        yield recognition
+    finally:
+        sys.path.remove(str(OCR_WORKER_ROOT))
+
+
+class FakeRecognizer:
+    """Deterministic stand-in backend that returns a scripted reading per image."""
+
+    def __init__(self, name: str, readings: dict[bytes, tuple[str, float]], fail: bool = False) -> None:
+        self.name = name
+        self.readings = readings
+        self.fail = fail
+        self.calls = 0
+
+    def recognize(self, image: bytes):
+        from ocr.recognition import Recognition  # noqa: PLC0415
+
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("backend crashed")
+        reading = self.readings.get(image)
+        return Recognition(*reading) if reading else None
+
+
+@pytest.mark.parametrize(
+    ("code", "valid"),
+    [
+        ("CSQU3054383", True),
+        ("MSKU 907032-3", True),
+        ("MSKU9070324", False),
+        ("MSKX9070323", False),
+        ("MSK9070323", False),
+    ],
+)
+def test_iso6346_check_digit(recognition, code: str, valid: bool) -> None:
+    """Container numbers must match the owner/category/serial layout and check digit."""
+    assert recognition.is_valid_container_number(code) is valid
+
+
+def test_cascade_exits_early_on_valid_check_digit(recognition) -> None:
+    """A confident, check-digit-valid fast reading must not invoke the heavy tier."""
+    fast = FakeRecognizer("fast", {b"img": ("CSQU3054383", 0.93)})
+    heavy = FakeRecognizer("heavy", {b"img": ("CSQU3054383", 0.99)})
+    cascade = recognition.RecognizerCascade([fast, heavy], min_confidence=0.9)
+
+    result = cascade.recognize(b"img")
+
+    assert result.accepted and result.tier == "fast"
+    assert heavy.calls == 0
+    assert cascade.stats()["fast"]["hit_rate"] == 1.0
+
+
+def test_cascade_escalates_on_bad_check_digit_or_low_confidence(recognition) -> None:
+    """Invalid check digits, low confidence, and backend errors all escalate to the next tier."""
+    fast = FakeRecognizer("fast", {b"a": ("CSQU3054384", 0.99), b"b": ("CSQU3054383", 0.4)})
+    crashing = FakeRecognizer("quantized", {}, fail=True)
+    heavy = FakeRecognizer("heavy", {b"a": ("CSQU3054383", 0.95), b"b": ("CSQU3054383", 0.95)})
+    cascade = recognition.RecognizerCascade([fast, crashing, heavy], min_confidence=0.9)
+
+    for image in (b"a", b"b"):
+        result = cascade.recognize(image)
+        assert result.accepted and result.tier == "heavy"
+        assert list(result.tier_ms) == ["fast", "quantized", "heavy"]
+
+    stats = cascade.stats()
+    assert stats["fast"]["hit_rate"] == 0.0
+    assert stats["quantized"]["errors"] == 2
+    assert stats["heavy"]["accepted"] == 2
+
+
+def test_cascade_returns_best_unaccepted_reading(recognition) -> None:
+    """When no tier is accepted, the highest-confidence reading is returned for review."""
+    fast = FakeRecognizer("fast", {b"img": ("MSKU9070324", 0.7)})
+    heavy = FakeRecognizer("heavy", {b"img": ("MSKU9070321", 0.8)})
+    result = recognition.RecognizerCascade([fast, heavy]).recognize(b"img")
+
+    assert not result.accepted
+    assert result.tier == "heavy"
+    assert result.recognition.text == "MSKU9070321"
+
+
+def test_cascade_counts_concurrent_runs_and_logs_hit_rates(recognition) -> None:
+    """Counters stay exact across worker threads and hit rates are logged every `stats_every` runs."""
+    import logging  # noqa: PLC0415
+    from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+    records: list[str] = []
+
+    class Collect(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            records.append(record.getMessage())
+
+    logger = logging.getLogger("test.ocr_cascade")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(Collect())
+    fast = FakeRecognizer("fast", {b"a": ("CSQU3054383", 0.95)})
+    heavy = FakeRecognizer("heavy", {b"b": ("CSQU3054383", 0.95)})
+    cascade = recognition.RecognizerCascade([fast, heavy], min_confidence=0.9, logger=logger, stats_every=50)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(cascade.recognize, [b"a", b"b"] * 200))
+
+    stats = cascade.stats()
+    assert (stats["fast"]["calls"], stats["fast"]["accepted"]) == (400, 200)
+    assert (stats["heavy"]["calls"], stats["heavy"]["accepted"]) == (200, 200)
+    summaries = [line for line in records if '"code":"OCR_TIER_STATS"' in line]
+    assert len(summaries) == 8
+    # Summaries are emitted outside the lock, so threads may log them out of order.
+    final = next(line for line in summaries if '"runs":400' in line)
+    assert '"fast":{"calls":400,"accepted":200,"errors":0,"hit_rate":0.5' in final
@@ -0,0 +1,46 @@
+"""OCR worker structured log encoding tests."""
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+LOGGING_MODULE_PATH = REPO_ROOT / "src" / "apps" / "ocr-worker" / "ocr" / "logging.py"
+
+
+def _load_logging_module():
+    spec = importlib.util.spec_from_file_location("ocr_logging", LOGGING_MODULE_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Failed to load OCR logging module spec")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(record.getMessage())
+
+
+def test_log_event_emits_schema_with_extras() -> None:
+    """OCR logs keep the shared schema and append extra fields after it."""
+    ocr_logging = _load_logging_module()
+    logger = logging.getLogger("container_base.test.ocr")
+    handler = CaptureHandler()
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    ocr_logging.log_event(logger, op_id="recognize", code="OCR_OK", duration_ms=812, message="done", tier="fast")
+
+    payload = json.loads(handler.lines[0])
+    assert list(payload) == ["ts", "opId", "code", "duration_ms", "message", "tier"]
+    assert payload["duration_ms"] == 812
+    assert payload["ts"].endswith("+00:00")
@@ -0,0 +1,126 @@
+"""ONNX Runtime backend tests: thread sizing, INT8 model resolution, and inference."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+OCR_WORKER_ROOT = REPO_ROOT / "src" / "apps" / "ocr-worker"
+
+
+@pytest.fixture(scope="module")
+def onnx_backend():
+    sys.path.insert(0, str(OCR_WORKER_ROOT))
+    try:
+        from ocr import onnx_backend  # noqa: PLC0415
+
+        yield onnx_backend
+    finally:
+        sys.path.remove(str(OCR_WORKER_ROOT))
+
+
+@pytest.mark.parametrize(
+    ("files", "expected"),
+    [
+        ({"cpu.max": "max 100000\n"}, None),
+        ({"cpu.max": "150000 100000\n"}, 1.5),
+        ({"cpu/cpu.cfs_quota_us": "200000\n", "cpu/cpu.cfs_period_us": "100000\n"}, 2.0),
+        ({"cpu/cpu.cfs_quota_us": "-1\n", "cpu/cpu.cfs_period_us": "100000\n"}, None),
+        ({}, None),
+    ],
+)
+def test_cgroup_cpu_limit(onnx_backend, tmp_path: Path, files: dict[str, str], expected: float | None) -> None:
+    """CPU quota is read from cgroup v2 `cpu.max` or v1 CFS quota files."""
+    for relative, content in files.items():
+        target = tmp_path / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+
+    assert onnx_backend.cgroup_cpu_limit(tmp_path) == expected
+
+
+def test_thread_settings_follow_quota_and_env(onnx_backend, tmp_path: Path) -> None:
+    """Intra-op threads never exceed the quota; env variables override the derived values."""
+    (tmp_path / "cpu.max").write_text("100000 100000\n")
+
+    assert onnx_backend.thread_settings({}, tmp_path) == (1, 1)
+    assert onnx_backend.thread_settings({"OCR_INTRA_OP_THREADS": "3", "OCR_INTER_OP_THREADS": "2"}, tmp_path) == (3, 2)
+    assert onnx_backend.thread_settings({"OCR_INTRA_OP_THREADS": "", "OCR_INTER_OP_THREADS": ""}, tmp_path) == (1, 1)
+
+
+def test_thread_budget_is_split_across_concurrent_recognitions(onnx_backend, tmp_path: Path) -> None:
+    """Concurrent recognitions share the quota instead of each taking the full intra-op pool."""
+    (tmp_path / "cpu.max").write_text("400000 100000\n")
+    cores = min(4, onnx_backend.thread_settings({}, tmp_path)[0])
+
+    assert onnx_backend.thread_settings({"OCR_INTRA_OP_THREADS": "4"}, tmp_path, concurrency=2) == (2, 1)
+    assert onnx_backend.thread_settings({"OCR_INTRA_OP_THREADS": "1"}, tmp_path, concurrency=2) == (1, 1)
+    assert onnx_backend.thread_settings({}, tmp_path, concurrency=2)[0] == max(1, cores // 2)
+
+
+def test_resolve_model_path_prefers_int8(onnx_backend, tmp_path: Path) -> None:
+    """A quantized `<stem>.int8.onnx` sibling is used when it exists."""
+    model = tmp_path / "recognizer.onnx"
+    assert onnx_backend.resolve_model_path(model) == model
+
+    quantized = tmp_path / "recognizer.int8.onnx"
+    quantized.touch()
+    assert onnx_backend.resolve_model_path(model) == quantized
+    assert onnx_backend.resolve_model_path(model, prefer_int8=False) == model
+
+
+def _one_hot_logits(np, text: str, charset: str, steps: int):
+    probabilities = np.full((steps, len(charset) + 1), 0.01, dtype=np.float32)
+    probabilities[:, 0] = 0.9
+    for step, char in enumerate(text):
+        probabilities[step * 2] = 0.01
+        probabilities[step * 2, charset.index(char) + 1] = 0.9
+    return probabilities
+
+
+def test_ctc_greedy_decode_collapses_repeats_and_blanks(onnx_backend) -> None:
+    """Greedy CTC drops blanks and merges repeated symbols between blanks."""
+    np = pytest.importorskip("numpy")
+    charset = onnx_backend.DEFAULT_CHARSET
+    logits = _one_hot_logits(np, "MSKU9070323", charset, 24)
+    logits[1] = logits[0]  # repeated "M" without a blank must collapse
+
+    reading = onnx_backend.ctc_greedy_decode(logits, charset)
+    assert reading.text == "MSKU9070323"
+    assert reading.confidence == pytest.approx(0.9)
+
+
+def test_onnx_recognizer_runs_session_with_io_binding(onnx_backend, tmp_path: Path) -> None:
+    """A real ONNX Runtime session loads, warms up, and decodes through IO binding."""
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("onnxruntime")
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper  # noqa: PLC0415
+
+    charset = onnx_backend.DEFAULT_CHARSET
+    steps, classes = 24, len(charset) + 1
+    graph = helper.make_graph(
+        [helper.make_node("Reshape", ["input", "shape"], ["output"])],
+        "ctc-identity",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, [1, 1, steps, classes])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, [1, steps, classes])],
+        [helper.make_tensor("shape", TensorProto.INT64, [3], [1, steps, classes])],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    model_path = tmp_path / "recognizer.onnx"
+    onnx.save(model, model_path)
+
+    logits = _one_hot_logits(np, "CSQU3054383", charset, steps)
+    recognizer = onnx_backend.OnnxRecognizer(
+        model_path,
+        input_size=(steps, classes),
+        preprocess=lambda image, height, width: logits.reshape(1, 1, height, width),
+    )
+    recognizer.load()
+
+    reading = recognizer.recognize(b"image-bytes")
+    assert reading is not None and reading.text == "CSQU3054383"
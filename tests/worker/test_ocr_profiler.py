@@ -0,0 +1,66 @@
+"""`/debug/profile` endpoint tests for the OCR worker."""
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+OCR_WORKER_ROOT = REPO_ROOT / "src" / "apps" / "ocr-worker"
+
+
+@pytest.fixture(scope="module")
+def ocr_main():
+    pytest.importorskip("httpx")
+    sys.path.insert(0, str(OCR_WORKER_ROOT))
+    try:
+        from ocr import main  # noqa: PLC0415
+
+        yield main
+    finally:
+        sys.path.remove(str(OCR_WORKER_ROOT))
+
+
+def test_profiler_requires_flag_and_token(ocr_main) -> None:
+    """Profiling stays off unless both the flag and a token are configured."""
+    assert ocr_main._build_profiler({}) is None
+    assert ocr_main._build_profiler({"DEBUG_PROFILE_ENABLED": "true"}) is None
+    profiler = ocr_main._build_profiler(
+        {"DEBUG_PROFILE_ENABLED": "true", "DEBUG_PROFILE_TOKEN": "s3cret", "DEBUG_PROFILE_MAX_SECONDS": "5"}
+    )
+    assert profiler is not None and profiler.max_seconds == 5
+
+
+def test_profile_endpoint_returns_collapsed_stacks(ocr_main, monkeypatch) -> None:
+    """A capture during CPU-bound work shows that work in the collapsed stacks."""
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    monkeypatch.setenv("DEBUG_PROFILE_TOKEN", "s3cret")
+    ocr_main.app.state.profiler = ocr_main._build_profiler(
+        {"DEBUG_PROFILE_ENABLED": "true", "DEBUG_PROFILE_TOKEN": "s3cret"}
+    )
+    stop = threading.Event()
+
+    def recognize_forever() -> None:
+        while not stop.is_set():
+            sorted(range(5000), reverse=True)
+
+    worker = threading.Thread(target=recognize_forever, name="ocr-inference")
+    worker.start()
+    try:
+        client = TestClient(ocr_main.app)
+        assert client.get("/debug/profile?seconds=0.1").status_code == 401
+        response = client.get("/debug/profile?seconds=0.1&interval_ms=5", headers={"x-debug-token": "s3cret"})
+    finally:
+        stop.set()
+        worker.join()
+        ocr_main.app.state.profiler = None
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert any(
+        line.startswith("thread:ocr-inference;") and "recognize_forever" in line for line in response.text.splitlines()
+    )
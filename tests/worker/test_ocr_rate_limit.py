@@ -0,0 +1,178 @@
+"""Fair admission tests for OCR worker recognition: weighted fair queuing and the 429 contract."""
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+OCR_WORKER_ROOT = REPO_ROOT / "src" / "apps" / "ocr-worker"
+
+
+@pytest.fixture(scope="module")
+def ratelimit():
+    sys.path.insert(0, str(OCR_WORKER_ROOT))
+    try:
+        from ocr import ratelimit  # noqa: PLC0415
+
+        yield ratelimit
+    finally:
+        sys.path.remove(str(OCR_WORKER_ROOT))
+
+
+@pytest.fixture(scope="module")
+def ocr_main():
+    pytest.importorskip("httpx")
+    sys.path.insert(0, str(OCR_WORKER_ROOT))
+    try:
+        from ocr import main  # noqa: PLC0415
+
+        yield main
+    finally:
+        sys.path.remove(str(OCR_WORKER_ROOT))
+
+
+def test_saturated_scheduler_interleaves_flows_and_prefers_live(ratelimit) -> None:
+    """A deep backfill backlog from one operator cannot delay other operators or live captures."""
+    BACKFILL, LIVE, FairScheduler = ratelimit.BACKFILL, ratelimit.LIVE, ratelimit.FairScheduler
+
+    async def scenario() -> list[str]:
+        scheduler = FairScheduler(capacity=1, max_wait=5)
+        order: list[str] = []
+        gate = asyncio.Event()
+
+        async def hold() -> None:
+            async with scheduler.slot("op-0", LIVE):
+                await gate.wait()
+
+        async def request(label: str, key: str, mode: str) -> None:
+            async with scheduler.slot(key, mode):
+                order.append(label)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(request(label, key, mode))
+            for label, key, mode in [
+                ("a1", "op-a", BACKFILL),
+                ("a2", "op-a", BACKFILL),
+                ("a3", "op-a", BACKFILL),
+                ("b1", "op-b", BACKFILL),
+                ("c1", "op-c", LIVE),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.waiting == 5
+        gate.set()
+        await asyncio.gather(holder, *waiters)
+        assert scheduler.active == 0
+        return order
+
+    assert asyncio.run(scenario()) == ["c1", "a1", "b1", "a2", "a3"]
+
+
+def test_full_or_slow_queue_rejects_with_retry_hint(ratelimit) -> None:
+    """Requests are refused once the queue is full or the wait exceeds `max_wait`."""
+    FairScheduler, RateLimitedError = ratelimit.FairScheduler, ratelimit.RateLimitedError
+
+    async def scenario() -> None:
+        scheduler = FairScheduler(capacity=1, max_queue=1, max_wait=0.05)
+        gate = asyncio.Event()
+
+        async def hold() -> None:
+            async with scheduler.slot("op-0"):
+                await gate.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler.slot("op-1").__aenter__())
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitedError) as full:
+            async with scheduler.slot("op-2"):
+                pass
+        assert full.value.retry_after > 0
+        with pytest.raises(RateLimitedError):
+            await waiter
+        gate.set()
+        await holder
+        assert scheduler.active == 0
+        async with scheduler.slot("op-3"):
+            assert scheduler.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_flows_trust_forwarded_users_only_from_the_api(ocr_main, monkeypatch) -> None:
+    """A forwarded `x-user-id` selects a flow only alongside the shared caller secret."""
+    from starlette.requests import Request  # noqa: PLC0415
+
+    def flow(**headers: str) -> str:
+        scope = {"type": "http", "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]}
+        return ocr_main._flow_key(Request(scope))
+
+    assert flow(x_user_id="op-1") == ocr_main.ANONYMOUS_FLOW
+    monkeypatch.setenv("OCR_CALLER_SECRET", "caller-secret")
+    assert flow(x_user_id="op-1", x_caller_secret="caller-secret") == "op-1"
+    assert flow(x_user_id="op-1", x_caller_secret="guess") == ocr_main.ANONYMOUS_FLOW
+    assert flow(x_caller_secret="caller-secret") == ocr_main.ANONYMOUS_FLOW
+
+
+def test_recognize_is_gated_by_fair_admission(ocr_main) -> None:
+    """Recognitions beyond `OCR_MAX_INFLIGHT` queue and are refused with Retry-After."""
+    import httpx  # noqa: PLC0415
+
+    from ocr.recognition import CascadeResult, Recognition  # noqa: PLC0415
+
+    assert ocr_main._build_scheduler({}) is None
+
+    release = threading.Event()
+    started = threading.Event()
+
+    class Fetcher:
+        def fetch(self, url: str) -> bytes:
+            return url.encode()
+
+    class Recognizer:
+        def recognize(self, image: bytes) -> CascadeResult:
+            started.set()
+            release.wait(5)
+            return CascadeResult(Recognition("MSCU1234565", 0.99), "fast", True)
+
+    async def scenario() -> tuple[list[httpx.Response], int]:
+        transport = httpx.ASGITransport(app=ocr_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://worker") as client:
+
+            def post(user: str):
+                body = {"object_url": f"https://s3.local/images/uploads/{user}/scan.jpg"}
+                return asyncio.create_task(client.post("/recognize", json=body))
+
+            running = post("op-1")
+            await asyncio.to_thread(started.wait, 5)
+            queued = post("op-2")
+            while ocr_main.app.state.scheduler.waiting == 0:
+                await asyncio.sleep(0.01)
+            refused = await client.post(
+                "/recognize", json={"object_url": "https://s3.local/images/uploads/op-3/scan.jpg"}
+            )
+            waiting = ocr_main.app.state.scheduler.waiting
+            release.set()
+            return [await running, await queued, refused], waiting
+
+    ocr_main.app.state.recognizer = Recognizer()
+    ocr_main.app.state.object_fetcher = Fetcher()
+    ocr_main.app.state.scheduler = ocr_main._build_scheduler({"OCR_MAX_INFLIGHT": "1", "OCR_QUEUE_MAX": "1"})
+    try:
+        (running, queued, refused), waiting = asyncio.run(scenario())
+    finally:
+        ocr_main.app.state.recognizer = None
+        ocr_main.app.state.object_fetcher = None
+        ocr_main.app.state.scheduler = None
+
+    assert waiting == 1
+    assert running.status_code == 200 and running.json()["text"] == "MSCU1234565"
+    assert queued.status_code == 200
+    assert refused.status_code == 429 and int(refused.headers["retry-after"]) >= 1